@@ -1,36 +1,66 @@
 """简单AI控制器"""
-import random
+from engine import gamelog
 from engine.cards.basic import Slash, Peach, Dodge
 from engine.cards.trick import Dismantle, Snatch, ExNihilo, Duel
 
 
+# 弃牌时各类牌的保留价值，越小越先弃（AI不会使用装备牌，未列出的牌价值为0）
+KEEP_VALUE = {
+    Peach: 4,
+    Dodge: 3,
+    ExNihilo: 2,
+    Slash: 1,
+}
+
+# 响应请求类型 -> 可以打出的牌
+RESPONSE_CARDS = {
+    "dodge_slash": Dodge,
+    "peach_dying": Peach,
+    "slash_duel": Slash,
+}
+
+
 class AIController:
     """AI玩家控制器"""
     
     def __init__(self, player, game):
         self.player = player
         self.game = game
+        self.rng = game.rng  # 需要随机决策时使用本局的随机数生成器
     
     def play_turn(self):
         """执行一个完整的AI回合"""
-        self.game.log(f"[AI] {self.player.name} 开始思考...")
+        self.game.record(gamelog.AI_THINK, self.player.seat)
         
         # 出牌阶段：尝试使用手牌
-        while True:
+        while self.game.phase != "game_over":
             action = self.decide_action()
             if not action:
                 break
             
-            card_index, targets = action
-            success = self.game.use_card(card_index, targets)
+            card, targets = action
+            success = self.game.play_card(card, targets)
             if not success:
                 break
         
-        self.game.log(f"[AI] {self.player.name} 结束出牌")
+        self.game.record(gamelog.AI_END, self.player.seat)
+    
+    def choose_discards(self, count):
+        """选择要弃置的 count 张牌：价值低的先弃，同价值先弃后摸到的"""
+        cards = list(self.player.hand)
+        cards.reverse()
+        cards.sort(key=lambda card: KEEP_VALUE.get(type(card), 0))
+        return tuple(cards[:count])
+    
+    def choose_response(self, request):
+        """响应请求时打出的牌：手牌中第一张对应的牌，没有则返回None"""
+        kind = RESPONSE_CARDS.get(request.request_type)
+        return self.player.hand.first(kind) if kind is not None else None
     
     def decide_action(self):
-        """决定下一步行动：返回 (card_index, target_indices) 或 None"""
-        if not self.player.hand:
+        """决定下一步行动：返回 (card, target_indices) 或 None"""
+        hand = self.player.hand
+        if not hand:
             return None
         
         # 策略优先级：
@@ -42,66 +72,47 @@ class AIController:
         
         # 1. 优先回血
         if self.player.hp < self.player.max_hp:
-            for i, card in enumerate(self.player.hand):
-                if isinstance(card, Peach) and card.can_use(self.player, self.game):
-                    return (i, [])
+            card = hand.first(Peach)
+            if card is not None and card.can_use(self.player, self.game):
+                return (card, [])
         
         # 2. 使用无中生有摸牌
-        for i, card in enumerate(self.player.hand):
-            if isinstance(card, ExNihilo):
-                return (i, [])
+        card = hand.first(ExNihilo)
+        if card is not None:
+            return (card, [])
         
         # 3. 使用控场锦囊
-        for i, card in enumerate(self.player.hand):
-            if isinstance(card, (Dismantle, Snatch)):
-                target = self.select_control_target()
-                if target is not None:
-                    return (i, [target])
+        card = hand.first(Dismantle, Snatch)
+        if card is not None:
+            target = self.select_control_target()
+            if target is not None:
+                return (card, [target])
         
         # 4. 使用杀攻击
-        for i, card in enumerate(self.player.hand):
-            if isinstance(card, Slash) and card.can_use(self.player, self.game):
-                target = self.select_attack_target()
-                if target is not None:
-                    return (i, [target])
+        card = hand.first(Slash)
+        if card is not None and card.can_use(self.player, self.game):
+            target = self.select_attack_target()
+            if target is not None:
+                return (card, [target])
         
         # 5. 使用决斗
-        for i, card in enumerate(self.player.hand):
-            if isinstance(card, Duel):
-                target = self.select_attack_target()
-                if target is not None:
-                    return (i, [target])
+        card = hand.first(Duel)
+        if card is not None:
+            target = self.select_attack_target()
+            if target is not None:
+                return (card, [target])
         
         return None
     
     def select_attack_target(self):
-        """选择攻击目标：优先血量低的，并检查距离"""
-        # 获取攻击范围
-        attack_range = self.player.get_attack_range() if hasattr(self.player, 'get_attack_range') else 1
-        
-        # 筛选范围内的目标
-        valid_targets = []
-        for i, p in enumerate(self.game.players):
-            if p != self.player and p.is_alive:
-                dist = self.game.distance(self.player, p) if hasattr(self.game, 'distance') else 1
-                if dist <= attack_range:
-                    valid_targets.append((i, p, dist))
-        
-        if not valid_targets:
-            return None
-        
-        # 优先攻击血量最低的，其次是距离最近的
-        valid_targets.sort(key=lambda x: (x[1].hp, x[2]))
-        return valid_targets[0][0]
+        """选择攻击目标：攻击范围内威胁排序最高的角色（按身份推断，见 ThreatModel）"""
+        attack_range = self.player.equip.attack_range
+        distances = self.game.distances
+        target = self.game.threats.best_target(
+            self.player, lambda p: distances.in_range(self.player, p, attack_range))
+        return target.seat if target is not None else None
     
     def select_control_target(self):
-        """选择控制目标：优先手牌多的"""
-        other_players = [(i, p) for i, p in enumerate(self.game.players) 
-                        if p != self.player and p.is_alive and len(p.hand) > 0]
-        
-        if not other_players:
-            return None
-        
-        # 优先选择手牌最多的
-        other_players.sort(key=lambda x: len(x[1].hand), reverse=True)
-        return other_players[0][0]
+        """选择控制目标：有手牌的角色中威胁排序最高的"""
+        target = self.game.threats.best_target(self.player, lambda p: len(p.hand) > 0)
+        return target.seat if target is not None else None
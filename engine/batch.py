@@ -0,0 +1,287 @@
+"""NumPy批量模拟 - 只含基本牌（杀、闪、桃）的对局，B局同时推进
+
+规则与对象引擎在只用基本牌堆（engine.deck.BASIC）、无武将、全贪心AI时相同：
+    摸牌阶段摸2张；出牌阶段先用【桃】回满体力，再对攻击范围（相邻存活角色）内
+    威胁最高的角色出一张【杀】（身份推断同 engine.belief.ThreatModel）；
+    目标有【闪】必出，否则受1点伤害，濒死时有【桃】自动使用；
+    弃牌阶段按 杀→闪→桃 的顺序弃到体力值。
+每局的牌堆用各类牌的剩余张数表示：从洗好的牌堆顶依次摸牌，
+等价于按剩余张数不放回地抽取，因此不需要保存每局的排列。
+
+用法：
+    python -m engine.batch -n 100000 -p 5
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from engine.game import Game, get_role_config
+from engine.player import Player
+from engine.deck import BASIC, get_template
+from engine.belief import HOSTILITY_STEP
+from engine.sim import SimStats, MAX_TURNS
+
+
+SLASH, DODGE, PEACH = 0, 1, 2
+KINDS = 3
+
+# 身份编码
+LORD, LOYALIST, REBEL, TRAITOR = 0, 1, 2, 3
+ROLE_CODES = {"lord": LORD, "loyalist": LOYALIST, "rebel": REBEL, "traitor": TRAITOR}
+
+# 结果编码 -> SimStats 中的获胜阵营名（与 Game.check_game_over 的返回值一致）
+RESULTS = {0: "timeout", 1: "lord", 2: "loyalist", 3: "rebel", 4: "traitor", 5: "draw"}
+
+BASE_HP = 4  # 无武将时的体力，主公+1
+
+
+def basic_pile_counts():
+    """基本牌堆中各类牌的张数"""
+    names = {"杀": SLASH, "闪": DODGE, "桃": PEACH}
+    counts = np.zeros(KINDS, dtype=np.int16)
+    for card in get_template(BASIC).cards:
+        counts[names[card.name]] += 1
+    return counts
+
+
+class BatchSimulation:
+    """B局只含基本牌的全AI对局，按回合同步推进"""
+
+    def __init__(self, n_games, player_count=4, seed=None):
+        if not 2 <= player_count <= 8:
+            raise ValueError(f"不支持的人数：{player_count}（应为2-8人）")
+        B, n = n_games, player_count
+        self.B, self.n = B, n
+        self.rng = np.random.default_rng(seed)
+        self.roles = np.array([ROLE_CODES[r] for r in get_role_config(n)], dtype=np.int8)
+        self.max_hp = np.where(self.roles == LORD, BASE_HP + 1, BASE_HP).astype(np.int16)
+
+        self.hand = np.zeros((B, n, KINDS), dtype=np.int16)
+        self.hp = np.tile(self.max_hp, (B, 1))
+        self.alive = np.ones((B, n), dtype=bool)
+        self.loyalty = np.zeros((B, n))
+        self.pile = np.tile(basic_pile_counts(), (B, 1))
+        self.discards = np.zeros((B, KINDS), dtype=np.int16)
+        self.cur = np.zeros(B, dtype=np.int64)
+        self.active = np.ones(B, dtype=bool)
+        self.result = np.zeros(B, dtype=np.int8)
+        self.turns = np.zeros(B, dtype=np.int32)
+
+        # 发初始手牌
+        games = np.arange(B)
+        for seat in range(n):
+            self._draw(games, np.full(B, seat), 4)
+
+    # ========== 基本操作 ==========
+
+    def _draw(self, g, seat, count):
+        """g 中各局的 seat 号位摸 count 张牌"""
+        for _ in range(count):
+            # 只取这几局的牌堆（不对全部B局求和）
+            cum = np.cumsum(self.pile[g], axis=1)
+            total = cum[:, -1]
+            # 牌堆耗尽：弃牌堆洗回牌堆
+            empty = total == 0
+            if empty.any():
+                eg = g[empty]
+                self.pile[eg] += self.discards[eg]
+                self.discards[eg] = 0
+                cum[empty] = np.cumsum(self.pile[eg], axis=1)
+                total = cum[:, -1]
+            ok = total > 0
+            gg, ss, cum = g[ok], seat[ok], cum[ok]
+            u = self.rng.random(len(gg)) * total[ok]
+            kind = (u >= cum[:, 0]).astype(np.int64) + (u >= cum[:, 1])
+            self.pile[gg, kind] -= 1
+            self.hand[gg, ss, kind] += 1
+
+    def _lean(self, g, seat):
+        """角色偏向主公的程度，同 ThreatModel.lean"""
+        return np.where(self.roles[seat] == LORD, 1.0, np.tanh(self.loyalty[g, seat]))
+
+    def _priority(self, observer_role, target_role, lean):
+        """攻击优先级，同 ThreatModel.priority"""
+        return np.select(
+            [observer_role <= LOYALIST, observer_role == REBEL],
+            [-lean, lean],
+            np.where(target_role == LORD, -1.0, np.abs(lean)),
+        )
+
+    def _neighbor(self, g, seat, step):
+        """seat 按 step(+1/-1) 方向的下一名存活角色"""
+        n = self.n
+        result = seat.copy()
+        found = np.zeros(len(g), dtype=bool)
+        for off in range(1, n):
+            s = (seat + step * off) % n
+            hit = ~found & self.alive[g, s]
+            result[hit] = s[hit]
+            found |= hit
+        return result
+
+    def _check_game_over(self, g):
+        """g 中各局是否结束，同 Game.check_game_over，结束的局写入结果"""
+        alive = self.alive[g]
+        roles = self.roles
+        count = alive.sum(axis=1)
+        lord = (alive & (roles == LORD)).any(axis=1)
+        rebels = (alive & (roles == REBEL)).any(axis=1)
+        traitors = (alive & (roles == TRAITOR)).any(axis=1)
+        sole_role = roles[np.argmax(alive, axis=1)] + 1
+
+        result = np.zeros(len(g), dtype=np.int8)
+        result[~lord & rebels] = 3
+        result[~lord & ~rebels] = 4
+        result[lord & ~rebels & ~traitors] = 1
+        result[count == 1] = sole_role[count == 1]
+        result[count == 0] = 5
+        over = result > 0
+        self.result[g[over]] = result[over]
+        self.active[g[over]] = False
+
+    # ========== 回合 ==========
+
+    def step(self):
+        """所有未结束的局各进行一个完整回合，返回仍在进行的局数"""
+        g = np.nonzero(self.active)[0]
+        if len(g) == 0:
+            return 0
+        c = self.cur[g]
+        self.turns[g] += 1
+
+        # 摸牌阶段
+        self._draw(g, c, 2)
+
+        # 出牌阶段：先用【桃】回满体力
+        peaches = np.minimum(self.hand[g, c, PEACH], self.max_hp[c] - self.hp[g, c]).clip(0)
+        self.hand[g, c, PEACH] -= peaches
+        self.hp[g, c] += peaches
+        self.discards[g, PEACH] += peaches
+
+        # 再对相邻存活角色中威胁最高的出【杀】
+        self._slash(g, c)
+
+        # 弃牌阶段（游戏已结束的局不再继续）
+        live = self.active[g]
+        g, c = g[live], c[live]
+        excess = self.hand[g, c].sum(axis=1) - self.hp[g, c]
+        for kind in (SLASH, DODGE, PEACH):
+            drop = np.minimum(excess.clip(0), self.hand[g, c, kind])
+            self.hand[g, c, kind] -= drop
+            self.discards[g, kind] += drop
+            excess -= drop
+
+        # 回合结束：轮到下一名存活角色
+        self.cur[g] = self._neighbor(g, c, 1)
+        return int(self.active.sum())
+
+    def _slash(self, g, c):
+        roles = self.roles
+        has = self.hand[g, c, SLASH] > 0
+        g, c = g[has], c[has]
+        if len(g) == 0:
+            return
+
+        # 候选目标：顺时针和逆时针方向最近的存活角色（攻击范围1）
+        best = None
+        for t in (self._neighbor(g, c, 1), self._neighbor(g, c, -1)):
+            ok = (t != c) & ~((roles[c] == LOYALIST) & (roles[t] == LORD))
+            prio = np.where(ok, self._priority(roles[c], roles[t], self._lean(g, t)), -np.inf)
+            key = (prio, self.hp[g, t], t, ok)
+            if best is None:
+                best = key
+                continue
+            bp, bh, bt, bok = best
+            better = ok & (~bok | (prio > bp) | ((prio == bp) & ((key[1] < bh) | ((key[1] == bh) & (t < bt)))))
+            best = tuple(np.where(better, new, old) for new, old in zip(key, best))
+        _, _, t, ok = best
+        g, c, t = g[ok], c[ok], t[ok]
+        if len(g) == 0:
+            return
+
+        self.hand[g, c, SLASH] -= 1
+        self.discards[g, SLASH] += 1
+        not_lord = roles[c] != LORD
+        self.loyalty[g[not_lord], c[not_lord]] -= HOSTILITY_STEP * self._lean(g[not_lord], t[not_lord])
+
+        # 目标有【闪】必出
+        dodged = self.hand[g, t, DODGE] > 0
+        self.hand[g[dodged], t[dodged], DODGE] -= 1
+        self.discards[g[dodged], DODGE] += 1
+        g, t = g[~dodged], t[~dodged]
+        self.hp[g, t] -= 1
+
+        # 濒死：有【桃】自动使用，否则阵亡
+        dying = self.hp[g, t] <= 0
+        g, t = g[dying], t[dying]
+        saved = self.hand[g, t, PEACH] > 0
+        gs, ts = g[saved], t[saved]
+        self.hand[gs, ts, PEACH] -= 1
+        self.discards[gs, PEACH] += 1
+        self.hp[gs, ts] = np.minimum(self.hp[gs, ts] + 1, self.max_hp[ts])
+        g, t = g[~saved], t[~saved]
+        self.alive[g, t] = False
+        if len(g):
+            self._check_game_over(g)
+
+    def run(self, max_turns=MAX_TURNS):
+        """推进到所有局结束或打满回合上限，返回统计结果"""
+        for _ in range(max_turns):
+            if not self.step():
+                break
+        return self.stats()
+
+    def stats(self):
+        """汇总为 SimStats（与对象引擎的批量模拟结果格式相同）"""
+        stats = SimStats(self.n)
+        stats.games = self.B
+        stats.turns = int(self.turns.sum())
+        codes, counts = np.unique(self.result, return_counts=True)
+        stats.wins = {RESULTS[int(code)]: int(count) for code, count in zip(codes, counts)}
+        return stats
+
+
+def run_batch(n_games, player_count=4, seed=None, max_turns=MAX_TURNS, batch_size=100000):
+    """分批进行 n_games 局基本牌对局，返回统计结果"""
+    stats = SimStats(player_count)
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    for offset in range(0, n_games, batch_size):
+        size = min(batch_size, n_games - offset)
+        batch = BatchSimulation(size, player_count, rng.integers(2 ** 63))
+        part = batch.run(max_turns)
+        stats.merge(part)
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def play_basic_game(player_count=4, max_turns=MAX_TURNS, seed=None):
+    """用对象引擎进行一局与 BatchSimulation 规则相同的对局，返回 (获胜阵营, 回合数)"""
+    rng = random.Random(seed)
+    players = [Player(f"玩家{i + 1}", BASE_HP + 1 if role == "lord" else BASE_HP, is_ai=True, role=role)
+               for i, role in enumerate(get_role_config(player_count))]
+    game = Game(players, verbose=False, seed=seed, rng=rng, deck_template=get_template(BASIC))
+    scheduler = game.scheduler
+    scheduler.run_until(
+        lambda g: scheduler.turn_count >= max_turns and scheduler.next_phase == "prepare"
+    )
+    return (game.check_game_over() or "timeout", scheduler.turn_count)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="三国杀基本牌批量模拟（NumPy）")
+    parser.add_argument("-n", "--games", type=int, default=100000, help="对局数")
+    parser.add_argument("-p", "--players", type=int, default=4, help="人数（2-8）")
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS, help="单局回合上限")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args(argv)
+
+    stats = run_batch(args.games, args.players, args.seed, args.max_turns)
+    print(stats.summary())
+    print(f"{stats.turns / stats.elapsed:,.0f} 回合/秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""AI身份推断与威胁排序
+
+ThreatModel 由出牌、伤害和回复的结算代码直接调用更新（不经过事件总线，
+无界面模拟时总线上没有订阅者，发送事件的开销可以完全省掉）：
+    - 对某角色使用【杀】、【决斗】、【过河拆桥】、【顺手牵羊】视为敌意行为，
+      攻击偏向主公的角色会被认为偏向反贼，反之偏向主公
+    - 主公身份公开，其余角色只有一个公开的"忠诚度"估计
+每名AI玩家有一个按威胁排序的目标堆，事件发生时只为受影响的角色压入新条目，
+旧条目按版本号惰性丢弃，选择目标时不再对全场排序。
+"""
+import heapq
+import math
+
+from engine.cards.basic import Slash
+from engine.cards.trick import Dismantle, Snatch, Duel
+
+
+# 敌意牌：对目标使用即表明立场
+HOSTILE_CARDS = (Slash, Duel, Dismantle, Snatch)
+
+# 每次敌意行为对忠诚度的影响
+HOSTILITY_STEP = 0.5
+
+LORD_SIDE = ("lord", "loyalist")
+
+
+class ThreatModel:
+    """全场共享的身份推断，以及每名观察者的目标堆"""
+
+    def __init__(self, game):
+        self.game = game
+        self.players = game.players
+        n = len(self.players)
+        self.loyalty = [0.0] * n  # >0 偏向主公，<0 偏向反贼（公开信息推断）
+        self._version = [0] * n  # 座位 -> 目标条目版本号，旧版本条目惰性丢弃
+        self._heaps = [None] * n  # 观察者座位 -> 目标堆，首次查询时建立
+
+    # ========== 推断 ==========
+
+    def lean(self, player):
+        """角色偏向主公的程度（-1 ~ 1），主公身份公开为1"""
+        if player.role == "lord":
+            return 1.0
+        return math.tanh(self.loyalty[player.seat])
+
+    def priority(self, observer, target):
+        """observer 攻击 target 的优先级，越大越优先"""
+        lean = self.lean(target)
+        role = observer.role
+        if role in LORD_SIDE:
+            return -lean  # 主忠：先打最像反贼的
+        if role == "rebel":
+            return lean  # 反贼：先打主公和最像忠臣的
+        if role == "traitor":
+            # 内奸：先削弱立场最鲜明的角色，主公留到最后
+            return -1.0 if target.role == "lord" else abs(lean)
+        return 0.0
+
+    def is_friend(self, observer, target):
+        """observer 确定是友方的角色（忠臣不攻击公开的主公）"""
+        return observer.role == "loyalist" and target.role == "lord"
+
+    def card_used(self, source, card, target):
+        """source 对 target 使用了 card（Player.use_card 调用）"""
+        if target is None or target is source or not isinstance(card, HOSTILE_CARDS):
+            return
+        if source.role != "lord":
+            self.loyalty[source.seat] -= HOSTILITY_STEP * self.lean(target)
+            self._refresh(source)
+
+    def hp_changed(self, player):
+        """player 受到伤害或回复了体力"""
+        self._refresh(player)
+
+    def snapshot(self):
+        """忠诚度估计（用于 GameState 快照）"""
+        return tuple(self.loyalty)
+
+    def restore(self, loyalty):
+        """从 snapshot() 的结果恢复，目标堆在下次查询时重建"""
+        self.loyalty = list(loyalty)
+        self._heaps = [None] * len(self.players)
+
+    # ========== 目标堆 ==========
+
+    def _entry(self, observer, target):
+        return (-self.priority(observer, target), target.hp, target.seat, self._version[target.seat])
+
+    def _refresh(self, target):
+        """target 的信息变化：只为它在各观察者的堆中压入新条目"""
+        seat = target.seat
+        self._version[seat] += 1
+        for observer_seat, heap in enumerate(self._heaps):
+            if heap is None or observer_seat == seat:
+                continue
+            if len(heap) > 4 * len(self.players):
+                self._heaps[observer_seat] = None  # 旧条目过多，下次查询时重建
+                continue
+            heapq.heappush(heap, self._entry(self.players[observer_seat], target))
+
+    def _heap(self, observer):
+        heap = self._heaps[observer.seat]
+        if heap is None:
+            heap = [self._entry(observer, p) for p in self.players if p is not observer]
+            heapq.heapify(heap)
+            self._heaps[observer.seat] = heap
+        return heap
+
+    def best_target(self, observer, accept=None):
+        """observer 威胁排序最高、且满足 accept(target) 的存活非友方角色，没有则返回None"""
+        heap = self._heap(observer)
+        version = self._version
+        kept = []
+        result = None
+        while heap:
+            entry = heapq.heappop(heap)
+            seat = entry[2]
+            if entry[3] != version[seat]:
+                continue  # 过期条目
+            kept.append(entry)
+            target = self.players[seat]
+            # 阵亡角色的条目保留在堆中（搜索类AI恢复快照后可能重新存活）
+            if not target.is_alive or self.is_friend(observer, target):
+                continue
+            if accept is None or accept(target):
+                result = target
+                break
+        for entry in kept:
+            heapq.heappush(heap, entry)
+        return result
@@ -0,0 +1,304 @@
+"""引擎热点基准测试 - 输出机器可读的结果，并与保存的基线比较
+
+用法：
+    python -m engine.bench                       # 运行全部基准，与 bench_baseline.json 比较
+    python -m engine.bench -k deck --json out.json
+    python -m engine.bench --save                # 把本次结果保存为新基线
+
+每项基准给出：
+    ops_per_sec   每秒操作数
+    batch         每个计时样本内连续执行的操作数（很快的操作才大于1）
+    batch_p50_us/batch_p99_us
+                  各样本平均单次耗时的中位数/99分位（微秒）；batch 大于1时个别慢操作
+                  已被同一样本内的其他操作平均掉，不是单次操作的真实尾延迟
+    alloc_bytes   单次操作期间 tracemalloc 观察到的内存峰值增量（字节，中位数）
+吞吐量比基线低超过 tolerance，或内存峰值比基线高超过 tolerance 时视为退化，
+命令以退出码1结束。基线与机器相关，换机器后应先用 --save 重新生成。
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from engine.game import Game
+from engine.deck import Deck
+from engine.cards.basic import Slash, Dodge
+from engine.sim import create_ai_players, play_game
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "bench_baseline.json")
+
+# 默认允许的退化幅度（相对基线）
+TOLERANCE = 0.25
+
+# 单个计时样本的最短时长：很快的操作在一个样本内重复多次，避免计时开销淹没结果
+SAMPLE_NS = 20_000
+
+# 名称 -> 准备函数（返回无参的单次操作）
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """注册一个基准：被装饰的函数做准备工作，返回要反复计时的单次操作"""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _ai_game(player_count, seed=0):
+    rng = random.Random(seed)
+    return Game(create_ai_players(player_count, rng), verbose=False, seed=seed, rng=rng)
+
+
+# ========== 基准 ==========
+
+@benchmark("deck.build_standard")
+def bench_build_standard():
+    deck = Deck(random.Random(0))
+    return deck.build_standard
+
+
+@benchmark("deck.draw")
+def bench_draw():
+    """摸一张牌再弃掉，牌堆摸空时洗入弃牌堆（每轮含一次洗牌）"""
+    deck = Deck(random.Random(0))
+    deck.reset()
+
+    def op():
+        deck.discard(deck.draw())
+    return op
+
+
+@benchmark("game.distance")
+def bench_distance():
+    game = _ai_game(8)
+    pairs = itertools.cycle([(a, b) for a in game.players for b in game.players if a is not b])
+
+    def op():
+        a, b = next(pairs)
+        game.distance(a, b)
+    return op
+
+
+@benchmark("ai.decide_action")
+def bench_decide_action():
+    """出牌阶段开始时的一次决策（不执行）"""
+    game = _ai_game(4)
+    game.phase = "play"
+    return game.ai_controllers[game.current_player].decide_action
+
+
+@benchmark("response.request_response")
+def bench_request_response():
+    """AI被【杀】时出【闪】"""
+    game = _ai_game(4)
+    source, target = game.players[0], game.players[1]
+    system = game.response_system
+    dodge, slash = Dodge(), Slash()
+    context = {"damage_card": slash}
+    discards = game.deck.discards
+
+    def op():
+        target.hand.append(dodge)
+        system.request_response("dodge_slash", source, target, context)
+        discards.pop()
+    return op
+
+
+@benchmark("game.ai_turn")
+def bench_ai_turn():
+    """4人局的一个完整AI回合，游戏结束时恢复到开局状态继续"""
+    game = _ai_game(4)
+    scheduler = game.scheduler
+    start = game.snapshot()
+
+    def turn_done(g):
+        return scheduler.next_phase == "prepare"
+
+    def op():
+        if not scheduler.run_until(turn_done):
+            game.restore(start)
+    return op
+
+
+def _full_game(player_count):
+    # 固定的一组种子循环使用，每次运行的工作量相同
+    seeds = itertools.cycle(range(32))
+
+    def setup():
+        def op():
+            play_game(player_count, seed=next(seeds))
+        return op
+    return setup
+
+
+for _count in (2, 4, 8):
+    benchmark(f"game.full_{_count}p")(_full_game(_count))
+
+
+# ========== 计时 ==========
+
+def _percentile(sorted_values, q):
+    index = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[index]
+
+
+def measure(op, min_time=0.5, alloc_ops=50):
+    """反复执行 op 至少 min_time 秒，返回结果字典"""
+    clock = time.perf_counter_ns
+    op()  # 预热
+
+    # 估计单次耗时，决定每个样本内重复的次数
+    t0 = clock()
+    op()
+    repeat = max(1, SAMPLE_NS // max(clock() - t0, 1))
+
+    samples = []
+    ops = 0
+    total = 0
+    budget = int(min_time * 1e9)
+    while total < budget or len(samples) < 5:
+        t0 = clock()
+        for _ in range(repeat):
+            op()
+        elapsed = clock() - t0
+        samples.append(elapsed / repeat)
+        ops += repeat
+        total += elapsed
+    samples.sort()
+
+    # 内存单独测量（tracemalloc 会显著拖慢执行）
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_ops):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            op()
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    peaks.sort()
+
+    return {
+        "ops_per_sec": round(ops * 1e9 / total, 1),
+        "batch": repeat,
+        "batch_p50_us": round(_percentile(samples, 0.5) / 1e3, 3),
+        "batch_p99_us": round(_percentile(samples, 0.99) / 1e3, 3),
+        "alloc_bytes": _percentile(peaks, 0.5),
+        "ops": ops,
+    }
+
+
+def run_benchmarks(names=None, min_time=0.5, alloc_ops=50):
+    """运行指定的基准（默认全部），返回 {名称: 结果}"""
+    results = {}
+    for name in names or BENCHMARKS:
+        op = BENCHMARKS[name]()
+        results[name] = measure(op, min_time, alloc_ops)
+    return results
+
+
+# ========== 基线 ==========
+
+def machine_info():
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+    }
+
+
+def load_baseline(path=BASELINE_PATH):
+    """读取基线文件，不存在时返回None"""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"machine": machine_info(), "results": results}, f,
+                  ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """与基线比较，返回退化列表 [(名称, 指标, 基线值, 本次值)]"""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if current["ops_per_sec"] < base["ops_per_sec"] * (1 - tolerance):
+            regressions.append((name, "ops_per_sec", base["ops_per_sec"], current["ops_per_sec"]))
+        # 内存峰值很小时只按绝对值比较，避免几十字节的波动被当作退化
+        if current["alloc_bytes"] > base["alloc_bytes"] * (1 + tolerance) + 1024:
+            regressions.append((name, "alloc_bytes", base["alloc_bytes"], current["alloc_bytes"]))
+    return regressions
+
+
+def format_table(results, baseline=None):
+    lines = [f"{'基准':<28}{'ops/s':>12}{'batch':>7}{'p50 µs':>11}{'p99 µs':>11}{'alloc B':>10}{'对比基线':>10}"]
+    for name, r in results.items():
+        base = (baseline or {}).get(name)
+        ratio = f"{r['ops_per_sec'] / base['ops_per_sec']:.2f}x" if base else "-"
+        lines.append(f"{name:<28}{r['ops_per_sec']:>12,.0f}{r['batch']:>7}{r['batch_p50_us']:>11.2f}"
+                     f"{r['batch_p99_us']:>11.2f}{r['alloc_bytes']:>10}{ratio:>10}")
+    lines.append("p50/p99 为每 batch 次操作的平均耗时的分位数（batch=1 时即单次操作）")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="三国杀引擎基准测试")
+    parser.add_argument("-k", "--filter", default="", help="只运行名称包含该字符串的基准")
+    parser.add_argument("--min-time", type=float, default=0.5, help="每项基准的最短计时时间（秒）")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="基线文件路径")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="允许的退化幅度")
+    parser.add_argument("--json", help="把结果写入该JSON文件（- 表示标准输出）")
+    parser.add_argument("--save", action="store_true", help="把本次结果保存为基线")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = run_benchmarks(names, args.min_time)
+    baseline = load_baseline(args.baseline)
+    base_results = baseline["results"] if baseline else None
+
+    if args.json == "-":
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        print()
+    else:
+        print(format_table(results, base_results))
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump({"machine": machine_info(), "results": results}, f, indent=2, sort_keys=True)
+
+    if args.save:
+        merged = dict(base_results or {})
+        merged.update(results)
+        save_baseline(merged, args.baseline)
+        print(f"基线已保存到 {args.baseline}", file=sys.stderr)
+        return 0
+
+    if base_results is None:
+        print(f"没有基线文件 {args.baseline}，用 --save 生成", file=sys.stderr)
+        return 0
+    if baseline.get("machine") != machine_info():
+        print("注意：基线来自不同的运行环境，比较结果仅供参考", file=sys.stderr)
+    regressions = compare(results, base_results, args.tolerance)
+    for name, metric, base, current in regressions:
+        print(f"退化：{name} {metric} 基线 {base} -> 本次 {current}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
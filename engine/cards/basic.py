@@ -1,14 +1,39 @@
+from engine import gamelog
+from engine.cards import registry
+
+
 class Card:
+    """卡牌享元：只保存注册表中的id，牌名、花色、点数等静态属性由注册表提供"""
+    __slots__ = ("id",)
+    card_type = "basic"  # basic, trick, equip
+
     def __init__(self, name: str, suit: str = "♠", rank: str = "A"):
-        self.name = name
-        self.suit = suit  # ♠ ♥ ♣ ♦
-        self.rank = rank  # A 2-10 J Q K
-        self.card_type = "basic"  # basic, trick, equip
+        self.id = registry.register(self, name, suit, rank)
+
+    @property
+    def name(self):
+        return registry.names[self.id]
+
+    @property
+    def suit(self):
+        return registry.suits[self.id]  # ♠ ♥ ♣ ♦
+
+    @property
+    def rank(self):
+        return registry.ranks[self.id]  # A 2-10 J Q K
+
+    def __reduce__(self):
+        # 序列化时只传id（如多进程、快照）
+        return (registry.card_by_id, (self.id,))
 
     def can_use(self, player, game):
         """是否可以使用这张牌"""
         return True
 
+    def legal_targets(self, player, game):
+        """所有合法的目标组合（座位号元组），不修改状态；不需要目标时为 [()]"""
+        return [()]
+
     def use(self, player, targets, game):
         """使用这张牌"""
         pass
@@ -18,33 +43,27 @@ class Card:
 
 
 class Slash(Card):
+    __slots__ = ()
+
     def __init__(self, suit="♠", rank="A"):
         super().__init__("杀", suit, rank)
 
     def can_use(self, player, game):
         # 检查是否装备了诸葛连弩
-        has_zhuge = False
-        for eq in player.equip:
-            if hasattr(eq, 'name') and eq.name == "诸葛连弩":
-                has_zhuge = True
-                break
-        
-        # 检查是否有哆哮技能
-        has_paoxiao = False
-        if player.hero and player.hero.skills:
-            for skill in player.hero.skills:
-                if skill.can_trigger(player, game, "check_slash_limit"):
-                    has_paoxiao = True
-                    game.log(f"{player.name} 发动【{skill.name}】，可以无限使用【杀】")
-                    break
+        has_zhuge = player.equip.unlimited_slash
         
-        # 检查次数限制
-        if not (has_paoxiao or has_zhuge):
-            # 正常情况：出牌阶段限一次
-            if hasattr(player, 'slash_used_this_turn') and player.slash_used_this_turn:
-                return False
+        # 检查次数限制：正常情况出牌阶段限一次
+        if has_zhuge or not player.slash_used_this_turn:
+            return True
         
-        return True
+        # 检查是否有哆哮等技能（只查询，不发动）
+        return game.skills.query("check_slash_limit", player, game) is not None
+
+    def legal_targets(self, player, game):
+        # 攻击范围内的其他存活角色
+        attack_range = player.equip.attack_range
+        return [(p.seat,) for p in game.players
+                if p.is_alive and game.distances.in_range(player, p, attack_range)]
 
     def use(self, player, targets, game):
         if not targets:
@@ -58,19 +77,24 @@ class Slash(Card):
         dist = game.distance(player, target) if hasattr(game, 'distance') else 1
         
         if dist > attack_range:
-            game.log(f"{player.name} 对 {target.name} 使用【杀】失败：目标超出攻击范围（距离 {dist}，范围 {attack_range}）")
+            game.record(gamelog.SLASH_OUT_OF_RANGE, player.seat, self, (target.seat, dist, attack_range))
             # 把牌放回手牌，不标记为已使用
             player.hand.append(self)
             return
         
         # 目标需要出闪抵消
-        game.emit_event("slash_used", source=player, target=target, card=self)
+        if game.has_listeners("slash_used"):
+            game.emit_event("slash_used", source=player, target=target, card=self)
         
         # 检查是否装备诸葛连弩
-        has_zhuge = any(hasattr(eq, 'name') and eq.name == "诸葛连弩" for eq in player.equip)
+        has_zhuge = player.equip.unlimited_slash
+        
+        # 超过次数限制仍能使用【杀】：发动哆哮等技能
+        if player.slash_used_this_turn and not has_zhuge:
+            game.skills.dispatch("check_slash_limit", player, game)
         
         # 使用响应系统请求闪的响应
-        game.log(f"{player.name} 对 {target.name} 使用了【杀】{' (诸葛连弩)' if has_zhuge else ''}（距离 {dist}，范围 {attack_range}）")
+        game.record(gamelog.SLASH_ZHUGE if has_zhuge else gamelog.SLASH, player.seat, self, (target.seat, dist, attack_range))
         responded = game.response_system.request_response(
             request_type="dodge_slash",
             source_player=player,
@@ -85,16 +109,16 @@ class Slash(Card):
                 player.slash_used_this_turn = True
             return
         elif responded:  # 有闪，抵消攻击
-            game.log(f"{target.name} 使用了【闪】抵消了攻击")
+            game.record(gamelog.SLASH_DODGED, target.seat)
         else:  # 没有闪，造成伤害
             target.hp -= 1
-            game.log(f"{target.name} 受到了1点伤害，剩余体力: {target.hp}")
+            game.record(gamelog.DAMAGE, target.seat, self, target.hp)
+            game.threats.hp_changed(target)
+            if game.has_listeners("damage"):
+                game.emit_event("damage", source=player, target=target, card=self)
             
             # 触发受伤技能（如奸雄）
-            if target.hero and target.hero.skills:
-                for skill in target.hero.skills:
-                    if skill.can_trigger(target, game, "damage_taken", damage_card=self, source=player):
-                        skill.trigger(target, game, damage_card=self, source=player)
+            game.skills.dispatch("damage_taken", target, game, damage_card=self, source=player)
             
             # 立即检查是否死亡
             game.check_death(target)
@@ -105,11 +129,19 @@ class Slash(Card):
 
 
 class Dodge(Card):
+    __slots__ = ()
+
     def __init__(self, suit="♠", rank="A"):
         super().__init__("闪", suit, rank)
 
+    def legal_targets(self, player, game):
+        # 【闪】只能在响应时打出，不能主动使用
+        return []
+
 
 class Peach(Card):
+    __slots__ = ()
+
     def __init__(self, suit="♠", rank="A"):
         super().__init__("桃", suit, rank)
 
@@ -119,5 +151,7 @@ class Peach(Card):
 
     def use(self, player, targets, game):
         player.hp = min(player.hp + 1, player.max_hp)
-        game.log(f"{player.name} 使用了【桃】，回复1点体力")
-        game.emit_event("peach_used", player=player, card=self)
+        game.record(gamelog.PEACH, player.seat, self)
+        game.threats.hp_changed(player)
+        if game.has_listeners("peach_used"):
+            game.emit_event("peach_used", player=player, card=self)
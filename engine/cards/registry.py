@@ -0,0 +1,58 @@
+"""卡牌注册表 - 每张实体牌对应一个小整数id
+
+牌的静态属性按id保存在平行数组中：
+    names[id]        牌名
+    suits[id]        花色 ♠ ♥ ♣ ♦
+    ranks[id]        点数 A 2-10 J Q K
+    kinds[id]        类别 basic, trick, equip
+    equip_types[id]  装备类型 weapon, armor, plus_horse, minus_horse（非装备牌为None）
+    descriptions[id] 装备能力说明
+    copies[id]       同一 (牌的类, 花色, 点数) 的第几张（牌堆中可以有多张相同的牌）
+Card 对象只保存 id（享元），所有属性都从这里查。同一张牌在进程内只有一个对象，
+各局游戏共用，手牌、牌堆可以直接浅拷贝，按 id 哈希和序列化。
+"""
+
+names = []
+suits = []
+ranks = []
+kinds = []
+equip_types = []
+descriptions = []
+copies = []
+cards = []  # id -> Card 对象
+
+# (牌的类, 花色, 点数, 第几张) -> id，供 intern() 复用已注册的牌
+_interned = {}
+
+
+def register(card, name, suit, rank, equip_type=None, description=""):
+    """登记一张新牌，返回分配的id"""
+    card_id = len(cards)
+    names.append(name)
+    suits.append(suit)
+    ranks.append(rank)
+    kinds.append(card.card_type)
+    equip_types.append(equip_type)
+    descriptions.append(description)
+    copies.append(0)
+    cards.append(card)
+    return card_id
+
+
+def intern(cls, suit, rank, copy=0):
+    """取 cls(suit, rank) 的第 copy 张牌，已登记过则直接复用，不再创建新对象
+
+    花色点数都相同的多张牌用 copy 区分，各是一张独立的牌（id不同）。
+    """
+    key = (cls, suit, rank, copy)
+    card_id = _interned.get(key)
+    if card_id is None:
+        card_id = cls(suit, rank).id
+        copies[card_id] = copy
+        _interned[key] = card_id
+    return cards[card_id]
+
+
+def card_by_id(card_id):
+    """按id取牌"""
+    return cards[card_id]
@@ -1,17 +1,28 @@
+from engine import gamelog
 from engine.cards.basic import Card
 
 
 class TrickCard(Card):
-    def __init__(self, name: str, suit: str = "♠", rank: str = "A"):
-        super().__init__(name, suit, rank)
-        self.card_type = "trick"
+    __slots__ = ()
+    card_type = "trick"
+
+
+def _other_alive_seats(player, game, need_hand=False):
+    """其他存活角色的座位号（need_hand=True 时只取有手牌的）"""
+    return [(p.seat,) for p in game.players
+            if p is not player and p.is_alive and (p.hand or not need_hand)]
 
 
 class Dismantle(TrickCard):
     """过河拆桥"""
+    __slots__ = ()
+
     def __init__(self, suit="♠", rank="A"):
         super().__init__("过河拆桥", suit, rank)
 
+    def legal_targets(self, player, game):
+        return _other_alive_seats(player, game, need_hand=True)
+
     def use(self, player, targets, game):
         if not targets:
             return
@@ -20,14 +31,19 @@ class Dismantle(TrickCard):
             # 简化：弃置第一张手牌
             card = target.hand.pop(0)
             game.deck.discard(card)
-            game.log(f"{player.name} 使用【过河拆桥】弃置了 {target.name} 的一张牌")
+            game.record(gamelog.DISMANTLE, player.seat, value=target.seat)
 
 
 class Snatch(TrickCard):
     """顺手牵羊"""
+    __slots__ = ()
+
     def __init__(self, suit="♠", rank="A"):
         super().__init__("顺手牵羊", suit, rank)
 
+    def legal_targets(self, player, game):
+        return _other_alive_seats(player, game, need_hand=True)
+
     def use(self, player, targets, game):
         if not targets:
             return
@@ -35,31 +51,41 @@ class Snatch(TrickCard):
         if target.hand:
             card = target.hand.pop(0)
             player.hand.append(card)
-            game.log(f"{player.name} 使用【顺手牵羊】获得了 {target.name} 的一张牌")
+            game.record(gamelog.SNATCH, player.seat, value=target.seat)
 
 
 class ExNihilo(TrickCard):
     """无中生有"""
+    __slots__ = ()
+
     def __init__(self, suit="♠", rank="A"):
         super().__init__("无中生有", suit, rank)
 
     def use(self, player, targets, game):
         player.draw(game.deck, 2)
-        game.log(f"{player.name} 使用【无中生有】摸了2张牌")
+        game.record(gamelog.EX_NIHILO, player.seat)
 
 
 class Duel(TrickCard):
     """决斗"""
+    __slots__ = ()
+
     def __init__(self, suit="♠", rank="A"):
         super().__init__("决斗", suit, rank)
 
+    def legal_targets(self, player, game):
+        return _other_alive_seats(player, game)
+
     def use(self, player, targets, game):
         if not targets:
             return
         target = targets[0]
         # 简化：直接造成1点伤害
         target.hp -= 1
-        game.log(f"{player.name} 对 {target.name} 使用【决斗】，造成1点伤害")
+        game.record(gamelog.DUEL, player.seat, value=target.seat)
+        game.threats.hp_changed(target)
+        if game.has_listeners("damage"):
+            game.emit_event("damage", source=player, target=target, card=self)
         
         # 立即检查是否死亡
         game.check_death(target)
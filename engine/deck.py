@@ -1,4 +1,5 @@
 import random
+from engine.cards.registry import intern
 from engine.cards.basic import Slash, Dodge, Peach
 from engine.cards.trick import Dismantle, Snatch, ExNihilo, Duel
 from engine.cards.equip import (
@@ -8,78 +9,120 @@ from engine.cards.equip import (
 )
 
 
+SUITS = ["♠", "♥", "♣", "♦"]
+RANKS = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
+
+
+# ========== 牌堆组成 ==========
+# 牌堆组成是 (牌的类, 花色, 点数) 的列表，扩展包或自定义牌堆只需声明新的列表
+# 列表中可以有重复项（如超过52张的同名牌），每一项都是一张独立的牌
+
+def spread(cls, count):
+    """count 张同名牌，花色和点数依次轮换"""
+    return [(cls, SUITS[i % 4], RANKS[i % 13]) for i in range(count)]
+
+
+def composition_from_counts(counts):
+    """按 {牌的类: 张数} 生成牌堆组成（如只有基本牌的自定义牌堆）"""
+    composition = []
+    for cls, count in counts.items():
+        composition.extend(spread(cls, count))
+    return composition
+
+
+# 标准版基本牌：杀30、闪15、桃8
+BASIC = composition_from_counts({Slash: 30, Dodge: 15, Peach: 8})
+
+# 标准版锦囊牌：过河拆桥6、顺手牵羊5、无中生有4、决斗3
+TRICKS = (
+    [(Dismantle, "♠" if i < 3 else "♣", str(i + 3)) for i in range(6)]
+    + [(Snatch, "♠" if i < 3 else "♦", str(i + 3)) for i in range(5)]
+    + [(ExNihilo, "♥", str(i + 7)) for i in range(4)]
+    + [(Duel, "♠" if i < 2 else "♣", str(i + 1)) for i in range(3)]
+)
+
+# 标准版装备牌：武器3、防具2、+1马3、-1马3
+EQUIPS = [
+    (ZhuGeLianNu, "♦", "A"),
+    (QingGangJian, "♠", "6"),
+    (ZhangBaSheMao, "♠", "12"),
+    (BaGuaZhen, "♠", "2"),
+    (RenWangDun, "♣", "2"),
+    (ChiTu, "♥", "5"),
+    (DaWan, "♠", "13"),
+    (ZiXing, "♦", "13"),
+    (ZhuaHuangFeiDian, "♥", "13"),
+    (JueYing, "♠", "5"),
+    (DiLu, "♣", "5"),
+]
+
+# 标准版完整牌堆：基本牌53 + 锦囊18 + 装备11
+STANDARD = BASIC + TRICKS + EQUIPS
+
+
+class DeckTemplate:
+    """牌堆模板：由牌堆组成登记好的牌，每个进程只构建一次"""
+
+    def __init__(self, composition):
+        # 组成中重复的 (牌的类, 花色, 点数) 是不同的实体牌，按出现次数分别登记
+        seen = {}
+        cards = []
+        for key in composition:
+            copy = seen[key] = seen.get(key, -1) + 1
+            cards.append(intern(*key, copy))
+        self.cards = tuple(cards)
+
+    def __len__(self):
+        return len(self.cards)
+
+
+# 已构建的模板：id(组成列表) -> (组成列表, 模板)，保留组成列表的引用使id不会被复用
+_templates = {}
+
+
+def get_template(composition=STANDARD):
+    """取牌堆组成对应的模板，第一次使用时构建"""
+    entry = _templates.get(id(composition))
+    if entry is None:
+        entry = _templates[id(composition)] = (composition, DeckTemplate(composition))
+    return entry[1]
+
+
 class Deck:
-    def __init__(self):
+    def __init__(self, rng=None, template=None):
+        """template: 牌堆模板，默认为标准版"""
         self.cards = []
         self.discards = []
+        # 洗牌用的随机数生成器（每局游戏独立，便于按种子复现）
+        self.rng = rng if rng is not None else random.Random()
+        self.template = template
+
+    def reset(self, rng=None):
+        """从模板恢复牌堆并洗一次牌，清空弃牌堆（开新局时调用）"""
+        if rng is not None:
+            self.rng = rng
+        if self.template is None:
+            self.template = get_template()
+        self.cards = list(self.template.cards)
+        self.discards = []
+        self.rng.shuffle(self.cards)
 
     def build_basic(self):
         """标准版基本牌：杀30、闪15、桃8"""
-        suits = ["♠", "♥", "♣", "♦"]
-        ranks = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
-        
-        cards = []
-        # 杀 30张
-        for i in range(30):
-            cards.append(Slash(suits[i % 4], ranks[i % 13]))
-        # 闪 15张
-        for i in range(15):
-            cards.append(Dodge(suits[i % 4], ranks[i % 13]))
-        # 桃 8张
-        for i in range(8):
-            cards.append(Peach(suits[i % 4], ranks[i % 13]))
-        
-        self.cards = cards
-        random.shuffle(self.cards)
+        self.template = get_template(BASIC)
+        self.reset()
 
     def build_standard(self):
-        """标准版完整牌堆：基本牌53 + 锦囊35 + 装妇9"""
-        self.build_basic()
-        
-        # 添加锦囊牌
-        tricks = []
-        # 过河拆桥 6张
-        for i in range(6):
-            tricks.append(Dismantle("♠" if i < 3 else "♣", str(i + 3)))
-        # 顺手牵羊 5张
-        for i in range(5):
-            tricks.append(Snatch("♠" if i < 3 else "♦", str(i + 3)))
-        # 无中生有 4张
-        for i in range(4):
-            tricks.append(ExNihilo("♥", str(i + 7)))
-        # 决斗 3张
-        for i in range(3):
-            tricks.append(Duel("♠" if i < 2 else "♣", str(i + 1)))
-        
-        self.cards.extend(tricks)
-        
-        # 添加装备牌
-        equips = []
-        # 武器 3张
-        equips.append(ZhuGeLianNu("♦", "A"))
-        equips.append(QingGangJian("♠", "6"))
-        equips.append(ZhangBaSheMao("♠", "12"))
-        # 防具 2张
-        equips.append(BaGuaZhen("♠", "2"))
-        equips.append(RenWangDun("♣", "2"))
-        # +1马 3张
-        equips.append(ChiTu("♥", "5"))
-        equips.append(DaWan("♠", "13"))
-        equips.append(ZiXing("♦", "13"))
-        # -1马 3张
-        equips.append(ZhuaHuangFeiDian("♥", "13"))
-        equips.append(JueYing("♠", "5"))
-        equips.append(DiLu("♣", "5"))
-        
-        self.cards.extend(equips)
-        random.shuffle(self.cards)
+        """标准版完整牌堆：基本牌53 + 锦囊18 + 装备11"""
+        self.template = get_template(STANDARD)
+        self.reset()
 
     def draw(self):
         if not self.cards:
             # 牌堆耗尽，洗入弃牌堆
             self.cards = self.discards
             self.discards = []
-            random.shuffle(self.cards)
+            self.rng.shuffle(self.cards)
         return self.cards.pop()
 
     def discard(self, card):
@@ -0,0 +1,75 @@
+"""座位距离索引 - 缓存所有座位两两之间的距离，查询为O(1)
+
+距离 = 存活玩家围成的环上的最短距离 - 出发者的-1马 + 目标的+1马，最小为1。
+环形距离只在有玩家阵亡时变化，坐骑只影响出发者所在行或目标所在列，
+因此分开保存：
+    _ring[i][j]  存活座位之间的环形距离（阵亡时整体重算）
+    _minus[i]    座位i的-1马修正（装备变化时只更新这一项）
+    _plus[j]     座位j的+1马修正
+"""
+
+# 不可达距离（阵亡或不在本局的玩家）
+UNREACHABLE = 999
+
+
+class DistanceIndex:
+    """座位距离矩阵，装备坐骑或玩家阵亡时增量更新"""
+
+    def __init__(self, players):
+        self.players = players
+        n = len(players)
+        self._minus = [0] * n
+        self._plus = [0] * n
+        self._ring = None
+        for seat, player in enumerate(players):
+            self._update_horses(seat, player)
+        self._rebuild_ring()
+
+    def _update_horses(self, seat, player):
+        self._minus[seat] = 1 if player.equip.minus_horse is not None else 0
+        self._plus[seat] = 1 if player.equip.plus_horse is not None else 0
+
+    def _rebuild_ring(self):
+        """按存活座位重建环形距离（阵亡玩家的行和列为不可达）"""
+        n = len(self.players)
+        alive = [seat for seat, p in enumerate(self.players) if p.is_alive]
+        m = len(alive)
+        ring = [[UNREACHABLE] * n for _ in range(n)]
+        for pos_a, seat_a in enumerate(alive):
+            row = ring[seat_a]
+            for pos_b, seat_b in enumerate(alive):
+                d = abs(pos_a - pos_b)
+                row[seat_b] = min(d, m - d)
+        self._ring = ring
+
+    def snapshot(self):
+        """保存当前距离数据；环形距离矩阵只会整体替换、不会原地修改，可以直接共用"""
+        return (self._ring, tuple(self._minus), tuple(self._plus))
+
+    def restore(self, state):
+        """从 snapshot() 的结果恢复"""
+        ring, minus, plus = state
+        self._ring = ring
+        self._minus[:] = minus
+        self._plus[:] = plus
+
+    def equip_changed(self, player):
+        """玩家装备区变化（装备、替换坐骑）后调用，只更新该玩家的修正"""
+        self._update_horses(player.seat, player)
+
+    def player_died(self, player):
+        """玩家阵亡后调用，重算环形距离"""
+        self._rebuild_ring()
+
+    def distance(self, a, b):
+        """a 计算与 b 的距离"""
+        ia, ib = a.seat, b.seat
+        base = self._ring[ia][ib]
+        if base >= UNREACHABLE:
+            return UNREACHABLE
+        d = base - self._minus[ia] + self._plus[ib]
+        return d if d > 1 else 1
+
+    def in_range(self, a, b, attack_range):
+        """b 是否在 a 的攻击范围内"""
+        return a is not b and self.distance(a, b) <= attack_range
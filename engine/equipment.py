@@ -0,0 +1,84 @@
+"""装备区 - 武器、防具、+1马、-1马四个槽位，O(1)访问并缓存派生属性"""
+
+# 槽位顺序（遍历装备区时按此顺序）
+SLOTS = ("weapon", "armor", "plus_horse", "minus_horse")
+
+# 默认攻击范围（没有武器时）
+DEFAULT_ATTACK_RANGE = 1
+
+
+class EquipArea:
+    """玩家的装备区
+
+    每个槽位最多一张装备牌，通过 put()/remove() 修改，
+    修改时同步更新派生属性：
+        attack_range     攻击范围
+        unlimited_slash  出牌阶段使用【杀】无次数限制（诸葛连弩）
+        armor_effect     防具效果（防具牌名，如"八卦阵"），没有防具时为None
+    可以像列表一样遍历、判断是否为空。
+    """
+
+    __slots__ = ("weapon", "armor", "plus_horse", "minus_horse",
+                 "attack_range", "unlimited_slash", "armor_effect")
+
+    def __init__(self):
+        self.weapon = None
+        self.armor = None
+        self.plus_horse = None
+        self.minus_horse = None
+        self._update_stats()
+
+    def _update_stats(self):
+        weapon = self.weapon
+        self.attack_range = getattr(weapon, "attack_range", DEFAULT_ATTACK_RANGE)
+        self.unlimited_slash = weapon is not None and weapon.name == "诸葛连弩"
+        self.armor_effect = self.armor.name if self.armor is not None else None
+
+    def put(self, card):
+        """把装备牌放入对应槽位，返回被替换下来的旧装备（没有则为None）"""
+        slot = card.equip_type
+        old = getattr(self, slot)
+        setattr(self, slot, card)
+        self._update_stats()
+        return old
+
+    def remove(self, card):
+        """从装备区移除一张装备牌"""
+        slot = card.equip_type
+        if getattr(self, slot) is not card:
+            raise ValueError(f"{card} 不在装备区中")
+        setattr(self, slot, None)
+        self._update_stats()
+
+    def snapshot(self):
+        """四个槽位的装备（用于 GameState 快照）"""
+        return (self.weapon, self.armor, self.plus_horse, self.minus_horse)
+
+    def restore(self, slots):
+        """从 snapshot() 的结果恢复"""
+        self.weapon, self.armor, self.plus_horse, self.minus_horse = slots
+        self._update_stats()
+
+    def get(self, slot):
+        """按槽位名取装备"""
+        return getattr(self, slot)
+
+    def __iter__(self):
+        for slot in SLOTS:
+            card = getattr(self, slot)
+            if card is not None:
+                yield card
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __bool__(self):
+        return (self.weapon is not None or self.armor is not None
+                or self.plus_horse is not None or self.minus_horse is not None)
+
+    def __contains__(self, card):
+        slot = getattr(card, "equip_type", None)
+        return slot in SLOTS and getattr(self, slot) is card
+
+    def __repr__(self):
+        return f"<EquipArea {[card.name for card in self]}>"
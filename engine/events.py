@@ -1,10 +1,74 @@
+"""事件总线 - 支持优先级、一次性监听、取消订阅和通配监听
+
+没有监听者的事件不会出现在 _subs 中，has_subscribers() 只是一次字典查找，
+发送方可以先检查再构造参数（见 Game.emit_event 的调用处）。
+"""
+
+# 通配事件名：监听所有事件，处理函数额外收到事件名 handler(event_name, **kwargs)
+WILDCARD = "*"
+
+
+class Subscription:
+    """订阅凭证，传给 EventBus.off() 取消订阅"""
+    __slots__ = ("event_name", "handler", "priority", "once", "seq")
+
+    def __init__(self, event_name, handler, priority, once, seq):
+        self.event_name = event_name
+        self.handler = handler
+        self.priority = priority
+        self.once = once
+        self.seq = seq
+
+
 class EventBus:
     def __init__(self):
+        # 事件名 -> 订阅元组（按优先级从高到低，同优先级按订阅顺序），发送时无需复制
         self._subs = {}
+        self._wildcard = ()
+        self._seq = 0
+
+    def on(self, event_name: str, handler, priority=0, once=False):
+        """订阅事件，priority 越大越先执行，once=True 时只执行一次；返回订阅凭证"""
+        sub = Subscription(event_name, handler, priority, once, self._seq)
+        self._seq += 1
+        subs = self._get(event_name) + (sub,)
+        self._set(event_name, tuple(sorted(subs, key=lambda s: (-s.priority, s.seq))))
+        return sub
+
+    def once(self, event_name: str, handler, priority=0):
+        """订阅事件，只执行一次"""
+        return self.on(event_name, handler, priority, once=True)
+
+    def off(self, subscription):
+        """取消订阅"""
+        subs = self._get(subscription.event_name)
+        self._set(subscription.event_name, tuple(s for s in subs if s is not subscription))
+
+    def _get(self, event_name):
+        if event_name == WILDCARD:
+            return self._wildcard
+        return self._subs.get(event_name, ())
+
+    def _set(self, event_name, subs):
+        if event_name == WILDCARD:
+            self._wildcard = subs
+        elif subs:
+            self._subs[event_name] = subs
+        else:
+            self._subs.pop(event_name, None)
 
-    def on(self, event_name: str, handler):
-        self._subs.setdefault(event_name, []).append(handler)
+    def has_subscribers(self, event_name: str):
+        """是否有人监听该事件（包括通配监听）"""
+        return event_name in self._subs or bool(self._wildcard)
 
     def emit(self, event_name: str, **kwargs):
-        for h in self._subs.get(event_name, []):
-            h(**kwargs)
+        subs = self._subs.get(event_name)
+        if subs:
+            for sub in subs:
+                if sub.once:
+                    self.off(sub)
+                sub.handler(**kwargs)
+        for sub in self._wildcard:
+            if sub.once:
+                self.off(sub)
+            sub.handler(event_name, **kwargs)
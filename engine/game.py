@@ -1,9 +1,27 @@
+import random
+from contextlib import contextmanager
+
 from engine.deck import Deck
 from engine.player import Player
 from engine.events import EventBus
-from engine.hero import get_random_heroes
+from engine.hero import get_random_heroes, SkillIndex
 from engine.ai import AIController
 from engine.response import ResponseSystem
+from engine.distance import DistanceIndex
+from engine.belief import ThreatModel
+from engine.state import GameState
+from engine import gamelog
+from engine.gamelog import GameLog, FileSink, CallbackSink
+from engine.turn import TurnScheduler, play_phase_done
+from engine.profiling import PhaseProfiler
+
+
+def _ignore(*args, **kwargs):
+    pass
+
+
+def _no_listeners(event_name):
+    return False
 
 
 def get_role_config(player_count):
@@ -21,25 +39,74 @@ def get_role_config(player_count):
 
 
 class Game:
-    def __init__(self, players):
+    def __init__(self, players, verbose=True, seed=None, rng=None, log_sinks=None, deck_template=None,
+                 ai_factory=AIController, profiler=None, recorder=None):
+        """
+        verbose: 是否输出日志到终端（无界面模拟时关闭）
+        seed: 随机种子，相同种子（和相同的玩家配置）可以复现整局游戏
+        rng: 直接指定随机数生成器（如与选将共用），优先于seed
+        log_sinks: 额外的日志接收器，在第一个回合开始前挂上
+        deck_template: 牌堆模板（engine.deck.get_template），默认为标准版完整牌堆
+        ai_factory: AI控制器的类（或 factory(player, game) 函数），如 engine.mcts.MCTSController
+        profiler: 按阶段统计耗时（engine.profiling.PhaseProfiler），在第一个回合开始前装上
+        recorder: 对局录像（engine.replay.ReplayRecorder），记录初始状态和之后的所有决策
+        """
         self.players = players
-        self.deck = Deck()
-        self.deck.build_standard()  # 使用完整牌堆
+        for seat, player in enumerate(players):
+            player.seat = seat
+        
+        # 结构化日志：记录以元组保存，由接收器按需格式化
+        self.logger = GameLog(players)
+        if verbose:
+            self.logger.add_sink(FileSink())
+        for sink in log_sinks or ():
+            self.logger.add_sink(sink)
+        # 记录一条结构化日志：record(事件码, 行动者座位号, 卡牌, 值)
+        self.record = self.logger.emit
+        
+        # 本局专用的随机数生成器，牌堆洗牌、判定和AI都从这里取随机数，不使用全局random
+        self.seed = seed
+        self.rng = rng if rng is not None else random.Random(seed)
+        initial_rng_state = self.rng.getstate() if recorder is not None else None
+        self.deck = Deck(self.rng, deck_template)
+        self.deck.reset()  # 从模板恢复牌堆并洗牌
+        # 技能触发索引：事件名 -> 座位号 -> 技能
+        self.skills = SkillIndex(self.players)
+        # 座位距离矩阵，装备坐骑或有人阵亡时增量更新
+        self.distances = DistanceIndex(self.players)
         self.turn_index = 0
         self.current_player = self.players[self.turn_index]
         self.event_bus = EventBus()
+        # 是否有人监听某事件：发送前先检查，没人监听时连参数都不构造
+        self.has_listeners = self.event_bus.has_subscribers
         self.phase = "idle"  # idle, prepare, judge, draw, play, discard
         self.log_callback = None  # UI日志回调
         
-        # AI控制器
+        # AI控制器（共用身份推断和威胁排序）
+        self.threats = ThreatModel(self)
         self.ai_controllers = {}
         for player in self.players:
             if player.is_ai:
-                self.ai_controllers[player] = AIController(player, self)
+                self.ai_controllers[player] = ai_factory(player, self)
         
         # 响应系统
         self.response_system = ResponseSystem(self)
         
+        # 回合调度器
+        self.scheduler = TurnScheduler(self)
+        
+        # 撤销栈：apply() 前保存的快照
+        self.undo_stack = []
+        # 搜索类AI正在试走（此时所有AI都按贪心策略行动，避免嵌套搜索）
+        self.searching = False
+        
+        # 按阶段统计耗时（默认关闭，关闭时没有开销）
+        self.profiler = None
+        if profiler is not None:
+            self.enable_profiling(profiler)
+        if recorder is not None:
+            recorder.install(self, initial_rng_state)
+        
         # 发初始手牌
         for p in self.players:
             p.draw(self.deck, 4)
@@ -48,57 +115,88 @@ class Game:
         self.start_turn()
     
     def set_log_callback(self, callback):
-        """设置UI日志回调函数"""
-        self.log_callback = callback
+        """设置UI日志回调函数（替换之前设置的回调）"""
+        if self.log_callback:
+            self.logger.remove_sink(self.log_callback)
+        self.log_callback = self.logger.add_sink(CallbackSink(callback)) if callback else None
+    
+    def enable_profiling(self, profiler=None):
+        """开始按阶段统计耗时，返回 PhaseProfiler（见 engine.profiling）"""
+        self.disable_profiling()
+        self.profiler = profiler if profiler is not None else PhaseProfiler()
+        self.profiler.install(self)
+        return self.profiler
+    
+    def disable_profiling(self):
+        """停止统计，恢复未插桩的方法（已有的统计数据保留在 profiler 中）"""
+        if self.profiler is not None:
+            self.profiler.uninstall()
+            self.profiler = None
     
     def log(self, message):
-        """记录日志，同时输出到终端和UI"""
-        print(message)
-        if self.log_callback:
-            self.log_callback(message)
+        """记录一条自由文本日志（热路径请使用 record）"""
+        self.record(gamelog.TEXT, value=message)
 
     def emit_event(self, event_name, **kwargs):
-        """发送事件"""
+        """发送事件（热路径上先用 has_listeners 检查，避免构造参数）"""
         self.event_bus.emit(event_name, game=self, **kwargs)
 
     def start_turn(self):
-        """开始一个新回合（准备-判定-摘牌-出牌-弃牌）"""
-        self.log(f"\n===== {self.current_player.name} 的回合 =====")
-        
-        # 1. 准备阶段
+        """开始一个新回合（准备-判定-摘牌-出牌），出牌阶段结束或等待玩家出牌时返回"""
+        self.scheduler.run_until(play_phase_done)
+
+    def prepare_phase(self):
+        """准备阶段"""
+        self.record(gamelog.TURN_START, self.current_player.seat)
         self.phase = "prepare"
-        self.log(f"[准备阶段]")
-        self.emit_event("prepare_phase", player=self.current_player)
+        self.record(gamelog.PHASE_PREPARE)
+        if self.has_listeners("prepare_phase"):
+            self.emit_event("prepare_phase", player=self.current_player)
         # TODO: 触发观星等准备阶段技能
-        
-        # 2. 判定阶段
+        return "judge"
+
+    def judge_phase(self):
+        """判定阶段"""
         self.phase = "judge"
-        self.log(f"[判定阶段]")
-        self.emit_event("judge_phase", player=self.current_player)
+        self.record(gamelog.PHASE_JUDGE)
+        if self.has_listeners("judge_phase"):
+            self.emit_event("judge_phase", player=self.current_player)
         # TODO: 处理延时锦囊（乐不思蜀、闪电等）
-        
-        # 3. 摘牌阶段
+        return "draw"
+
+    def draw_phase(self):
+        """摸牌阶段"""
         self.phase = "draw"
-        self.log(f"[摘牌阶段]")
+        self.record(gamelog.PHASE_DRAW)
         self.current_player.draw(self.deck, 2)
-        self.log(f"{self.current_player.name} 摘了2张牌")
-        self.emit_event("draw_phase", player=self.current_player)
-        
-        # 4. 出牌阶段
+        self.record(gamelog.DRAW, self.current_player.seat, value=2)
+        if self.has_listeners("draw_phase"):
+            self.emit_event("draw_phase", player=self.current_player)
+        return "play"
+
+    def play_phase(self):
+        """出牌阶段：AI自动出牌，人类玩家等待UI操作"""
         self.phase = "play"
-        self.log(f"[出牌阶段]")
-        self.emit_event("play_phase", player=self.current_player)
+        self.record(gamelog.PHASE_PLAY)
+        if self.has_listeners("play_phase"):
+            self.emit_event("play_phase", player=self.current_player)
         
-        # 如果是AI玩家，自动执行
         if self.current_player.is_ai:
             self.ai_play_turn()
+        else:
+            # 等待玩家点击"结束回合"（由next_turn继续调度）
+            self.scheduler.waiting = True
+        return "discard"
 
     def use_card(self, card_index, target_indices=None):
         """当前玩家使用手牌"""
         if card_index < 0 or card_index >= len(self.current_player.hand):
             return False
         
-        card = self.current_player.hand[card_index]
+        return self.play_card(self.current_player.hand[card_index], target_indices)
+
+    def play_card(self, card, target_indices=None):
+        """当前玩家使用一张手牌（AI直接传入牌，不经过下标）"""
         targets = []
         if target_indices:
             for idx in target_indices:
@@ -107,37 +205,98 @@ class Game:
         
         return self.current_player.use_card(card, targets, self)
 
+    def legal_actions(self, player=None):
+        """当前阶段该玩家所有合法的 (牌, 目标座位号列表)，不修改状态也不记录日志
+
+        只有当前玩家在出牌阶段可以主动出牌，其他情况返回空列表。
+        """
+        player = player or self.current_player
+        if self.phase != "play" or player is not self.current_player or not player.is_alive:
+            return []
+        actions = []
+        for card in player.hand:
+            if not card.can_use(player, self):
+                continue
+            for targets in card.legal_targets(player, self):
+                actions.append((card, list(targets)))
+        return actions
+
+    def is_legal_action(self, card, target_indices=None, player=None):
+        """检查一次出牌是否合法（如UI点击出牌前预先校验），不需要目标的牌忽略所选目标"""
+        player = player or self.current_player
+        if self.phase != "play" or player is not self.current_player or not player.is_alive:
+            return False
+        if card not in player.hand or not card.can_use(player, self):
+            return False
+        legal = card.legal_targets(player, self)
+        return () in legal or tuple(target_indices or ()) in legal
+
+    def snapshot(self):
+        """保存当前对局状态（不含UI回调、事件总线、AI控制器）"""
+        return GameState(self)
+
+    def restore(self, state):
+        """恢复到 snapshot() 保存的状态"""
+        state.restore(self)
+
+    def apply(self, card, target_indices=None):
+        """保存快照后出牌，之后可用 undo() 撤销（搜索类AI试走用）"""
+        self.undo_stack.append(GameState(self))
+        return self.play_card(card, target_indices)
+
+    def undo(self):
+        """撤销最近一次 apply()"""
+        self.undo_stack.pop().restore(self)
+
+    @contextmanager
+    def silenced(self):
+        """在此范围内不记录日志、不发送事件（搜索类AI试走时使用，避免惊动UI）"""
+        record, has_listeners = self.record, self.has_listeners
+        self.record = _ignore
+        self.has_listeners = _no_listeners
+        try:
+            yield self
+        finally:
+            self.record, self.has_listeners = record, has_listeners
+
     def next_turn(self):
-        """结束当前回合，进入下一个玩家的回合"""
-        # 弃牌阶段：手牌数不能超过体力值
+        """结束当前回合，进入下一个玩家的回合
+
+        依次执行弃牌、回合结束阶段，然后推进到下一个玩家的出牌阶段结束；
+        如果需要人类玩家弃牌或出牌，则在该处暂停。
+        """
+        self.scheduler.resume()
+        self.scheduler.run_until(play_phase_done)
+
+    def discard_phase(self):
+        """弃牌阶段：手牌数不能超过体力值"""
+        self.phase = "discard"
         discard_count = len(self.current_player.hand) - self.current_player.hp
         if discard_count > 0:
-            self.log(f"{self.current_player.name} 需要弃置 {discard_count} 张牌")
+            self.record(gamelog.DISCARD_NEEDED, self.current_player.seat, value=discard_count)
             
             if self.current_player.is_ai:
-                # AI自动弃牌：弃置最后的牌
-                discarded_cards = []
-                for _ in range(discard_count):
-                    if len(self.current_player.hand) > 0:
-                        card = self.current_player.hand.pop()
-                        self.deck.discard(card)
-                        discarded_cards.append(card.name)
-                self.log(f"{self.current_player.name} 弃置了：{', '.join(discarded_cards)}")
+                # AI自动弃牌：由AI控制器选择价值最低的牌
+                discarded_cards = self.ai_controllers[self.current_player].choose_discards(discard_count)
+                for card in discarded_cards:
+                    self.current_player.hand.remove(card)
+                    self.deck.discard(card)
+                self.record(gamelog.DISCARDED, self.current_player.seat, value=tuple(discarded_cards))
             else:
                 # 玩家需要选择弃牌，触发事件
-                self.emit_event("discard_phase", player=self.current_player, count=discard_count)
-                # 注意：UI会处理这个事件，不在这里自动弃牌
-                return  # 等待UI处理完毕后调用finish_turn
-        
-        # 如果不需要弃牌，直接结束回合
-        self.finish_turn()
+                # 注意：UI会处理这个事件，弃牌后调用discard_cards继续调度
+                self.scheduler.waiting = True
+                if self.has_listeners("discard_phase"):
+                    self.emit_event("discard_phase", player=self.current_player, count=discard_count)
+        return "finish"
     
     def finish_turn(self):
-        """完成回合结束，切换到下一个玩家"""
+        """回合结束阶段：切换到下一个玩家"""
         # 检查玩家是否死亡
         if self.current_player.hp <= 0:
             self.current_player.is_alive = False
-            self.log(f">>> {self.current_player.name} 阵亡了！<<<")
+            self.distances.player_died(self.current_player)
+            self.record(gamelog.DEATH, self.current_player.seat)
         
         # 重置回合状态
         self.current_player.reset_turn()
@@ -157,16 +316,13 @@ class Game:
         alive_players = self.get_alive_players()
         if len(alive_players) <= 1:
             if len(alive_players) == 1:
-                self.log(f"\n\n★★★ 游戏结束！{alive_players[0].name} 获胜！★★★")
+                self.record(gamelog.GAME_OVER_SOLE, alive_players[0].seat)
             else:
-                self.log(f"\n\n游戏结束！")
+                self.record(gamelog.GAME_OVER_EMPTY)
             self.phase = "game_over"
-            return
-        
-        self.phase = "idle"
-        
-        # 开始新回合
-        self.start_turn()
+        else:
+            self.phase = "idle"
+        return "prepare"
     
     def discard_cards(self, card_indices):
         """弃置指定的牌（由UI调用）"""
@@ -178,39 +334,18 @@ class Game:
             if 0 <= idx < len(self.current_player.hand):
                 card = self.current_player.hand.pop(idx)
                 self.deck.discard(card)
-                discarded_cards.append(card.name)
+                discarded_cards.append(card)
         
         if discarded_cards:
-            self.log(f"{self.current_player.name} 弃置了：{', '.join(discarded_cards)}")
+            self.record(gamelog.DISCARDED, self.current_player.seat, value=tuple(discarded_cards))
         
         # 继续完成回合
-        self.finish_turn()
+        self.next_turn()
     
     def distance(self, a: Player, b: Player):
-        """距离计算：环形最短距离 + 装备修正（+1马、-1马）"""
-        try:
-            n = len(self.players)
-            ia = next(i for i, p in enumerate(self.players) if p is a)
-            ib = next(i for i, p in enumerate(self.players) if p is b)
-            d = abs(ia - ib)
-            base_dist = min(d, n - d)
-            
-            # 装备修正
-            # a的-1马：计算与a的距离-1
-            for eq in a.equip:
-                if hasattr(eq, 'equip_type') and eq.equip_type == "minus_horse":
-                    base_dist -= 1
-                    break
-            
-            # b的+1马：计算与b的距离+1
-            for eq in b.equip:
-                if hasattr(eq, 'equip_type') and eq.equip_type == "plus_horse":
-                    base_dist += 1
-                    break
-            
-            return max(1, base_dist)  # 距离最小为1
-        except StopIteration:
-            return 999
+        """距离计算：存活玩家的环形最短距离 + 装备修正（+1马、-1马），查询缓存的距离矩阵"""
+        return self.distances.distance(a, b)
+
     def ai_play_turn(self):
         """执行AI回合"""
         ai = self.ai_controllers.get(self.current_player)
@@ -270,15 +405,14 @@ class Game:
         winner_name = role_names.get(winner_role, "未知")
         
         if winner_role == "draw":
-            self.log(f"\n\n★★★ 游戏结束！平局！★★★")
+            self.record(gamelog.GAME_OVER_DRAW)
         else:
-            self.log(f"\n\n★★★ 游戏结束！{winner_name}获胜！★★★")
+            self.record(gamelog.GAME_OVER_WINNER, value=winner_name)
             
             # 显示获胜玩家
             winners = [p for p in self.players if p.is_alive and (p.role == winner_role or (winner_role == "lord" and p.role == "loyalist"))]
             if winners:
-                winner_list = ", ".join([p.name for p in winners])
-                self.log(f"获胜玩家：{winner_list}")
+                self.record(gamelog.WINNERS, value=tuple(p.seat for p in winners))
         
         self.phase = "game_over"
     
@@ -288,22 +422,22 @@ class Game:
             # TODO: 这里应该让玩家选择是否使用桃，简化为自动使用
             # 检查是否有桃
             from engine.cards.basic import Peach
-            peach_index = None
-            for i, card in enumerate(player.hand):
-                if isinstance(card, Peach):
-                    peach_index = i
-                    break
+            peach = player.hand.first(Peach)
             
-            if peach_index is not None:
+            if peach is not None:
                 # 自动使用桃
-                self.log(f"{player.name} 体力归零，自动使用【桃】救命！")
-                peach = player.hand.pop(peach_index)
+                self.record(gamelog.DYING_PEACH, player.seat)
+                player.hand.remove(peach)
                 player.hp = min(player.hp + 1, player.max_hp)
                 self.deck.discard(peach)
+                self.threats.hp_changed(player)
+                if self.has_listeners("peach_used"):
+                    self.emit_event("peach_used", player=player, card=peach)
             else:
                 # 死亡
                 player.is_alive = False
-                self.log(f">>> {player.name} 阵亡了！<<<")
+                self.distances.player_died(player)
+                self.record(gamelog.DEATH, player.seat)
                 
                 # 检查游戏是否结束
                 winner_role = self.check_game_over()
@@ -311,13 +445,14 @@ class Game:
                     self.announce_winner(winner_role)
 
 
-def setup_demo_game():
-    """4人局：1个玩家 + 3个AI"""
-    heroes = get_random_heroes(4)
+def setup_demo_game(seed=None, verbose=True):
+    """4人局：1个玩家 + 3个AI（verbose 同 Game）"""
+    rng = random.Random(seed)
+    heroes = get_random_heroes(4, rng)
     players = [
         Player(f"{heroes[0].name}", heroes[0].hp, heroes[0], is_ai=False),  # 玩家
         Player(f"{heroes[1].name}", heroes[1].hp, heroes[1], is_ai=True),   # AI
         Player(f"{heroes[2].name}", heroes[2].hp, heroes[2], is_ai=True),   # AI
         Player(f"{heroes[3].name}", heroes[3].hp, heroes[3], is_ai=True),   # AI
     ]
-    return Game(players)
+    return Game(players, verbose=verbose, rng=rng)
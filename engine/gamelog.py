@@ -0,0 +1,256 @@
+"""结构化游戏日志
+
+每条日志记录是一个紧凑元组 (事件码, 行动者座位号, 卡牌, 值)，
+只有在日志接收器真正需要输出文本时才格式化。
+没有接收器或级别低于过滤级别的记录在 emit() 入口处直接丢弃，
+无界面模拟时日志几乎没有开销。
+"""
+import sys
+from collections import deque
+
+
+# ========== 日志级别 ==========
+
+DEBUG = 10  # 阶段提示、AI思考等
+INFO = 20  # 出牌、伤害、响应、阵亡等
+WARNING = 30  # 非法操作
+OFF = 100  # 关闭日志
+
+
+# ========== 事件码 ==========
+# 模板可用字段：
+#   {actor}   行动者名字（由座位号解析）
+#   {card}    卡牌对象，如 {card.name}、{card.suit}{card.rank}
+#   {value}   附加值，元组时可用 {value[1]}
+#   {target}  目标名字（value 为座位号，或元组的第一个元素为座位号）
+#   {cards}   卡牌名列表（value 为卡牌元组）
+#   {players} 玩家名列表（value 为座位号元组）
+
+TEXT = 0  # 自由文本，value 为已格式化的字符串
+TURN_START = 1
+PHASE_PREPARE = 2
+PHASE_JUDGE = 3
+PHASE_DRAW = 4
+PHASE_PLAY = 5
+DRAW = 6
+DISCARD_NEEDED = 7
+DISCARDED = 8
+DEATH = 9
+GAME_OVER_SOLE = 10
+GAME_OVER_EMPTY = 11
+GAME_OVER_DRAW = 12
+GAME_OVER_WINNER = 13
+WINNERS = 14
+DYING_PEACH = 15
+NOT_IN_HAND = 16
+CANNOT_USE = 17
+AI_THINK = 18
+AI_END = 19
+EQUIP = 20
+EQUIP_REPLACE = 21
+SKILL_PAOXIAO = 22
+SLASH = 23
+SLASH_ZHUGE = 24
+SLASH_OUT_OF_RANGE = 25
+SLASH_DODGED = 26
+DAMAGE = 27
+PEACH = 28
+DISMANTLE = 29
+SNATCH = 30
+EX_NIHILO = 31
+DUEL = 32
+BAGUA_JUDGE = 33
+JUDGE_SUCCESS = 34
+JUDGE_FAIL = 35
+RESPONSE = 36
+NO_RESPONSE = 37
+RENWANG = 38
+JIANXIONG = 39
+
+# 事件码 -> (级别, 模板)
+MESSAGES = {
+    TEXT: (INFO, "{value}"),
+    TURN_START: (INFO, "\n===== {actor} 的回合 ====="),
+    PHASE_PREPARE: (DEBUG, "[准备阶段]"),
+    PHASE_JUDGE: (DEBUG, "[判定阶段]"),
+    PHASE_DRAW: (DEBUG, "[摘牌阶段]"),
+    PHASE_PLAY: (DEBUG, "[出牌阶段]"),
+    DRAW: (INFO, "{actor} 摘了{value}张牌"),
+    DISCARD_NEEDED: (INFO, "{actor} 需要弃置 {value} 张牌"),
+    DISCARDED: (INFO, "{actor} 弃置了：{cards}"),
+    DEATH: (INFO, ">>> {actor} 阵亡了！<<<"),
+    GAME_OVER_SOLE: (INFO, "\n\n★★★ 游戏结束！{actor} 获胜！★★★"),
+    GAME_OVER_EMPTY: (INFO, "\n\n游戏结束！"),
+    GAME_OVER_DRAW: (INFO, "\n\n★★★ 游戏结束！平局！★★★"),
+    GAME_OVER_WINNER: (INFO, "\n\n★★★ 游戏结束！{value}获胜！★★★"),
+    WINNERS: (INFO, "获胜玩家：{players}"),
+    DYING_PEACH: (INFO, "{actor} 体力归零，自动使用【桃】救命！"),
+    NOT_IN_HAND: (WARNING, "错误：{card} 不在手牌中"),
+    CANNOT_USE: (WARNING, "错误：不能使用 {card}"),
+    AI_THINK: (DEBUG, "[AI] {actor} 开始思考..."),
+    AI_END: (DEBUG, "[AI] {actor} 结束出牌"),
+    EQUIP: (INFO, "{actor} 装备了【{card.name}】"),
+    EQUIP_REPLACE: (INFO, "{actor} 替换了【{card.name}】"),
+    SKILL_PAOXIAO: (INFO, "{actor} 发动【{value}】，可以无限使用【杀】"),
+    SLASH: (INFO, "{actor} 对 {target} 使用了【杀】（距离 {value[1]}，范围 {value[2]}）"),
+    SLASH_ZHUGE: (INFO, "{actor} 对 {target} 使用了【杀】 (诸葛连弩)（距离 {value[1]}，范围 {value[2]}）"),
+    SLASH_OUT_OF_RANGE: (INFO, "{actor} 对 {target} 使用【杀】失败：目标超出攻击范围（距离 {value[1]}，范围 {value[2]}）"),
+    SLASH_DODGED: (INFO, "{actor} 使用了【闪】抵消了攻击"),
+    DAMAGE: (INFO, "{actor} 受到了1点伤害，剩余体力: {value}"),
+    PEACH: (INFO, "{actor} 使用了【桃】，回复1点体力"),
+    DISMANTLE: (INFO, "{actor} 使用【过河拆桥】弃置了 {target} 的一张牌"),
+    SNATCH: (INFO, "{actor} 使用【顺手牵羊】获得了 {target} 的一张牌"),
+    EX_NIHILO: (INFO, "{actor} 使用【无中生有】摸了2张牌"),
+    DUEL: (INFO, "{actor} 对 {target} 使用【决斗】，造成1点伤害"),
+    BAGUA_JUDGE: (INFO, "{actor} 发动【八卦阵】，判定牌为 {card.suit}{card.rank}"),
+    JUDGE_SUCCESS: (INFO, "判定成功，视为使用了【闪】"),
+    JUDGE_FAIL: (INFO, "判定失败"),
+    RESPONSE: (INFO, "{actor} 使用了【{card.name}】进行响应"),
+    NO_RESPONSE: (INFO, "{actor} 没有响应"),
+    RENWANG: (INFO, "{actor} 的【仁王盾】生效，黑色【杀】无效"),
+    JIANXIONG: (INFO, "{actor} 发动【奸雄】，获得了造成伤害的牌"),
+}
+
+# 按事件码索引的级别表，emit() 热路径上只做一次列表下标
+_LEVELS = [OFF] * (max(MESSAGES) + 1)
+for _code, (_level, _template) in MESSAGES.items():
+    _LEVELS[_code] = _level
+
+
+class GameLog:
+    """游戏日志：过滤并分发记录到各个接收器"""
+
+    def __init__(self, players, level=DEBUG):
+        self.players = players
+        self.sinks = []
+        self._level = level
+        self._threshold = OFF  # 实际生效的过滤级别（没有接收器时为OFF）
+
+    @property
+    def level(self):
+        return self._level
+
+    @level.setter
+    def level(self, value):
+        self._level = value
+        self._update_threshold()
+
+    def add_sink(self, sink):
+        """添加日志接收器"""
+        self.sinks.append(sink)
+        self._update_threshold()
+        return sink
+
+    def remove_sink(self, sink):
+        """移除日志接收器"""
+        if sink in self.sinks:
+            self.sinks.remove(sink)
+        self._update_threshold()
+
+    def _update_threshold(self):
+        if self.sinks:
+            self._threshold = max(self._level, min(s.level for s in self.sinks))
+        else:
+            self._threshold = OFF
+
+    def enabled(self, code):
+        """该事件码的记录是否会被输出（调用方可据此跳过昂贵的参数准备）"""
+        return _LEVELS[code] >= self._threshold
+
+    def emit(self, code, actor=None, card=None, value=None):
+        """记录一条日志（不格式化）"""
+        level = _LEVELS[code]
+        if level < self._threshold:
+            return
+        record = (code, actor, card, value)
+        for sink in self.sinks:
+            if level >= sink.level:
+                sink.write(record, self)
+
+    def format(self, record):
+        """把记录格式化为文本"""
+        code, actor, card, value = record
+        template = MESSAGES[code][1]
+        if code == TEXT:
+            return value
+
+        fields = {"card": card, "value": value}
+        if actor is not None:
+            fields["actor"] = self.players[actor].name
+        if "{target" in template:
+            seat = value[0] if isinstance(value, tuple) else value
+            fields["target"] = self.players[seat].name
+        if "{cards" in template:
+            fields["cards"] = ", ".join(c.name for c in value)
+        if "{players" in template:
+            fields["players"] = ", ".join(self.players[seat].name for seat in value)
+        return template.format(**fields)
+
+
+# ========== 日志接收器 ==========
+
+class LogSink:
+    """日志接收器基类"""
+
+    def __init__(self, level=DEBUG):
+        self.level = level
+
+    def write(self, record, log):
+        """接收一条记录，log.format(record) 可得到文本"""
+        pass
+
+
+class NullSink(LogSink):
+    """丢弃所有记录"""
+
+    def __init__(self):
+        super().__init__(OFF)
+
+
+class RingBufferSink(LogSink):
+    """保存最近 capacity 条原始记录，需要时再格式化（便于事后排查）"""
+
+    def __init__(self, capacity=1000, level=DEBUG):
+        super().__init__(level)
+        self.records = deque(maxlen=capacity)
+        self._log = None
+
+    def write(self, record, log):
+        self._log = log
+        self.records.append(record)
+
+    def lines(self):
+        """格式化所有保存的记录"""
+        if self._log is None:
+            return []
+        return [self._log.format(record) for record in self.records]
+
+
+class FileSink(LogSink):
+    """输出到文件或流（如 sys.stdout）"""
+
+    def __init__(self, file=None, level=DEBUG):
+        """file: 文件路径或可写的流，None 表示写入时的 sys.stdout"""
+        super().__init__(level)
+        self._owned = isinstance(file, str)
+        if self._owned:
+            file = open(file, "a", encoding="utf-8")
+        self.file = file
+
+    def write(self, record, log):
+        (self.file or sys.stdout).write(log.format(record) + "\n")
+
+    def close(self):
+        if self._owned:
+            self.file.close()
+
+
+class CallbackSink(LogSink):
+    """把格式化后的文本交给回调函数（如UI日志窗口）"""
+
+    def __init__(self, callback, level=DEBUG):
+        super().__init__(level)
+        self.callback = callback
+
+    def write(self, record, log):
+        self.callback(log.format(record))
@@ -0,0 +1,123 @@
+"""手牌容器 - 保持摸牌顺序，并按牌的类建立索引"""
+
+
+class Hand:
+    """玩家手牌
+
+    牌按加入顺序排列（界面按此顺序显示，下标与显示位置一致），
+    同时按牌的类分桶，支持：
+        first(Slash)        O(1) 取第一张【杀】
+        count(Peach)        O(1) 统计【桃】的张数
+        remove(card)        O(1) 按id移除
+    下标访问（hand[i]、pop(i)）需要按顺序遍历，手牌很少时开销可以忽略。
+    """
+
+    __slots__ = ("_cards", "_by_kind", "_order", "_seq")
+
+    def __init__(self, cards=()):
+        self._cards = {}  # id -> 牌，按加入顺序
+        self._by_kind = {}  # 牌的类 -> {id: 牌}，按加入顺序
+        self._order = {}  # id -> 加入序号，用于比较不同类的牌的先后
+        self._seq = 0
+        for card in cards:
+            self.append(card)
+
+    def append(self, card):
+        """加入一张牌（放在最后）"""
+        card_id = card.id
+        self._cards[card_id] = card
+        bucket = self._by_kind.get(type(card))
+        if bucket is None:
+            bucket = self._by_kind[type(card)] = {}
+        bucket[card_id] = card
+        self._order[card_id] = self._seq
+        self._seq += 1
+
+    def extend(self, cards):
+        for card in cards:
+            self.append(card)
+
+    def remove(self, card):
+        """移除一张牌，不在手牌中时抛出ValueError"""
+        if self._cards.get(card.id) is not card:
+            raise ValueError(f"{card} 不在手牌中")
+        self._discard_id(card.id)
+
+    def remove_id(self, card_id):
+        """按id移除并返回一张牌"""
+        if card_id not in self._cards:
+            raise ValueError(f"id为{card_id}的牌不在手牌中")
+        return self._discard_id(card_id)
+
+    def _discard_id(self, card_id):
+        card = self._cards.pop(card_id)
+        del self._by_kind[type(card)][card_id]
+        del self._order[card_id]
+        return card
+
+    def pop(self, index=-1):
+        """按下标移除并返回一张牌（默认最后一张）"""
+        if not self._cards:
+            raise IndexError("手牌为空")
+        if index == -1:
+            card_id = next(reversed(self._cards))
+        else:
+            card_id = self[index].id
+        return self._discard_id(card_id)
+
+    def clear(self):
+        self._cards.clear()
+        self._by_kind.clear()
+        self._order.clear()
+
+    def first(self, *kinds):
+        """取第一张属于 kinds 中任一类的牌（多个类时取最早加入的），没有则返回None"""
+        best = None
+        for kind in kinds:
+            bucket = self._by_kind.get(kind)
+            if bucket:
+                card = next(iter(bucket.values()))
+                if best is None or self._order[card.id] < self._order[best.id]:
+                    best = card
+        return best
+
+    def count(self, kind):
+        """某一类牌的张数"""
+        bucket = self._by_kind.get(kind)
+        return len(bucket) if bucket else 0
+
+    def index(self, card):
+        """牌在手牌中的下标（显示位置）"""
+        for i, c in enumerate(self._cards.values()):
+            if c is card:
+                return i
+        raise ValueError(f"{card} 不在手牌中")
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._cards.values())[index]
+        n = len(self._cards)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("手牌下标越界")
+        if index == n - 1:
+            return self._cards[next(reversed(self._cards))]
+        for i, card in enumerate(self._cards.values()):
+            if i == index:
+                return card
+
+    def __contains__(self, card):
+        return self._cards.get(card.id) is card
+
+    def __iter__(self):
+        return iter(self._cards.values())
+
+    def __len__(self):
+        return len(self._cards)
+
+    def __bool__(self):
+        return bool(self._cards)
+
+    def __repr__(self):
+        return f"<Hand {list(self._cards.values())}>"
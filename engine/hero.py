@@ -1,3 +1,6 @@
+from engine import gamelog
+
+
 class Hero:
     """武将基类"""
     def __init__(self, name: str, force: str, hp: int, skills=None):
@@ -11,14 +14,20 @@ class Hero:
 
 
 class Skill:
-    """技能基类"""
+    """技能基类
+
+    events: 技能监听的事件名，游戏开始时据此建立触发索引（SkillIndex）
+    can_trigger 只做查询，不能有副作用；效果写在 trigger 里
+    """
+    events = ()
+
     def __init__(self, name: str, description: str):
         self.name = name
         self.description = description
     
     def can_trigger(self, player, game, event_name, **kwargs):
-        """是否可以触发"""
-        return False
+        """是否可以触发（无副作用的查询）"""
+        return event_name in self.events
     
     def trigger(self, player, game, **kwargs):
         """触发技能效果"""
@@ -29,30 +38,28 @@ class Skill:
 
 class JianXiong(Skill):
     """奸雄（曹操）：当你受到伤害后，你可以获得对你造成伤害的牌"""
+    events = ("damage_taken",)
+
     def __init__(self):
         super().__init__(" 奸雄", "当你受到伤害后，获得造成伤害的牌")
     
-    def can_trigger(self, player, game, event_name, **kwargs):
-        return event_name == "damage_taken"
-    
     def trigger(self, player, game, **kwargs):
         damage_card = kwargs.get('damage_card')
         if damage_card:
             player.hand.append(damage_card)
-            game.log(f"{player.name} 发动【奸雄】，获得了造成伤害的牌")
+            game.record(gamelog.JIANXIONG, player.seat)
 
 
 class PaoXiao(Skill):
     """哆哮（张飞）：出牌阶段，你使用【杀】无次数限制"""
+    events = ("check_slash_limit",)
+
     def __init__(self):
         super().__init__("哆哮", "出牌阶段，你使用【杀】无次数限制")
     
-    def can_trigger(self, player, game, event_name, **kwargs):
-        return event_name == "check_slash_limit"
-    
     def trigger(self, player, game, **kwargs):
-        # 哆哮：移除杀的次数限制
-        return True  # 返回true表示可以使用
+        # 哆哮：移除杀的次数限制（实际使用第二张及以后的【杀】时发动）
+        game.record(gamelog.SKILL_PAOXIAO, player.seat, value=self.name)
 
 
 class LongDan(Skill):
@@ -79,6 +86,44 @@ class WuShuang(Skill):
         super().__init__("无双", "使用【杀】时，目标需出两张【闪】")
 
 
+class SkillIndex:
+    """技能触发索引：事件名 -> 座位号 -> 监听该事件的技能
+
+    游戏开始时按各武将技能声明的 events 建立，
+    查询和派发只访问真正监听该事件的技能。
+    """
+
+    def __init__(self, players):
+        self._index = {}
+        for player in players:
+            if not player.hero:
+                continue
+            for skill in player.hero.skills:
+                for event_name in skill.events:
+                    by_seat = self._index.setdefault(event_name, {})
+                    by_seat[player.seat] = by_seat.get(player.seat, ()) + (skill,)
+
+    def skills(self, event_name, player):
+        """该玩家监听此事件的技能"""
+        by_seat = self._index.get(event_name)
+        if by_seat is None:
+            return ()
+        return by_seat.get(player.seat, ())
+
+    def query(self, event_name, player, game, **kwargs):
+        """返回第一个可以触发的技能（不发动，无副作用），没有则返回None"""
+        for skill in self.skills(event_name, player):
+            if skill.can_trigger(player, game, event_name, **kwargs):
+                return skill
+        return None
+
+    def dispatch(self, event_name, player, game, **kwargs):
+        """发动该玩家所有可以触发的技能"""
+        for skill in self.skills(event_name, player):
+            if skill.can_trigger(player, game, event_name, **kwargs):
+                skill.trigger(player, game, **kwargs)
+
+
 # ========== 标准版武将 ==========
 
 class CaoCao(Hero):
@@ -148,8 +193,12 @@ STANDARD_HEROES = [
 ]
 
 
-def get_random_heroes(n=4):
-    """随机获取n个武将"""
-    import random
-    hero_classes = random.sample(STANDARD_HEROES, min(n, len(STANDARD_HEROES)))
+def get_random_heroes(n=4, rng=None):
+    """随机获取n个武将
+
+    rng: 随机数生成器（random.Random），默认使用全局random模块
+    """
+    if rng is None:
+        import random as rng
+    hero_classes = rng.sample(STANDARD_HEROES, min(n, len(STANDARD_HEROES)))
     return [cls() for cls in hero_classes]
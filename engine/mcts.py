@@ -0,0 +1,228 @@
+"""蒙特卡洛树搜索AI
+
+MCTSController 与 AIController 接口相同，可以替换任意AI玩家的控制器：
+    Game(players, ai_factory=MCTSController)
+
+每次决策：
+    1. 保存当前状态快照作为根节点
+    2. 每次模拟先把其他玩家的手牌和牌堆随机重新分配（确定化，自己只知道自己的手牌）
+    3. 按UCB在本回合自己的出牌序列上选择/扩展（结束出牌也是一个动作）
+    4. 之后所有玩家按贪心策略（AIController）继续若干回合，按阵营估值
+    5. 恢复快照，选择访问次数最多的动作
+同一回合内连续决策时复用上一次所选动作对应的子树。
+"""
+import itertools
+import math
+import random
+import time
+import zlib
+
+from engine.ai import AIController
+
+
+# 结束出牌阶段的动作
+END = None
+
+# 不限时间时每次决策的默认模拟次数
+PLAYOUTS = 24
+
+# 身份 -> 阵营
+CAMPS = {"lord": "lord", "loyalist": "lord", "rebel": "rebel", "traitor": "traitor"}
+
+
+def action_key(card, targets):
+    """动作在搜索树中的键：(牌id, 目标座位号元组)"""
+    return (card.id, tuple(targets))
+
+
+class Node:
+    """搜索树节点（信息集节点：只按自己的动作区分）"""
+    __slots__ = ("visits", "value", "available", "children")
+
+    def __init__(self):
+        self.visits = 0
+        self.value = 0.0
+        self.available = 0  # 该节点作为候选时可用的次数（确定化后动作不一定都可用）
+        self.children = {}
+
+
+class MCTSController(AIController):
+    """蒙特卡洛树搜索AI控制器"""
+
+    def __init__(self, player, game, playouts=None, time_budget=None, rollout_turns=None,
+                 exploration=0.7, seed=None):
+        """
+        playouts: 每次决策的模拟次数上限，默认：不限时间时为 PLAYOUTS，限时间时不限次数
+        time_budget: 每次决策的时间上限（秒），None 表示只按模拟次数（结果可按种子复现）；
+                     与 playouts 同时指定时先到哪个上限就停止
+        rollout_turns: 结束本回合后继续模拟的回合数，默认为存活人数（约一轮）
+        exploration: UCB探索系数
+        seed: 确定化用的随机种子，默认由本局随机数生成器的状态和座位号派生
+              （不从中取数，不影响对局本身的随机序列，回放时可以用其他控制器代替）
+        """
+        super().__init__(player, game)
+        if playouts is None and time_budget is None:
+            playouts = PLAYOUTS
+        self.playouts = playouts
+        self.time_budget = time_budget
+        self.rollout_turns = rollout_turns
+        self.exploration = exploration
+        if seed is None:
+            # 不能用 hash()：状态中含 None，其哈希值每个进程都不同
+            seed = zlib.crc32(repr((game.rng.getstate()[1], player.seat)).encode())
+        self.search_rng = random.Random(seed)
+        self._root = None  # 复用的子树
+        self._root_turn = None  # 子树所属回合
+        self.last_playouts = 0  # 上一次决策进行的模拟次数
+
+    def decide_action(self):
+        """决定下一步行动：返回 (card, target_indices) 或 None"""
+        game = self.game
+        if game.searching:
+            # 其他AI试走时，自己按贪心策略行动
+            return super().decide_action()
+        actions = game.legal_actions(self.player)
+        if not actions:
+            self._root = None
+            return None
+
+        root = self._reuse_root()
+        with game.silenced():
+            game.searching = True
+            try:
+                self._search(root)
+            finally:
+                game.searching = False
+
+        if not root.children:
+            return super().decide_action()
+        best_key, best = max(root.children.items(), key=lambda kv: kv[1].visits)
+        # 下一次决策（同一回合）从所选动作的子树开始
+        self._root = best if best_key is not END else None
+        self._root_turn = game.scheduler.turn_count
+        if best_key is END:
+            return None
+        for card, targets in actions:
+            if action_key(card, targets) == best_key:
+                return (card, targets)
+        return None
+
+    def _reuse_root(self):
+        if self._root is not None and self._root_turn == self.game.scheduler.turn_count:
+            return self._root
+        return Node()
+
+    def _search(self, root):
+        game = self.game
+        saved = game.snapshot()
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        self.last_playouts = 0
+        playouts = itertools.count() if self.playouts is None else range(self.playouts)
+        try:
+            for _ in playouts:
+                self._determinize()
+                path, ended = self._tree_policy(root)
+                value = self._rollout(ended)
+                for node in path:
+                    node.visits += 1
+                    node.value += value
+                game.restore(saved)
+                self.last_playouts += 1
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+        finally:
+            game.restore(saved)
+
+    def _determinize(self):
+        """把自己看不到的牌（其他玩家手牌和牌堆）随机重新分配，各自张数不变"""
+        game = self.game
+        others = [p for p in game.players if p is not self.player and p.hand]
+        unknown = list(game.deck.cards)
+        for p in others:
+            unknown.extend(p.hand)
+        self.search_rng.shuffle(unknown)
+        pos = 0
+        for p in others:
+            n = len(p.hand)
+            p.hand.clear()
+            p.hand.extend(unknown[pos:pos + n])
+            pos += n
+        game.deck.cards = unknown[pos:]
+
+    def _tree_policy(self, node):
+        """在本回合自己的出牌序列上选择/扩展，返回 (经过的节点, 是否已结束出牌)"""
+        game = self.game
+        path = [node]
+        while True:
+            actions = game.legal_actions(self.player)
+            options = {action_key(card, targets): (card, targets) for card, targets in actions}
+            options[END] = None
+            for key in options:
+                child = node.children.get(key)
+                if child is not None:
+                    child.available += 1
+
+            untried = [key for key in options if key not in node.children]
+            if untried:
+                key = untried[self.search_rng.randrange(len(untried))]
+                child = node.children[key] = Node()
+                child.available = 1
+                path.append(child)
+                return path, not self._play(options[key])
+
+            key = max(options, key=lambda k: self._ucb(node.children[k]))
+            node = node.children[key]
+            path.append(node)
+            if not self._play(options[key]):
+                return path, True
+
+    def _ucb(self, child):
+        # 信息集MCTS：用动作可用次数代替父节点访问次数
+        if child.visits == 0:
+            return math.inf
+        return (child.value / child.visits
+                + self.exploration * math.sqrt(math.log(child.available) / child.visits))
+
+    def _play(self, action):
+        """在试走中执行一个动作，返回是否还能继续出牌"""
+        game = self.game
+        if action is None:
+            return False
+        card, targets = action
+        game.play_card(card, targets)
+        return game.phase == "play" and self.player.is_alive
+
+    def _rollout(self, ended):
+        """按贪心策略打完本回合，所有玩家再继续若干回合，返回本阵营的估值（0-1）"""
+        game = self.game
+        scheduler = game.scheduler
+        if game.phase == "play":
+            if not ended:
+                # 试走中 decide_action 按贪心策略出牌
+                self.play_turn()
+            # 本回合的出牌阶段在搜索外层的调度中，试走从弃牌阶段接着推进
+            scheduler.next_phase = "discard"
+        turns = self.rollout_turns or len(game.get_alive_players())
+        stop = scheduler.turn_count + turns
+        scheduler.run_until(lambda g: scheduler.turn_count >= stop and scheduler.next_phase == "prepare")
+        return self._evaluate()
+
+    def _evaluate(self):
+        game = self.game
+        camp = CAMPS.get(self.player.role, self.player.role)
+        winner = game.check_game_over()
+        if winner is not None:
+            if winner == "draw":
+                return 0.5
+            return 1.0 if CAMPS.get(winner) == camp else 0.0
+        # 未分胜负：比较双方存活角色的体力比例
+        ally = enemy = 0.0
+        for p in game.players:
+            if not p.is_alive:
+                continue
+            share = p.hp / p.max_hp + 1.0
+            if CAMPS.get(p.role, p.role) == camp:
+                ally += share
+            else:
+                enemy += share
+        return ally / (ally + enemy) if ally + enemy else 0.5
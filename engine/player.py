@@ -1,14 +1,20 @@
+from engine import gamelog
+from engine.equipment import EquipArea
+from engine.hand import Hand
+
+
 class Player:
     def __init__(self, name: str, hp: int = 4, hero=None, is_ai=False, role="player"):
         self.name = name
         self.hp = hp
         self.max_hp = hp
-        self.hand = []
-        self.equip = []
+        self.hand = Hand()  # 手牌：保持摸牌顺序，按牌的类索引
+        self.equip = EquipArea()  # 装备区：武器、防具、+1马、-1马
         self.judge_area = []
         self.hero = hero  # 武将
         self.is_alive = True
         self.is_ai = is_ai  # 是否是AI玩家
+        self.seat = None  # 座位号，由Game分配
         self.role = role  # 身份：lord(主公), loyalist(忠臣), rebel(反贼), traitor(内奸)
         # 回合状态
         self.slash_used_this_turn = False
@@ -24,11 +30,11 @@ class Player:
     def use_card(self, card, targets, game):
         """使用一张牌"""
         if card not in self.hand:
-            print(f"错误：{card} 不在手牌中")
+            game.record(gamelog.NOT_IN_HAND, self.seat, card)
             return False
         
         if not card.can_use(self, game):
-            print(f"错误：不能使用 {card}")
+            game.record(gamelog.CANNOT_USE, self.seat, card)
             return False
         
         # 从手牌移除
@@ -36,7 +42,9 @@ class Player:
         
         # 触发UI显示动画（在执行效果之前）
         target_player = targets[0] if targets else None
-        game.emit_event("card_used", source=self, card=card, target=target_player)
+        game.threats.card_used(self, card, target_player)
+        if game.has_listeners("card_used"):
+            game.emit_event("card_used", source=self, card=card, target=target_player)
         
         # 执行效果
         card.use(self, targets, game)
@@ -51,18 +59,14 @@ class Player:
             game.deck.discard(card)
         
         # 效果执行后再次触发事件，用于刷新UI
-        game.emit_event("card_effect_done", source=self, card=card, target=target_player)
+        if game.has_listeners("card_effect_done"):
+            game.emit_event("card_effect_done", source=self, card=card, target=target_player)
         
         return True
 
     def get_attack_range(self):
         """计算攻击范围：基础=1，装备武器后使用武器范围"""
-        # 查找装备区中的武器
-        for eq in self.equip:
-            if hasattr(eq, 'equip_type') and eq.equip_type == "weapon":
-                if hasattr(eq, 'attack_range'):
-                    return eq.attack_range
-        return 1  # 默认范围
+        return self.equip.attack_range
     def reset_turn(self):
         """重置回合状态"""
         self.slash_used_this_turn = False
@@ -0,0 +1,162 @@
+"""按阶段统计耗时 - 可选的对局插桩，不启用时没有任何开销
+
+PhaseProfiler 在启用时把 Game 上的关键方法替换为计时包装（实例属性），
+停用时恢复原方法，因此未启用的对局完全走原来的代码路径。统计的项目：
+    phase.<阶段>         回合调度器的各阶段（prepare/judge/draw/play/discard/finish）
+    game.start_turn      game.next_turn   game.check_death
+    card.<卡牌类>        play_card（use_card 也经过这里），按卡牌类分别统计
+    response.<请求类型>  ResponseSystem.request_response，按请求类型分别统计
+    ai.decide_action     ai.choose_discards
+    log.record           结构化日志
+    event.<事件名>       事件总线分发
+每项记录调用次数、累计耗时（含内部调用）和自身耗时（不含被统计的内部调用）。
+
+用法：
+    profiler = PhaseProfiler()
+    game = Game(players, profiler=profiler)    # 或 game.enable_profiling(profiler)
+    ...
+    print(profiler.summary())
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats()   # 与 cProfile 的报告工具兼容
+"""
+import pstats
+import time
+
+
+class PhaseProfiler:
+    """各阶段的调用次数与耗时统计"""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.calls = {}  # 项目 -> 调用次数
+        self.total = {}  # 项目 -> 累计耗时（含内部调用，递归只计最外层）
+        self.own = {}  # 项目 -> 自身耗时
+        self.callers = {}  # 项目 -> {上层项目: 次数}
+        self._stack = []  # 正在计时的 [项目, 内部调用耗时]
+        self._active = {}  # 项目 -> 正在进行的层数（处理递归）
+        self._installed = []  # (对象, 属性名, 原值或None, 计时包装)
+
+    # ========== 计时 ==========
+
+    def _timed(self, label, func, key=None):
+        """返回计时包装：key(*args, **kwargs) 给出按参数细分的项目名"""
+        clock, stack, active = self.clock, self._stack, self._active
+        installed = self._installed
+
+        def wrapper(*args, **kwargs):
+            if not installed:
+                # 已卸载，但之后装上的其他包装（如录像）还调用着它：直接调用原方法
+                return func(*args, **kwargs)
+            name = key(*args, **kwargs) if key is not None else label
+            caller = stack[-1][0] if stack else None
+            frame = [name, 0.0]
+            stack.append(frame)
+            active[name] = active.get(name, 0) + 1
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                stack.pop()
+                active[name] -= 1
+                self.calls[name] = self.calls.get(name, 0) + 1
+                self.own[name] = self.own.get(name, 0.0) + elapsed - frame[1]
+                if not active[name]:
+                    self.total[name] = self.total.get(name, 0.0) + elapsed
+                if caller is not None:
+                    callers = self.callers.setdefault(name, {})
+                    callers[caller] = callers.get(caller, 0) + 1
+                if stack:
+                    stack[-1][1] += elapsed
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    def _patch(self, obj, attr, label, key=None):
+        original = obj.__dict__.get(attr)
+        wrapper = self._timed(label, getattr(obj, attr), key)
+        self._installed.append((obj, attr, original, wrapper))
+        setattr(obj, attr, wrapper)
+
+    # ========== 安装/卸载 ==========
+
+    def install(self, game):
+        """给 game 装上计时包装（由 Game.enable_profiling 调用）"""
+        if self._installed:
+            raise RuntimeError("PhaseProfiler 已安装在一局游戏上")
+        scheduler = game.scheduler
+        handlers = scheduler._handlers
+        timed = {phase: self._timed(f"phase.{phase}", handler) for phase, handler in handlers.items()}
+        self._installed.append((scheduler, "_handlers", handlers, timed))
+        scheduler._handlers = timed
+
+        self._patch(game, "start_turn", "game.start_turn")
+        self._patch(game, "next_turn", "game.next_turn")
+        self._patch(game, "check_death", "game.check_death")
+        self._patch(game, "play_card", "card",
+                    key=lambda card, *args, **kwargs: f"card.{type(card).__name__}")
+        self._patch(game, "record", "log.record")
+        self._patch(game.response_system, "request_response", "response",
+                    key=lambda request_type, *args, **kwargs: f"response.{request_type}")
+        self._patch(game.event_bus, "emit", "event",
+                    key=lambda event_name, *args, **kwargs: f"event.{event_name}")
+        for ai in game.ai_controllers.values():
+            self._patch(ai, "decide_action", "ai.decide_action")
+            self._patch(ai, "choose_discards", "ai.choose_discards")
+
+    def uninstall(self):
+        """恢复所有被替换的方法
+
+        之后又被其他代码包装过的方法保持原样（不能连同外层的包装一起去掉），
+        其中的计时包装卸载后只是直接调用原方法。
+        """
+        installed = self._installed
+        for obj, attr, original, wrapper in reversed(installed):
+            if obj.__dict__.get(attr) is not wrapper:
+                continue
+            if original is None:
+                delattr(obj, attr)  # 原来是类上的方法
+            else:
+                setattr(obj, attr, original)
+        installed.clear()  # 留在原处的计时包装从此不再计时
+        self._installed = []
+
+    def reset(self):
+        """清空统计数据（保持安装状态）"""
+        self.calls.clear()
+        self.total.clear()
+        self.own.clear()
+        self.callers.clear()
+
+    # ========== 报告 ==========
+
+    def rows(self):
+        """[(项目, 调用次数, 累计耗时, 自身耗时)]，按累计耗时从高到低"""
+        return sorted(((name, count, self.total.get(name, 0.0), self.own[name])
+                       for name, count in self.calls.items()), key=lambda row: -row[2])
+
+    def as_dict(self):
+        """机器可读的统计结果"""
+        return {name: {"calls": count, "total": total, "own": own}
+                for name, count, total, own in self.rows()}
+
+    def summary(self, limit=None):
+        """生成统计报告文本"""
+        lines = [f"{'项目':<28}{'次数':>10}{'累计 ms':>12}{'自身 ms':>12}{'每次 µs':>10}"]
+        for name, count, total, own in self.rows()[:limit]:
+            lines.append(f"{name:<28}{count:>10}{total * 1e3:>12.2f}{own * 1e3:>12.2f}"
+                         f"{total / count * 1e6:>10.2f}")
+        return "\n".join(lines)
+
+    def create_stats(self):
+        """生成 cProfile 格式的 stats，使 pstats.Stats(profiler) 可以直接读取"""
+        def func(name):
+            return ("engine.game", 0, name)
+
+        self.stats = {
+            func(name): (count, count, self.own[name], self.total.get(name, 0.0),
+                         {func(caller): n for caller, n in self.callers.get(name, {}).items()})
+            for name, count in self.calls.items()
+        }
+
+    def dump_stats(self, path):
+        """保存为 cProfile 的 .prof 文件（可用 snakeviz 等工具查看）"""
+        pstats.Stats(self).dump_stats(path)
@@ -0,0 +1,484 @@
+"""对局录像 - 记录初始状态和每一个决策，事后无界面快速重放、跳转到任意回合
+
+录像只保存：
+    随机数生成器的初始状态（直接由种子创建的对局只保存种子）
+    玩家设置（名字、体力、武将、是否AI、身份）和非标准牌堆的组成
+    决策序列：AI的出牌/结束出牌/弃牌/响应，以及界面对 Game 的调用
+        （use_card、next_turn、discard_cards、handle_response）
+洗牌、判定等随机结果由随机数生成器重新产生，不需要记录。
+
+重放时AI玩家换成 ReplayController，按录像给出决策，不再搜索或评估；
+人类玩家的操作由 Replayer 按原来的顺序调用 Game 的接口。
+Replayer 每隔若干回合保存一次快照，跳转到之前的回合时从最近的快照继续。
+
+用法：
+    python -m engine.replay record -p 5 --seed 42 --game-index 1234 -o game.sgsr
+    python -m engine.replay show game.sgsr --turn 30
+"""
+import argparse
+import json
+import random
+import struct
+import zlib
+
+from engine.ai import AIController
+from engine.cards.basic import Card
+from engine.cards import registry
+from engine.cards.registry import intern
+from engine.deck import get_template, DeckTemplate
+from engine.game import Game
+from engine.hero import STANDARD_HEROES
+from engine.player import Player
+
+
+MAGIC = b"SGSR"
+VERSION = 1
+
+# 决策类型
+AI_PLAY = 1  # AI出牌：(牌, 目标座位号)
+AI_END = 2  # AI结束出牌阶段
+AI_DISCARD = 3  # AI弃牌：(牌, ...)
+AI_RESPOND = 4  # AI响应：牌或None
+CALL_USE = 5  # game.use_card(手牌下标, 目标座位号)
+CALL_NEXT = 6  # game.next_turn()
+CALL_DISCARD = 7  # game.discard_cards(手牌下标)
+CALL_RESPOND = 8  # response_system.handle_response(手牌下标或None)
+
+NO_CARD = 0xFFFF
+
+
+class ReplayError(Exception):
+    """重放的对局与录像不一致"""
+
+
+class ReplayExhausted(ReplayError):
+    """录像中的决策已用完"""
+
+
+# ========== 录像 ==========
+
+class Replay:
+    """一局的录像：初始设置和决策序列
+
+    decisions 中每项为 (决策类型, 座位号, 参数)，参数见各决策类型的说明。
+    """
+
+    def __init__(self, players, decisions=(), seed=None, rng_state=None, deck=None, turns=0):
+        self.players = players  # [(名字, 体力, 武将类名或None, 是否AI, 身份)]
+        self.decisions = list(decisions)
+        self.seed = seed
+        self.rng_state = rng_state  # 随机数生成器初始状态，为None时由 seed 创建
+        self.deck = deck  # 牌堆模板中的牌，None 表示标准牌堆
+        self.turns = turns  # 录制结束时的回合数
+
+    def create_rng(self):
+        rng = random.Random(self.seed)
+        if self.rng_state is not None:
+            rng.setstate(self.rng_state)
+        return rng
+
+    # ---------- 序列化 ----------
+
+    def to_bytes(self):
+        """编码为紧凑的二进制格式（zlib压缩）"""
+        cards = []  # 录像内的牌表：序号 -> (类名, 花色, 点数[, 第几张])
+        index = {}
+
+        def card_index(card):
+            i = index.get(card.id)
+            if i is None:
+                i = index[card.id] = len(cards)
+                entry = (type(card).__name__, card.suit, card.rank)
+                copy = registry.copies[card.id]
+                cards.append(entry + (copy,) if copy else entry)
+            return i
+
+        body = bytearray()
+        pack = struct.pack
+        for kind, seat, args in self.decisions:
+            body += pack("<BB", kind, seat)
+            if kind == AI_PLAY:
+                card, targets = args
+                body += pack(f"<HB{len(targets)}h", card_index(card), len(targets), *targets)
+            elif kind == AI_DISCARD:
+                body += pack(f"<B{len(args)}H", len(args), *map(card_index, args))
+            elif kind == AI_RESPOND:
+                body += pack("<H", NO_CARD if args is None else card_index(args))
+            elif kind == CALL_USE:
+                card_pos, targets = args
+                body += pack(f"<hB{len(targets)}h", card_pos, len(targets), *targets)
+            elif kind == CALL_DISCARD:
+                body += pack(f"<B{len(args)}h", len(args), *args)
+            elif kind == CALL_RESPOND:
+                body += pack("<h", -1 if args is None else args)
+
+        # 随机数生成器状态（624个32位整数）直接按二进制保存在头部之后
+        state = self.rng_state
+        key = state[1] if state is not None else ()
+        header = {
+            "seed": self.seed,
+            "rng_state": None if state is None else [state[0], state[2]],
+            "players": self.players,
+            "deck": None if self.deck is None else [card_index(card) for card in self.deck],
+            "turns": self.turns,
+            "cards": cards,
+        }
+        header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        payload = (pack("<I", len(header_bytes)) + header_bytes
+                   + pack(f"<H{len(key)}I", len(key), *key) + bytes(body))
+        return MAGIC + bytes([VERSION]) + zlib.compress(payload, 9)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:4] != MAGIC or data[4] != VERSION:
+            raise ValueError("不是有效的录像文件")
+        payload = zlib.decompress(data[5:])
+        (header_len,) = struct.unpack_from("<I", payload)
+        header = json.loads(payload[4:4 + header_len].decode("utf-8"))
+        card_classes = _card_classes()
+        cards = [intern(card_classes[name], *rest) for name, *rest in header["cards"]]
+
+        unpack = struct.unpack_from
+        pos = 4 + header_len
+        (key_len,) = unpack("<H", payload, pos)
+        key = unpack(f"<{key_len}I", payload, pos + 2)
+        pos += 2 + 4 * key_len
+
+        decisions = []
+        while pos < len(payload):
+            kind, seat = unpack("<BB", payload, pos)
+            pos += 2
+            args = None
+            if kind == AI_PLAY:
+                card, n = unpack("<HB", payload, pos)
+                targets = unpack(f"<{n}h", payload, pos + 3)
+                args = (cards[card], targets)
+                pos += 3 + 2 * n
+            elif kind == AI_DISCARD:
+                (n,) = unpack("<B", payload, pos)
+                args = tuple(cards[i] for i in unpack(f"<{n}H", payload, pos + 1))
+                pos += 1 + 2 * n
+            elif kind == AI_RESPOND:
+                (card,) = unpack("<H", payload, pos)
+                args = None if card == NO_CARD else cards[card]
+                pos += 2
+            elif kind == CALL_USE:
+                card_pos, n = unpack("<hB", payload, pos)
+                args = (card_pos, unpack(f"<{n}h", payload, pos + 3))
+                pos += 3 + 2 * n
+            elif kind == CALL_DISCARD:
+                (n,) = unpack("<B", payload, pos)
+                args = unpack(f"<{n}h", payload, pos + 1)
+                pos += 1 + 2 * n
+            elif kind == CALL_RESPOND:
+                (card_pos,) = unpack("<h", payload, pos)
+                args = None if card_pos < 0 else card_pos
+                pos += 2
+            elif kind not in (AI_END, CALL_NEXT):
+                raise ValueError(f"未知的决策类型：{kind}")
+            decisions.append((kind, seat, args))
+
+        rng_state = header["rng_state"]
+        if rng_state is not None:
+            rng_state = (rng_state[0], key, rng_state[1])
+        deck = None if header["deck"] is None else tuple(cards[i] for i in header["deck"])
+        return cls([tuple(p) for p in header["players"]], decisions, header["seed"], rng_state,
+                   deck, header["turns"])
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def _card_classes():
+    """卡牌类名 -> 类（录像按类名保存牌）"""
+    classes = {}
+    pending = [Card]
+    while pending:
+        cls = pending.pop()
+        classes[cls.__name__] = cls
+        pending.extend(cls.__subclasses__())
+    return classes
+
+
+class ReplayRecorder:
+    """录制一局游戏：创建游戏时传入 Game(players, recorder=ReplayRecorder())
+
+    AI控制器、Game 和 ResponseSystem 的决策入口被替换为记录后再执行的包装，
+    搜索类AI试走（game.searching）期间的调用不记录。
+    """
+
+    def __init__(self):
+        self.game = None
+        self.replay = None
+
+    def install(self, game, rng_state):
+        """由 Game.__init__ 在第一个回合开始前调用，rng_state 为随机数生成器的初始状态"""
+        self.game = game
+        template = game.deck.template
+        seed = game.seed
+        if seed is None or random.Random(seed).getstate() != rng_state:
+            seed, state = None, rng_state
+        else:
+            state = None
+        self.replay = Replay(
+            [(p.name, p.max_hp, type(p.hero).__name__ if p.hero is not None else None, p.is_ai, p.role)
+             for p in game.players],
+            seed=seed, rng_state=state,
+            deck=None if template is get_template() else template.cards,
+        )
+        decisions = self.replay.decisions
+
+        def wrap(obj, attr, encode):
+            """记录调用参数（界面对引擎的调用）"""
+            func = getattr(obj, attr)
+
+            def wrapper(*args, **kwargs):
+                entry = encode(*args, **kwargs)
+                if entry is not None:
+                    decisions.append(entry)
+                return func(*args, **kwargs)
+            setattr(obj, attr, wrapper)
+
+        def wrap_result(obj, attr, encode):
+            """记录返回值（AI的决策）"""
+            func = getattr(obj, attr)
+
+            def wrapper(*args, **kwargs):
+                result = func(*args, **kwargs)
+                if not game.searching:
+                    decisions.append(encode(result))
+                return result
+            setattr(obj, attr, wrapper)
+
+        for ai in game.ai_controllers.values():
+            seat = ai.player.seat
+            wrap_result(ai, "decide_action", lambda action, seat=seat: (
+                (AI_END, seat, None) if not action
+                else (AI_PLAY, seat, (action[0], tuple(action[1] or ())))))
+            wrap_result(ai, "choose_discards", lambda cards, seat=seat: (AI_DISCARD, seat, tuple(cards)))
+            wrap_result(ai, "choose_response", lambda card, seat=seat: (AI_RESPOND, seat, card))
+
+        system = game.response_system
+        wrap(game, "use_card", lambda card_index, target_indices=None: (
+            CALL_USE, game.current_player.seat, (card_index, tuple(target_indices or ()))))
+        # discard_cards 内部会调用 next_turn，只记录界面直接调用的 next_turn
+        wrap(game, "next_turn", lambda: None if game.phase == "discard" else (
+            CALL_NEXT, game.current_player.seat, None))
+        wrap(game, "discard_cards", lambda card_indices: (
+            CALL_DISCARD, game.current_player.seat, tuple(card_indices)))
+        wrap(system, "handle_response", lambda card_index=None: (
+            CALL_RESPOND, system.pending_request.target_player.seat, card_index))
+
+    def finish(self):
+        """录制结束，返回录像"""
+        self.replay.turns = self.game.scheduler.turn_count
+        return self.replay
+
+    def save(self, path):
+        self.finish().save(path)
+
+
+# ========== 重放 ==========
+
+class ReplayController(AIController):
+    """重放时代替AI控制器：按录像给出决策"""
+
+    def __init__(self, player, game, replayer):
+        super().__init__(player, game)
+        self.replayer = replayer
+
+    def decide_action(self):
+        kind, args = self.replayer.take((AI_PLAY, AI_END), self.player.seat)
+        if kind == AI_END:
+            return None
+        card, targets = args
+        return (card, list(targets))
+
+    def choose_discards(self, count):
+        return self.replayer.take((AI_DISCARD,), self.player.seat)[1]
+
+    def choose_response(self, request):
+        return self.replayer.take((AI_RESPOND,), self.player.seat)[1]
+
+
+def position(game):
+    """对局进度：第 t 回合开始前为 2t-2，第 t 回合进行中为 2t-1"""
+    scheduler = game.scheduler
+    return 2 * scheduler.turn_count - (0 if scheduler.next_phase == "prepare" else 1)
+
+
+class Replayer:
+    """无界面重放一局录像
+
+    replayer = Replayer(replay)
+    game = replayer.seek(30)   # 第30回合开始前的状态
+    game = replayer.run()      # 重放到录像结束
+    """
+
+    def __init__(self, replay, snapshot_every=10):
+        self.replay = replay
+        self.snapshot_every = snapshot_every
+        self.cursor = 0  # 下一个决策的序号
+        self._snapshots = []  # [(进度, 游戏快照, 决策序号)]，按进度递增
+        self.finished = False
+
+        players = []
+        heroes = {cls.__name__: cls for cls in STANDARD_HEROES}
+        for name, hp, hero, is_ai, role in replay.players:
+            players.append(Player(name, hp, heroes[hero]() if hero else None, is_ai=is_ai, role=role))
+        template = None if replay.deck is None else DeckTemplate(
+            [(type(card), card.suit, card.rank) for card in replay.deck])
+        # 创建游戏时第一个回合就开始了，其中的AI决策同样来自录像
+        self.game = Game(players, verbose=False, seed=replay.seed, rng=replay.create_rng(),
+                         deck_template=template,
+                         ai_factory=lambda player, game: ReplayController(player, game, self))
+        # 界面在这两个事件的回调中同步作答（与 ui/app.py 一致）
+        self.game.event_bus.on("response_request", self._on_response_request)
+        self.game.event_bus.on("discard_phase", self._on_discard_phase)
+        self._save_snapshot()
+
+    def take(self, kinds, seat):
+        """取下一个决策，类型或座位号与预期不符时报错"""
+        decisions = self.replay.decisions
+        if self.cursor >= len(decisions):
+            raise ReplayExhausted("录像中的决策已用完")
+        kind, actual_seat, args = decisions[self.cursor]
+        if kind not in kinds or actual_seat != seat:
+            raise ReplayError(f"第{self.cursor}个决策不一致：录像为 {kind}@{actual_seat}，"
+                              f"重放需要 {kinds}@{seat}（第{self.game.scheduler.turn_count}回合）")
+        self.cursor += 1
+        return kind, args
+
+    def _pending(self, kind, seat):
+        """下一个决策是否为 seat 的 kind 决策"""
+        decisions = self.replay.decisions
+        return (self.cursor < len(decisions)
+                and decisions[self.cursor][0] == kind and decisions[self.cursor][1] == seat)
+
+    def _on_response_request(self, request, **kwargs):
+        seat = request.target_player.seat
+        if not request.target_player.is_ai and self._pending(CALL_RESPOND, seat):
+            self.game.response_system.handle_response(self.take((CALL_RESPOND,), seat)[1])
+
+    def _on_discard_phase(self, player, **kwargs):
+        if self._pending(CALL_DISCARD, player.seat):
+            self.game.discard_cards(list(self.take((CALL_DISCARD,), player.seat)[1]))
+
+    def _save_snapshot(self):
+        pos = position(self.game)
+        if not self._snapshots or pos >= self._snapshots[-1][0] + 2 * self.snapshot_every:
+            self._snapshots.append((pos, self.game.snapshot(), self.cursor))
+
+    def _at_end(self):
+        return (self.cursor >= len(self.replay.decisions)
+                and position(self.game) >= 2 * self.replay.turns)
+
+    def _advance(self):
+        """推进一步（执行一个阶段或一个界面调用），不能继续时返回False"""
+        game = self.game
+        decisions = self.replay.decisions
+        if self.cursor < len(decisions) and decisions[self.cursor][0] >= CALL_USE:
+            kind, seat, args = decisions[self.cursor]
+            self.cursor += 1
+            if kind == CALL_USE:
+                game.use_card(args[0], list(args[1]))
+            elif kind == CALL_NEXT:
+                game.next_turn()
+            elif kind == CALL_DISCARD:
+                game.discard_cards(list(args))
+            else:
+                game.response_system.handle_response(args)
+            return True
+        if game.phase == "game_over" or self._at_end():
+            return False
+        return game.scheduler.step()
+
+    def _run(self, target=None):
+        game = self.game
+        while not self.finished and (target is None or position(game) < target):
+            try:
+                if not self._advance():
+                    self.finished = True
+            except ReplayExhausted:
+                self.finished = True
+            if game.scheduler.next_phase == "prepare":
+                self._save_snapshot()
+        return game
+
+    def run(self):
+        """重放到录像结束，返回游戏"""
+        return self._run()
+
+    def seek(self, turn):
+        """跳转到第 turn 回合开始前（界面驱动的对局停在原来界面取回控制权的最近位置），返回游戏"""
+        target = 2 * turn - 2
+        if position(self.game) > target:
+            # 回到目标之前最近的快照
+            for pos, state, cursor in reversed(self._snapshots):
+                if pos <= target:
+                    self.game.restore(state)
+                    self.cursor = cursor
+                    self.finished = False
+                    break
+        return self._run(target)
+
+
+def record_game(player_count=4, seed=None, max_turns=None, ai="greedy"):
+    """用 engine.sim.play_game 录制一局全AI对局，返回 (录像, 获胜阵营)"""
+    from engine.sim import play_game, MAX_TURNS
+    recorder = ReplayRecorder()
+    winner, _ = play_game(player_count, max_turns or MAX_TURNS, seed, ai, recorder=recorder)
+    return recorder.finish(), winner
+
+
+def describe(game):
+    """对局状态的简要文本"""
+    scheduler = game.scheduler
+    if scheduler.next_phase == "prepare" and game.phase != "game_over":
+        progress = f"第{scheduler.turn_count + 1}回合开始前"
+    else:
+        progress = f"第{scheduler.turn_count}回合，阶段：{game.phase}"
+    lines = [f"{progress}，当前：{game.current_player.name}"]
+    for p in game.players:
+        status = f"体力{p.hp}/{p.max_hp}" if p.is_alive else "已阵亡"
+        hand = " ".join(str(card) for card in p.hand)
+        lines.append(f"  {p.seat}号位 {p.name}（{p.role}）{status} 手牌：{hand}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    from engine.sim import derive_seed, AI_TYPES
+    parser = argparse.ArgumentParser(description="三国杀对局录像")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="录制一局全AI对局")
+    rec.add_argument("-p", "--players", type=int, default=4, help="人数（2-8）")
+    rec.add_argument("--seed", type=int, default=0, help="单局种子（或与 --game-index 一起作为批量模拟的基础种子）")
+    rec.add_argument("--game-index", type=int, help="批量模拟中的对局序号（engine.sim 的 derive_seed）")
+    rec.add_argument("--max-turns", type=int, help="单局回合上限")
+    rec.add_argument("--ai", choices=sorted(AI_TYPES), default="greedy", help="AI类型")
+    rec.add_argument("-o", "--output", required=True, help="录像文件")
+    show = sub.add_parser("show", help="重放录像并显示某回合的状态")
+    show.add_argument("path", help="录像文件")
+    show.add_argument("--turn", type=int, help="跳转到该回合开始前，默认重放到结束")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        seed = args.seed if args.game_index is None else derive_seed(args.seed, args.game_index)
+        replay, winner = record_game(args.players, seed, args.max_turns, args.ai)
+        replay.save(args.output)
+        print(f"获胜：{winner}，{replay.turns}回合，{len(replay.decisions)}个决策，"
+              f"{len(replay.to_bytes())}字节 -> {args.output}")
+    else:
+        replayer = Replayer(Replay.load(args.path))
+        game = replayer.run() if args.turn is None else replayer.seek(args.turn)
+        print(describe(game))
+
+
+if __name__ == "__main__":
+    main()
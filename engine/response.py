@@ -1,4 +1,5 @@
 """响应机制系统 - 处理玩家对特定事件的响应（如出闪、求桃等）"""
+from engine import gamelog
 
 
 class ResponseRequest:
@@ -38,7 +39,8 @@ class ResponseSystem:
             return self._ai_auto_response(request)
         else:
             # 玩家手动响应 - 触发UI事件
-            self.game.emit_event("response_request", request=request)
+            if self.game.has_listeners("response_request"):
+                self.game.emit_event("response_request", request=request)
             # 注意：实际响应由 UI 调用 handle_response 处理
             return None  # 等待UI处理
     
@@ -55,20 +57,20 @@ class ResponseSystem:
         
         # 检查是否可以使用八卦阵
         if request.request_type == "dodge_slash" and card_index is None:
-            has_bagua = any(hasattr(eq, 'name') and eq.name == "八卦阵" for eq in player.equip)
+            has_bagua = player.equip.armor_effect == "八卦阵"
             if has_bagua:
                 # 八卦阵：进行判定，红色视为闪
                 judge_card = self.game.deck.draw()
-                self.game.log(f"{player.name} 发动【八卦阵】，判定牌为 {judge_card.suit}{judge_card.rank}")
+                self.game.record(gamelog.BAGUA_JUDGE, player.seat, judge_card)
                 self.game.deck.discard(judge_card)
                 
                 if judge_card.suit in ["♥", "♦"]:  # 红色
-                    self.game.log(f"判定成功，视为使用了【闪】")
+                    self.game.record(gamelog.JUDGE_SUCCESS)
                     request.responded = True
                     self.pending_request = None
                     return True
                 else:
-                    self.game.log(f"判定失败")
+                    self.game.record(gamelog.JUDGE_FAIL)
                     # 继续执行下面的伤害结算
         
         if card_index is not None and 0 <= card_index < len(player.hand):
@@ -82,15 +84,16 @@ class ResponseSystem:
                 request.response_card = card
                 request.responded = True
                 
-                self.game.log(f"{player.name} 使用了【{card.name}】进行响应")
-                self.game.emit_event("response_used", request=request, card=card)
+                self.game.record(gamelog.RESPONSE, player.seat, card)
+                if self.game.has_listeners("response_used"):
+                    self.game.emit_event("response_used", request=request, card=card)
                 
                 self.pending_request = None
                 return True
         
         # 不响应或响应无效
         request.responded = False
-        self.game.log(f"{player.name} 没有响应")
+        self.game.record(gamelog.NO_RESPONSE, player.seat)
         
         # 如果是被【杀】请求闪但未响应，则结算伤害
         if request.request_type == "dodge_slash":
@@ -98,15 +101,18 @@ class ResponseSystem:
             target = request.target_player
             
             # 检查仁王盾：黑色杀无效
-            has_renwang = any(hasattr(eq, 'name') and eq.name == "仁王盾" for eq in target.equip)
+            has_renwang = target.equip.armor_effect == "仁王盾"
             damage_card = request.context.get("damage_card")
             if has_renwang and damage_card and damage_card.suit in ["♠", "♣"]:
-                self.game.log(f"{target.name} 的【仁王盾】生效，黑色【杀】无效")
+                self.game.record(gamelog.RENWANG, target.seat, damage_card)
                 self.pending_request = None
                 return False
             
             target.hp -= 1
-            self.game.log(f"{target.name} 受到1点伤害，剩余体力: {target.hp}")
+            self.game.record(gamelog.DAMAGE, target.seat, damage_card, target.hp)
+            self.game.threats.hp_changed(target)
+            if self.game.has_listeners("damage"):
+                self.game.emit_event("damage", source=source, target=target, card=damage_card)
             # 检查死亡
             self.game.check_death(target)
         
@@ -134,67 +140,47 @@ class ResponseSystem:
     
     def _ai_auto_response(self, request):
         """AI自动响应逻辑"""
-        from engine.cards.basic import Dodge, Peach, Slash
-        
         player = request.target_player
         
-        # 根据请求类型查找对应的响应牌
-        response_card_index = None
-        
         if request.request_type == "dodge_slash":
             # 检查是否装备八卦阵
-            has_bagua = any(hasattr(eq, 'name') and eq.name == "八卦阵" for eq in player.equip)
+            has_bagua = player.equip.armor_effect == "八卦阵"
             if has_bagua:
                 # 八卦阵：进行判定，红色视为闪
                 judge_card = self.game.deck.draw()
-                self.game.log(f"{player.name} 发动【八卦阵】，判定牌为 {judge_card.suit}{judge_card.rank}")
+                self.game.record(gamelog.BAGUA_JUDGE, player.seat, judge_card)
                 self.game.deck.discard(judge_card)
                 
                 if judge_card.suit in ["♥", "♦"]:  # 红色
-                    self.game.log(f"判定成功，视为使用了【闪】")
+                    self.game.record(gamelog.JUDGE_SUCCESS)
                     request.responded = True
                     self.pending_request = None
                     return True
                 else:
-                    self.game.log(f"判定失败")
+                    self.game.record(gamelog.JUDGE_FAIL)
                     # 继续查找手牌中的闪
-            
-            # 查找闪
-            for i, card in enumerate(player.hand):
-                if isinstance(card, Dodge):
-                    response_card_index = i
-                    break
         
-        elif request.request_type == "peach_dying":
-            # 查找桃
-            for i, card in enumerate(player.hand):
-                if isinstance(card, Peach):
-                    response_card_index = i
-                    break
-        
-        elif request.request_type == "slash_duel":
-            # 查找杀
-            for i, card in enumerate(player.hand):
-                if isinstance(card, Slash):
-                    response_card_index = i
-                    break
+        # 由AI控制器选择响应牌（闪、桃、杀）
+        ai = self.game.ai_controllers.get(player)
+        card = ai.choose_response(request) if ai is not None else None
         
         # 处理AI响应
-        if response_card_index is not None:
-            card = player.hand.pop(response_card_index)
+        if card is not None:
+            player.hand.remove(card)
             self.game.deck.discard(card)
             request.response_card = card
             request.responded = True
             
-            self.game.log(f"{player.name} 使用了【{card.name}】进行响应")
-            self.game.emit_event("response_used", request=request, card=card)
+            self.game.record(gamelog.RESPONSE, player.seat, card)
+            if self.game.has_listeners("response_used"):
+                self.game.emit_event("response_used", request=request, card=card)
             
             self.pending_request = None
             return True
         else:
             # 没有对应的响应牌
             request.responded = False
-            self.game.log(f"{player.name} 没有响应")
+            self.game.record(gamelog.NO_RESPONSE, player.seat)
             self.pending_request = None
             return False
     
@@ -0,0 +1,223 @@
+"""无界面批量模拟 - 全AI对局，统计吞吐量与各阵营胜率
+
+用法：
+    python -m engine.sim -n 1000 -p 5
+    python -m engine.sim -n 100000 -p 8 -j 0 --seed 42   # 多进程，使用全部CPU核心
+    python -m engine.sim -n 100 -p 8 --ai mcts            # 蒙特卡洛树搜索AI
+    python -m engine.sim -n 200 -p 5 --profile out.prof   # 按阶段统计耗时
+"""
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from engine.game import Game, get_role_config
+from engine.player import Player
+from engine.hero import get_random_heroes
+from engine.ai import AIController
+from engine.mcts import MCTSController
+from engine.profiling import PhaseProfiler
+
+
+# 单局回合上限，超过视为超时（避免双方都无法造成伤害时无限对局）
+MAX_TURNS = 500
+
+# 可选的AI控制器（按名字传递，便于多进程）
+AI_TYPES = {
+    "greedy": AIController,
+    "mcts": MCTSController,
+}
+
+# 获胜阵营中文名
+CAMP_NAMES = {
+    "lord": "主公和忠臣",
+    "rebel": "反贼",
+    "traitor": "内奸",
+    "draw": "平局",
+    "timeout": "超时",
+}
+
+
+def create_ai_players(player_count, rng=None):
+    """按身份配置创建全AI玩家，主公体力+1"""
+    if not 2 <= player_count <= 8:
+        raise ValueError(f"不支持的人数：{player_count}（应为2-8人）")
+
+    roles = get_role_config(player_count)
+    heroes = get_random_heroes(player_count, rng)
+    players = []
+    for hero, role in zip(heroes, roles):
+        hp = hero.hp + 1 if role == "lord" else hero.hp
+        players.append(Player(hero.name, hp, hero, is_ai=True, role=role))
+    return players
+
+
+def derive_seed(base_seed, game_index):
+    """由基础种子和对局序号派生单局种子
+
+    只依赖 (base_seed, game_index)，与进程数、分片方式和机器无关。
+    """
+    return (base_seed * 0x9E3779B97F4A7C15 + game_index) & 0xFFFFFFFFFFFFFFFF
+
+
+def play_game(player_count=4, max_turns=MAX_TURNS, seed=None, ai="greedy", profiler=None, recorder=None):
+    """进行一局全AI对局，返回 (获胜阵营, 回合数)
+
+    seed: 单局随机种子，相同种子得到相同对局
+    ai: AI类型，见 AI_TYPES
+    profiler: 按阶段统计耗时（engine.profiling.PhaseProfiler），可在多局间共用
+    recorder: 对局录像（engine.replay.ReplayRecorder）
+    """
+    # 选将和整局游戏共用同一个随机数生成器，只凭种子即可复现
+    rng = random.Random(seed)
+    # 创建游戏时会立即执行第一个回合的前四个阶段
+    game = Game(create_ai_players(player_count, rng), verbose=False, seed=seed, rng=rng,
+                ai_factory=AI_TYPES[ai], profiler=profiler, recorder=recorder)
+    scheduler = game.scheduler
+    # 迭代推进直到游戏结束（run_until返回False）或打满回合上限
+    scheduler.run_until(
+        lambda g: scheduler.turn_count >= max_turns and scheduler.next_phase == "prepare"
+    )
+    game.disable_profiling()
+    return (game.check_game_over() or "timeout", scheduler.turn_count)
+
+
+class SimStats:
+    """批量模拟统计"""
+
+    def __init__(self, player_count):
+        self.player_count = player_count
+        self.games = 0
+        self.turns = 0
+        self.elapsed = 0.0  # 总耗时（秒）
+        self.wins = {}  # 获胜阵营 -> 局数
+
+    def merge(self, other):
+        """合并另一份统计（如某个工作进程的结果）"""
+        self.games += other.games
+        self.turns += other.turns
+        for camp, count in other.wins.items():
+            self.wins[camp] = self.wins.get(camp, 0) + count
+
+    def results(self):
+        """与耗时无关的统计结果，用于比较不同机器/进程数的模拟是否一致"""
+        return (self.player_count, self.games, self.turns, tuple(sorted(self.wins.items())))
+
+    def record(self, winner, turns):
+        """记录一局结果"""
+        self.games += 1
+        self.turns += turns
+        self.wins[winner] = self.wins.get(winner, 0) + 1
+
+    @property
+    def games_per_sec(self):
+        return self.games / self.elapsed if self.elapsed > 0 else 0.0
+
+    def win_rates(self):
+        """各阵营胜率"""
+        if not self.games:
+            return {}
+        return {camp: count / self.games for camp, count in self.wins.items()}
+
+    def summary(self):
+        """生成统计报告文本"""
+        lines = [
+            f"{self.player_count}人局 x {self.games} 局，"
+            f"耗时 {self.elapsed:.2f}s，{self.games_per_sec:.1f} 局/秒",
+            f"平均回合数：{self.turns / max(self.games, 1):.1f}",
+        ]
+        for camp, rate in sorted(self.win_rates().items(), key=lambda x: -x[1]):
+            lines.append(f"  {CAMP_NAMES.get(camp, camp)}：{rate:.1%}（{self.wins[camp]}局）")
+        return "\n".join(lines)
+
+
+def run_simulation(n_games, player_count=4, max_turns=MAX_TURNS, ai="greedy"):
+    """连续进行 n_games 局全AI对局，返回统计结果"""
+    stats = SimStats(player_count)
+    start = time.perf_counter()
+    for _ in range(n_games):
+        winner, turns = play_game(player_count, max_turns, ai=ai)
+        stats.record(winner, turns)
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def _run_shard(player_count, max_turns, base_seed, start, stop, ai="greedy"):
+    """工作进程：进行序号在 [start, stop) 范围内的对局"""
+    stats = SimStats(player_count)
+    for game_index in range(start, stop):
+        winner, turns = play_game(player_count, max_turns, derive_seed(base_seed, game_index), ai)
+        stats.record(winner, turns)
+    return stats
+
+
+def run_tournament(n_games, player_count=4, workers=None, seed=0,
+                   max_turns=MAX_TURNS, shard_size=None, ai="greedy"):
+    """多进程并行模拟 n_games 局
+
+    对局按序号分片交给工作进程，每局使用 derive_seed(seed, 序号) 作为种子，
+    各分片完成后立即合并统计。结果只取决于 seed，与 workers 无关。
+    workers: 进程数，None 或 0 表示使用全部CPU核心，1 表示在当前进程中运行
+    """
+    workers = workers or os.cpu_count() or 1
+    if shard_size is None:
+        # 每个进程分到约4个分片，兼顾负载均衡和进程间通信开销
+        shard_size = max(1, min(256, -(-n_games // (workers * 4))))
+    shards = [(start, min(start + shard_size, n_games))
+              for start in range(0, n_games, shard_size)]
+
+    stats = SimStats(player_count)
+    start_time = time.perf_counter()
+    if workers == 1:
+        for start, stop in shards:
+            stats.merge(_run_shard(player_count, max_turns, seed, start, stop, ai))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_shard, player_count, max_turns, seed, start, stop, ai)
+                       for start, stop in shards]
+            for future in as_completed(futures):
+                stats.merge(future.result())
+    stats.elapsed = time.perf_counter() - start_time
+    return stats
+
+
+def run_profiled(n_games, player_count=4, seed=0, max_turns=MAX_TURNS, ai="greedy"):
+    """在当前进程中进行 n_games 局并按阶段统计耗时，返回 (SimStats, PhaseProfiler)"""
+    profiler = PhaseProfiler()
+    stats = SimStats(player_count)
+    start = time.perf_counter()
+    for game_index in range(n_games):
+        winner, turns = play_game(player_count, max_turns, derive_seed(seed, game_index), ai, profiler)
+        stats.record(winner, turns)
+    stats.elapsed = time.perf_counter() - start
+    return stats, profiler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="三国杀全AI批量模拟")
+    parser.add_argument("-n", "--games", type=int, default=1000, help="对局数")
+    parser.add_argument("-p", "--players", type=int, default=4, help="人数（2-8）")
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS, help="单局回合上限")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="进程数（0表示全部核心）")
+    parser.add_argument("--seed", type=int, default=0, help="基础随机种子")
+    parser.add_argument("--ai", choices=sorted(AI_TYPES), default="greedy", help="AI类型")
+    parser.add_argument("--profile", nargs="?", const="", metavar="PROF",
+                        help="按阶段统计耗时（在当前进程中运行），可另存为 cProfile 格式的 .prof 文件")
+    args = parser.parse_args(argv)
+
+    if args.profile is not None:
+        stats, profiler = run_profiled(args.games, args.players, args.seed, args.max_turns, args.ai)
+        print(stats.summary())
+        print(profiler.summary())
+        if args.profile:
+            profiler.dump_stats(args.profile)
+        return
+
+    stats = run_tournament(args.games, args.players, args.workers, args.seed, args.max_turns,
+                           ai=args.ai)
+    print(stats.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""回合调度器 - 用显式的阶段状态机迭代推进回合，避免 start_turn/finish_turn 互相递归"""
+
+
+# 回合阶段顺序：准备 -> 判定 -> 摸牌 -> 出牌 -> 弃牌 -> 结束
+PHASES = ("prepare", "judge", "draw", "play", "discard", "finish")
+
+
+class TurnScheduler:
+    """回合阶段状态机
+
+    每次 step() 只执行一个阶段，并切换到该阶段返回的下一个阶段。
+    需要人类玩家操作的阶段（出牌、弃牌）会把 waiting 置为 True 暂停调度，
+    等 UI 操作完成后调用 resume() 继续。
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.next_phase = "prepare"  # 下一步要执行的阶段
+        self.waiting = False  # 是否在等待人类玩家操作
+        self.turn_count = 0  # 已开始的回合数
+        self._handlers = {
+            "prepare": game.prepare_phase,
+            "judge": game.judge_phase,
+            "draw": game.draw_phase,
+            "play": game.play_phase,
+            "discard": game.discard_phase,
+            "finish": game.finish_turn,
+        }
+
+    def step(self):
+        """执行一个阶段，返回是否推进了状态（游戏结束或等待玩家时返回False）"""
+        if self.waiting or self.game.phase == "game_over":
+            return False
+        if self.next_phase == "prepare":
+            self.turn_count += 1
+        self.next_phase = self._handlers[self.next_phase]()
+        return True
+
+    def resume(self):
+        """人类玩家操作完成，解除等待"""
+        self.waiting = False
+
+    def run_until(self, predicate, max_steps=None):
+        """循环 step() 直到 predicate(game) 为真
+
+        每执行一步后检查一次条件，调用栈深度恒定。
+        返回条件是否满足；游戏结束、等待玩家或达到 max_steps 时返回 False。
+        """
+        steps = 0
+        while self.step():
+            if predicate(self.game):
+                return True
+            steps += 1
+            if max_steps is not None and steps >= max_steps:
+                break
+        return False
+
+
+def play_phase_done(game):
+    """出牌阶段刚结束（下一步是弃牌阶段）"""
+    return game.scheduler.next_phase == "discard"
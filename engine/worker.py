@@ -0,0 +1,184 @@
+"""后台推进对局 - 引擎在工作线程中运行，界面只从线程安全的消息队列读取
+
+GameWorker 在自己的线程里调用 next_turn()，AI思考再久也不会卡住界面。
+界面按自己的节奏调用 drain() 取出消息：
+    (EVENT, 事件名, 参数)   订阅的引擎事件（参数中不含 game）
+    (LOG, 文本)             格式化后的游戏日志
+    (REQUEST, Decision)     需要人类玩家做的决定，界面调用 decision.resolve(答复)
+    (FINISHED, 获胜方)      对局结束
+    (ERROR, 文本)           引擎在工作线程中抛出了异常
+决定的种类与答复：
+    PLAY      出牌阶段：("use", 手牌下标, 目标座位号列表) 或 ("end",)
+    DISCARD   弃牌阶段（payload 含 count）：要弃置的手牌下标列表
+    RESPONSE  响应请求（payload 含 request）：响应牌的手牌下标，None 表示不响应
+工作线程修改对局时持有 lock，等待人类玩家做决定时释放；界面读取对局状态
+（刷新牌桌）前应先取得 lock，取不到说明引擎正在运行，稍后再读。
+"""
+import queue
+import threading
+import traceback
+from contextlib import contextmanager
+
+from engine.events import WILDCARD
+from engine.gamelog import CallbackSink
+
+
+# 消息种类
+EVENT, LOG, REQUEST, FINISHED, ERROR = "event", "log", "request", "finished", "error"
+
+# 决定的种类
+PLAY, DISCARD, RESPONSE = "play", "discard", "response"
+
+
+class Decision:
+    """等待人类玩家做出的一个决定"""
+
+    def __init__(self, kind, player, **payload):
+        self.kind = kind
+        self.player = player
+        self.payload = payload
+        self.answer = None
+        self._done = threading.Event()
+
+    def resolve(self, answer):
+        """给出答复（界面线程调用），工作线程随即继续"""
+        self.answer = answer
+        self._done.set()
+
+    @property
+    def resolved(self):
+        return self._done.is_set()
+
+    def wait(self):
+        self._done.wait()
+        return self.answer
+
+
+class GameWorker:
+    """在工作线程中推进一局游戏"""
+
+    def __init__(self, game, events=None):
+        """events: 要转发给界面的事件名，默认转发所有事件"""
+        self.game = game
+        self.messages = queue.SimpleQueue()
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, name="game-worker", daemon=True)
+        self._stopped = False
+        self._holding = False  # 工作线程当前是否持有 lock
+        self._pending = None  # 正在等待的决定
+
+        bus = game.event_bus
+        self._subscriptions = [bus.on(name, self._publisher(name)) for name in events or ()]
+        if events is None:
+            self._subscriptions.append(bus.on(WILDCARD, self._publish))
+        # 人类玩家的响应在工作线程中等待界面答复
+        self._subscriptions.append(bus.on("response_request", self._on_response_request))
+        self._log_sink = game.logger.add_sink(CallbackSink(lambda text: self.messages.put((LOG, text))))
+
+    # ========== 界面线程调用 ==========
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def drain(self):
+        """不阻塞地取出当前所有消息"""
+        messages = self.messages
+        while True:
+            try:
+                yield messages.get_nowait()
+            except queue.Empty:
+                return
+
+    def stop(self, timeout=0):
+        """停止推进（换局或关闭窗口时），正在等待的决定按放弃处理
+
+        AI正在思考时线程要等这一步结束才退出；timeout 为等待线程结束的最长秒数
+        （默认不等待，None 表示一直等到线程结束）。
+        """
+        self._stopped = True
+        pending = self._pending
+        if pending is not None:
+            pending.resolve(None)
+        for sub in self._subscriptions:
+            self.game.event_bus.off(sub)
+        self.game.logger.remove_sink(self._log_sink)
+        if self.thread.is_alive() and threading.current_thread() is not self.thread:
+            self.thread.join(timeout)
+
+    # ========== 工作线程 ==========
+
+    def _publisher(self, event_name):
+        def handler(game=None, **kwargs):
+            self.messages.put((EVENT, event_name, kwargs))
+        return handler
+
+    def _publish(self, event_name, game=None, **kwargs):
+        if event_name != "response_request":
+            self.messages.put((EVENT, event_name, kwargs))
+
+    @contextmanager
+    def _locked(self):
+        with self.lock:
+            self._holding = True
+            try:
+                yield
+            finally:
+                self._holding = False
+
+    def ask(self, kind, player, **payload):
+        """发出一个决定请求并等待答复；已停止时返回None"""
+        decision = Decision(kind, player, **payload)
+        self._pending = decision
+        if self._stopped:
+            return None
+        self.messages.put((REQUEST, decision))
+        # 等待期间释放 lock，界面可以读取对局状态
+        holding = self._holding
+        if holding:
+            self._holding = False
+            self.lock.release()
+        try:
+            return decision.wait()
+        finally:
+            if holding:
+                self.lock.acquire()
+                self._holding = True
+            self._pending = None
+
+    def _on_response_request(self, request, **kwargs):
+        index = self.ask(RESPONSE, request.target_player, request=request)
+        self.game.response_system.handle_response(index)
+
+    def _run(self):
+        game = self.game
+        scheduler = game.scheduler
+        try:
+            while not self._stopped and game.phase != "game_over":
+                player = game.current_player
+                if scheduler.waiting and game.phase == "play":
+                    answer = self.ask(PLAY, player)
+                    if answer is None:
+                        continue
+                    with self._locked():
+                        if answer[0] == "use":
+                            _, card_index, targets = answer
+                            if not game.use_card(card_index, targets):
+                                self.messages.put((LOG, "无法使用这张牌！"))
+                        else:
+                            game.next_turn()
+                elif scheduler.waiting and game.phase == "discard":
+                    count = len(player.hand) - player.hp
+                    indices = self.ask(DISCARD, player, count=count)
+                    if indices is None:
+                        continue  # 必须弃牌，再问一次（已停止时退出循环）
+                    with self._locked():
+                        game.discard_cards(indices)
+                else:
+                    with self._locked():
+                        game.next_turn()
+        except Exception:
+            self.messages.put((ERROR, traceback.format_exc()))
+            return
+        if game.phase == "game_over":
+            self.messages.put((FINISHED, game.check_game_over()))
@@ -1,4 +1,10 @@
+import argparse
+
 from ui.app import run_app
 
 if __name__ == "__main__":
-    run_app()
+    parser = argparse.ArgumentParser(description="三国杀 - 单机版")
+    parser.add_argument("--animation-scale", type=float, default=1.0,
+                        help="动画时长倍率（0.5 加快一倍，0 不播放动画）")
+    args = parser.parse_args()
+    run_app(args.animation_scale)
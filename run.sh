@@ -6,4 +6,4 @@ SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )"
 cd "$SCRIPT_DIR"
 
 # 直接使用虚拟环境的Python运行
-./.venv/bin/python main.py
+./.venv/bin/python main.py "$@"
@@ -52,5 +52,862 @@ def test_game():
     print("=" * 50)
 
 
+def test_headless_simulation():
+    """无界面批量模拟：2-8人全AI对局都能跑完"""
+    from engine.sim import run_simulation
+    
+    for player_count in range(2, 9):
+        stats = run_simulation(3, player_count, max_turns=100)
+        assert stats.games == 3
+        assert sum(stats.wins.values()) == 3
+        print(stats.summary())
+
+
+def test_turn_scheduler():
+    """回合调度器：按阶段顺序迭代推进，人类玩家出牌时暂停"""
+    game = setup_demo_game(verbose=False)
+    # 玩家（0号位）在出牌阶段等待操作
+    assert game.phase == "play"
+    assert game.scheduler.waiting
+    assert not game.scheduler.step()
+    
+    # 手牌不超过体力，不需要弃牌，依次推进到下一名AI玩家的出牌阶段
+    while len(game.current_player.hand) > game.current_player.hp:
+        game.current_player.hand.pop()
+    game.scheduler.resume()
+    phases = []
+    for _ in range(6):
+        assert game.scheduler.step()
+        phases.append(game.phase)
+    assert phases == ["discard", "idle", "prepare", "judge", "draw", "play"]
+    assert game.current_player is game.players[1]
+    
+    # 全AI长对局：迭代调度，不会因递归过深而崩溃
+    from engine.sim import play_game
+    winner, turns = play_game(8, max_turns=2000)
+    assert turns <= 2000
+
+
+def test_parallel_tournament_deterministic():
+    """并行模拟：相同种子的结果与进程数无关"""
+    from engine.sim import run_tournament
+    
+    single = run_tournament(12, 4, workers=1, seed=7, max_turns=100)
+    parallel = run_tournament(12, 4, workers=3, seed=7, max_turns=100)
+    assert single.results() == parallel.results()
+    assert single.games == 12
+
+
+def test_seeded_games_reproducible():
+    """每局独立的随机数生成器：同种子可复现，且不影响全局random"""
+    import random
+    from engine.game import Game
+    from engine.sim import play_game, create_ai_players
+    
+    random.seed(0)
+    expected = random.random()
+    random.seed(0)
+    first = play_game(5, max_turns=200, seed=123)
+    assert random.random() == expected
+    assert play_game(5, max_turns=200, seed=123) == first
+    
+    # 两局交替推进（模拟线程池并发），互不干扰
+    def new_game(seed):
+        rng = random.Random(seed)
+        return Game(create_ai_players(4, rng), verbose=False, rng=rng)
+    
+    a, b, c = new_game(1), new_game(2), new_game(1)
+    for _ in range(100):
+        a.scheduler.step()
+        b.scheduler.step()
+    for _ in range(100):
+        c.scheduler.step()
+    assert [(p.hp, len(p.hand)) for p in a.players] == [(p.hp, len(p.hand)) for p in c.players]
+
+
+def test_structured_log():
+    """结构化日志：记录按需格式化，按级别过滤，没有接收器时不产生记录"""
+    import random
+    from engine import gamelog
+    from engine.game import Game
+    from engine.sim import create_ai_players
+    
+    rng = random.Random(5)
+    buffer = gamelog.RingBufferSink(capacity=50, level=gamelog.INFO)
+    game = Game(create_ai_players(4, rng), verbose=False, rng=rng, log_sinks=[buffer])
+    for _ in range(40):
+        game.scheduler.step()
+    assert 0 < len(buffer.records) <= 50
+    assert all(isinstance(r, tuple) and len(r) == 4 for r in buffer.records)
+    # 阶段提示是DEBUG级别，被过滤
+    assert not any(r[0] == gamelog.PHASE_PLAY for r in buffer.records)
+    lines = buffer.lines()
+    assert len(lines) == len(buffer.records)
+    assert any(line.strip() == f"===== {game.current_player.name} 的回合 =====" for line in lines)
+    
+    # 文本回调：替换回调后旧回调不再收到日志
+    received = []
+    game.set_log_callback(received.append)
+    game.log("测试")
+    game.set_log_callback(None)
+    game.log("忽略")
+    assert received == ["测试"]
+    
+    # 没有接收器：emit直接返回
+    game.logger.remove_sink(buffer)
+    assert not game.logger.enabled(gamelog.DEATH)
+
+
+def test_distance_index():
+    """距离矩阵：跳过阵亡座位，坐骑只修正出发者/目标"""
+    import random
+    from engine.game import Game
+    from engine.sim import create_ai_players
+    from engine.cards.equip import ChiTu, JueYing
+    
+    rng = random.Random(0)
+    game = Game(create_ai_players(5, rng), verbose=False, rng=rng)
+    p = game.players
+    assert [game.distance(p[0], q) for q in p[1:]] == [1, 2, 2, 1]
+    
+    # 2号位阵亡：1号位与3号位相邻
+    p[2].is_alive = False
+    game.distances.player_died(p[2])
+    assert game.distance(p[1], p[3]) == 1
+    assert game.distance(p[0], p[3]) == 2
+    assert game.distance(p[0], p[2]) >= 999
+    
+    # 3号位装备+1马，0号位装备-1马
+    ChiTu().use(p[3], [], game)
+    assert game.distance(p[0], p[3]) == 3
+    assert game.distance(p[3], p[0]) == 2
+    JueYing().use(p[0], [], game)
+    assert game.distance(p[0], p[3]) == 2
+    assert game.distance(p[0], p[1]) == 1
+    assert game.distances.in_range(p[0], p[3], 2)
+    assert not game.distances.in_range(p[0], p[0], 5)
+
+def test_equip_slots():
+    """装备区：按槽位替换，派生属性随装备同步"""
+    from engine.player import Player
+    from engine.cards.equip import ZhuGeLianNu, QiLinGong, BaGuaZhen, RenWangDun
+    
+    player = Player("测试", 4)
+    assert not player.equip and player.get_attack_range() == 1
+    assert player.equip.put(ZhuGeLianNu()) is None
+    assert player.equip.unlimited_slash and player.get_attack_range() == 1
+    bow = QiLinGong()
+    old = player.equip.put(bow)
+    assert old.name == "诸葛连弩" and old not in player.equip
+    assert not player.equip.unlimited_slash and player.get_attack_range() == 5
+    player.equip.put(BaGuaZhen())
+    player.equip.put(RenWangDun())
+    assert player.equip.armor_effect == "仁王盾"
+    assert [eq.name for eq in player.equip] == ["麒麟弓", "仁王盾"]
+    player.equip.remove(bow)
+    assert player.get_attack_range() == 1 and len(player.equip) == 1
+
+
+def test_card_registry():
+    """卡牌注册表：每张牌一个id，各局共用同一批享元对象"""
+    import pickle
+    import random
+    from engine.deck import Deck
+    from engine.cards import registry
+    
+    a, b = Deck(random.Random(1)), Deck(random.Random(2))
+    a.build_standard()
+    b.build_standard()
+    assert len(a.cards) == len({card.id for card in a.cards})
+    assert {card.id for card in a.cards} == {card.id for card in b.cards}
+    assert sorted(a.cards, key=lambda c: c.id)[0] is sorted(b.cards, key=lambda c: c.id)[0]
+    
+    card = a.cards[0]
+    assert registry.names[card.id] == card.name and registry.kinds[card.id] == card.card_type
+    assert pickle.loads(pickle.dumps(card)) is card
+    assert not hasattr(card, "__dict__")
+    
+    # 花色点数相同的多张牌按第几张区分
+    from engine.cards.basic import Slash
+    first, second = registry.intern(Slash, "♠", "A"), registry.intern(Slash, "♠", "A", 1)
+    assert first is not second and first.id != second.id
+    assert registry.intern(Slash, "♠", "A", 1) is second and registry.copies[second.id] == 1
+
+
+def test_deck_templates():
+    """牌堆模板：每个进程只构建一次，reset只洗一次牌"""
+    import random
+    from engine.deck import Deck, get_template, composition_from_counts, STANDARD
+    from engine.cards.basic import Slash, Peach
+    
+    assert get_template() is get_template(STANDARD)
+    deck = Deck(random.Random(3))
+    deck.reset()
+    first = list(deck.cards)
+    assert len(first) == len(STANDARD) == 82
+    deck.draw()
+    deck.discard(first[0])
+    deck.reset(random.Random(3))
+    assert deck.cards == first and not deck.discards
+    
+    # 自定义牌堆：只有杀和桃
+    custom = get_template(composition_from_counts({Slash: 10, Peach: 2}))
+    deck = Deck(random.Random(0), custom)
+    deck.reset()
+    assert sorted(card.name for card in deck.cards) == ["杀"] * 10 + ["桃"] * 2
+    
+    # 超过52张时花色点数会重复，每张牌仍有自己的id，发到手牌里不会丢
+    from engine.player import Player
+    big = get_template(composition_from_counts({Slash: 60, Peach: 60}))
+    assert len({card.id for card in big.cards}) == len(big) == 120
+    deck = Deck(random.Random(0), big)
+    deck.reset()
+    player = Player("甲", 4)
+    for _ in range(120):
+        player.hand.append(deck.draw())
+    assert len(player.hand) == 120
+
+
+def test_hand_indexes():
+    """手牌容器：保持顺序，按类O(1)取牌和计数"""
+    from engine.hand import Hand
+    from engine.cards.basic import Slash, Dodge, Peach
+    from engine.cards.trick import Dismantle, Snatch, Duel
+    
+    cards = [Slash(), Dodge(), Snatch(), Slash(), Dismantle(), Peach()]
+    hand = Hand(cards)
+    assert list(hand) == cards and len(hand) == 6
+    assert hand.first(Slash) is cards[0] and hand.count(Slash) == 2
+    assert hand.first(Dismantle, Snatch) is cards[2]
+    assert hand.first(Duel) is None
+    
+    hand.remove(cards[0])
+    assert hand.first(Slash) is cards[3] and hand.count(Slash) == 1
+    assert hand.pop(1) is cards[2] and hand.first(Dismantle, Snatch) is cards[4]
+    assert hand.pop() is cards[5] and hand.count(Peach) == 0
+    assert hand[0] is cards[1] and hand[-1] is cards[4]
+    assert hand.remove_id(cards[3].id) is cards[3]
+    assert list(hand) == [cards[1], cards[4]] and cards[0] not in hand
+
+
+def test_event_bus():
+    """事件总线：优先级、一次性监听、取消订阅、通配监听"""
+    from engine.events import EventBus
+    
+    bus = EventBus()
+    calls = []
+    assert not bus.has_subscribers("card_used")
+    low = bus.on("card_used", lambda **kw: calls.append("low"))
+    bus.on("card_used", lambda **kw: calls.append("high"), priority=10)
+    bus.once("card_used", lambda **kw: calls.append("once"))
+    bus.emit("card_used", card=None)
+    bus.emit("card_used", card=None)
+    assert calls == ["high", "low", "once", "high", "low"]
+    
+    calls.clear()
+    bus.off(low)
+    wildcard = bus.on("*", lambda name, **kw: calls.append(name))
+    bus.emit("card_used")
+    bus.emit("draw_phase")
+    assert calls == ["high", "card_used", "draw_phase"]
+    assert bus.has_subscribers("anything")
+    bus.off(wildcard)
+    assert not bus.has_subscribers("draw_phase")
+
+
+def test_skill_index():
+    """技能触发索引：合法性检查不发动技能，实际出【杀】时才发动哆哮"""
+    import random
+    from engine import gamelog
+    from engine.game import Game
+    from engine.player import Player
+    from engine.hero import ZhangFei, CaoCao, LiuBei
+    from engine.cards.basic import Slash
+    
+    buffer = gamelog.RingBufferSink()
+    players = [Player("张飞", 4, ZhangFei(), is_ai=False), Player("曹操", 4, CaoCao(), is_ai=False),
+               Player("刘备", 4, LiuBei(), is_ai=False)]
+    game = Game(players, verbose=False, rng=random.Random(0), log_sinks=[buffer])
+    zhangfei, caocao, liubei = players
+    assert [s.name for s in game.skills.skills("damage_taken", caocao)] == [" 奸雄"]
+    assert game.skills.skills("damage_taken", liubei) == ()
+    
+    zhangfei.slash_used_this_turn = True
+    slash = Slash()
+    assert slash.can_use(zhangfei, game)
+    assert slash.can_use(liubei, game)
+    liubei.slash_used_this_turn = True
+    assert not slash.can_use(liubei, game)
+    assert not any(r[0] == gamelog.SKILL_PAOXIAO for r in buffer.records)
+    
+    game.skills.dispatch("check_slash_limit", zhangfei, game)
+    assert buffer.records[-1][0] == gamelog.SKILL_PAOXIAO
+
+
+def test_legal_actions():
+    """合法出牌：只列出当前阶段可用的牌和目标，不修改状态"""
+    from engine.cards.basic import Slash, Dodge, Peach
+    from engine.cards.trick import Duel
+    
+    game = setup_demo_game(seed=4)
+    player = game.current_player
+    assert game.phase == "play" and not player.is_ai
+    player.hand.clear()
+    slash, dodge, peach, duel = Slash(), Dodge(), Peach(), Duel()
+    player.hand.extend([slash, dodge, peach, duel])
+    
+    state = [(p.hp, len(p.hand)) for p in game.players]
+    actions = game.legal_actions()
+    assert [(p.hp, len(p.hand)) for p in game.players] == state
+    # 4人局攻击范围1：只能【杀】相邻的1、3号位；体力满时不能用【桃】
+    assert (slash, [1]) in actions and (slash, [3]) in actions and (slash, [2]) not in actions
+    assert not any(card is dodge or card is peach for card, _ in actions)
+    assert sorted(t[0] for c, t in actions if c is duel) == [1, 2, 3]
+    
+    assert game.is_legal_action(slash, [1]) and not game.is_legal_action(slash, [2])
+    player.slash_used_this_turn = True
+    assert not any(card is slash for card, _ in game.legal_actions())
+    assert game.legal_actions(game.players[1]) == []
+
+
+def test_snapshot_restore():
+    """状态快照：恢复后继续推进得到完全相同的对局"""
+    import random
+    from engine.game import Game
+    from engine.sim import create_ai_players
+    
+    def state(game):
+        return ([(p.hp, p.is_alive, list(p.hand), list(p.equip)) for p in game.players],
+                list(game.deck.cards), list(game.deck.discards), game.turn_index, game.phase,
+                [game.distance(a, b) for a in game.players for b in game.players])
+    
+    rng = random.Random(9)
+    game = Game(create_ai_players(5, rng), verbose=False, rng=rng)
+    saved = game.snapshot()
+    before = state(game)
+    for _ in range(60):
+        game.scheduler.step()
+    after = state(game)
+    
+    game.restore(saved)
+    assert state(game) == before
+    for _ in range(60):
+        game.scheduler.step()
+    assert state(game) == after
+    
+    # apply / undo：试走一步再撤销
+    game.restore(saved)
+    game.phase = "play"
+    actions = game.legal_actions()
+    assert actions
+    with game.silenced():
+        for card, targets in actions:
+            game.apply(card, targets)
+            game.undo()
+    assert state(game)[:4] == before[:4] and not game.undo_stack
+
+
+def test_mcts_ai():
+    """蒙特卡洛树搜索AI：8人全AI对局能在几秒内打完，同种子可复现，且不影响真实对局状态"""
+    import random
+    from engine.game import Game
+    from engine.sim import play_game, create_ai_players
+    from engine.mcts import MCTSController
+    
+    first = play_game(8, max_turns=60, seed=3, ai="mcts")
+    assert play_game(8, max_turns=60, seed=3, ai="mcts") == first
+    
+    # 不同进程中同种子的结果也相同（搜索种子不能依赖进程内的哈希值）
+    import os
+    import subprocess
+    import sys
+    code = "from engine.sim import play_game; print(play_game(5, max_turns=60, seed=11, ai='mcts'))"
+    here = os.path.dirname(os.path.abspath(__file__))
+    outputs = [subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True,
+                              text=True, check=True).stdout for _ in range(2)]
+    assert outputs[0] == outputs[1]
+    
+    rng = random.Random(1)
+    game = Game(create_ai_players(4, rng), verbose=False, rng=rng, ai_factory=MCTSController)
+    game.phase = "play"
+    ai = game.ai_controllers[game.current_player]
+    before = game.snapshot()
+    action = ai.decide_action()
+    assert action is None or action in game.legal_actions()
+    after = game.snapshot()
+    assert [(p.hand, p.hp) for p in before.players] == [(p.hand, p.hp) for p in after.players]
+    assert before.draw_pile == after.draw_pile and not game.searching
+    
+    # 限时间时不受默认模拟次数限制：时间越多模拟越多
+    counts = []
+    for budget in (0.02, 0.2):
+        ai = MCTSController(game.current_player, game, time_budget=budget)
+        ai.decide_action()
+        counts.append(ai.last_playouts)
+    assert counts[1] > max(counts[0], 24)
+
+
+def test_threat_model():
+    """身份推断：攻击主公的角色被视为反贼，忠臣不攻击主公"""
+    import random
+    from engine.game import Game
+    from engine.player import Player
+    from engine.cards.basic import Slash
+    
+    roles = ["lord", "loyalist", "rebel", "rebel"]
+    players = [Player(f"P{i}", 4, is_ai=False, role=role) for i, role in enumerate(roles)]
+    game = Game(players, verbose=False, rng=random.Random(0))
+    lord, loyalist, rebel_a, rebel_b = players
+    threats = game.threats
+    
+    assert threats.best_target(loyalist) is not lord
+    assert threats.best_target(rebel_a) is lord
+    
+    # 3号位对主公出【杀】：主公和忠臣都把他排在最前
+    saved = game.snapshot()
+    threats.card_used(rebel_b, Slash(), lord)
+    assert threats.lean(rebel_b) < 0
+    assert threats.best_target(lord) is rebel_b
+    assert threats.best_target(loyalist) is rebel_b
+    # 只考虑攻击范围内的角色
+    assert threats.best_target(loyalist, lambda p: p is rebel_a) is rebel_a
+    
+    # 阵亡角色不会被选中
+    rebel_b.is_alive = False
+    assert threats.best_target(lord) is not rebel_b
+    assert threats.best_target(loyalist, lambda p: p is lord) is None
+    
+    # 恢复快照时忠诚度一起恢复
+    game.restore(saved)
+    assert threats.lean(rebel_b) == 0
+    
+    # 身份推断不订阅事件：无界面对局的事件总线保持为空
+    for event_name in ("card_used", "damage", "peach_used"):
+        assert not game.has_listeners(event_name)
+
+
+def _skip(reason):
+    """缺少可选依赖时跳过测试：在 pytest 下报告为跳过，直接运行本文件时只打印提示"""
+    import sys
+    if "pytest" in sys.modules:
+        import pytest
+        pytest.skip(reason)
+    print(f"{reason}，跳过")
+
+
+def test_batch_kernel():
+    """NumPy批量模拟与对象引擎的基本牌对局统计一致（各阵营胜率、平均回合数）"""
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        _skip("未安装numpy")
+        return
+    from engine.batch import run_batch, play_basic_game
+    
+    # 批量模拟的局数足够多，其胜率分布当作期望值
+    players = 6
+    batch = run_batch(20000, players, seed=0)
+    assert batch.games == 20000 and sum(batch.wins.values()) == 20000
+    
+    games = 1000
+    results = [play_basic_game(players, seed=i) for i in range(games)]
+    
+    # 各阵营获胜局数的卡方检验；主公/反贼/内奸之外的结果（超时、平局等）合为一类
+    camps = ("lord", "rebel", "traitor")
+    
+    def counts(wins, total):
+        main = [wins.get(camp, 0) for camp in camps]
+        return main + [total - sum(main)]
+    
+    observed = counts({camp: sum(1 for winner, _ in results if winner == camp) for camp in camps}, games)
+    expected = [n * games / batch.games for n in counts(batch.wins, batch.games)]
+    assert min(expected) >= 5, expected  # 卡方检验要求每类的期望局数不太少
+    chi2 = sum((o - e) ** 2 / e for o, e in zip(observed, expected))
+    assert chi2 < 16.27, (observed, expected, chi2)  # 自由度3，p=0.001
+    
+    # 平均回合数相差不超过5%（约3倍标准误）
+    ref_turns = sum(turns for _, turns in results) / games
+    mean_turns = batch.turns / batch.games
+    assert abs(ref_turns - mean_turns) < 0.05 * mean_turns, (ref_turns, mean_turns)
+
+
+def test_benchmarks():
+    """基准测试：结果字段齐全，吞吐量明显低于基线时报告退化"""
+    from engine.bench import run_benchmarks, compare
+    
+    results = run_benchmarks(["deck.draw", "game.distance", "game.ai_turn"], min_time=0.02, alloc_ops=5)
+    assert results["deck.draw"]["batch"] > 1  # 很快的操作按批计时
+    for result in results.values():
+        assert result["ops_per_sec"] > 0 and result["batch_p50_us"] <= result["batch_p99_us"]
+        assert result["batch"] >= 1
+        assert result["alloc_bytes"] >= 0
+    
+    assert compare(results, results) == []
+    slower = {name: dict(r, ops_per_sec=r["ops_per_sec"] * 2) for name, r in results.items()}
+    regressions = compare(results, slower)
+    assert {name for name, metric, _, _ in regressions} == set(results)
+
+
+def test_phase_profiler():
+    """按阶段统计耗时：不改变对局结果，统计各阶段次数，停用后恢复原方法，可被 pstats 读取"""
+    import pstats
+    import random
+    from engine.game import Game
+    from engine.sim import play_game, create_ai_players
+    from engine.profiling import PhaseProfiler
+    
+    profiler = PhaseProfiler()
+    assert play_game(4, seed=5, profiler=profiler) == play_game(4, seed=5)
+    assert profiler.calls["phase.play"] >= profiler.calls["phase.finish"] > 0
+    assert profiler.calls["game.start_turn"] == 1
+    assert any(name.startswith("card.") for name in profiler.calls)
+    for name, count, total, own in profiler.rows():
+        assert count > 0 and total >= own - 1e-9
+    
+    stats = pstats.Stats(profiler)
+    assert ("engine.game", 0, "phase.play") in stats.stats
+    
+    rng = random.Random(0)
+    game = Game(create_ai_players(4, rng), verbose=False, rng=rng)
+    record = game.record
+    game.enable_profiling()
+    assert "play_card" in vars(game)
+    game.disable_profiling()
+    assert "play_card" not in vars(game) and game.record is record
+    assert game.scheduler._handlers["play"] == game.play_phase
+    
+    # 与录像同时使用：停用统计不会去掉录像在之后装上的包装
+    from engine.replay import ReplayRecorder, Replayer
+    rng = random.Random(2)
+    recorder = ReplayRecorder()
+    game = Game(create_ai_players(4, rng), verbose=False, rng=rng, profiler=PhaseProfiler(),
+                recorder=recorder)
+    profiler = game.profiler
+    for _ in range(20):
+        game.next_turn()
+    game.disable_profiling()
+    assert all("decide_action" in vars(ai) for ai in game.ai_controllers.values())
+    calls = dict(profiler.calls)
+    while game.phase != "game_over" and game.scheduler.turn_count < 60:
+        game.next_turn()
+    assert profiler.calls == calls
+    replayed = Replayer(recorder.finish()).run()
+    assert [(p.hp, tuple(p.hand)) for p in replayed.players] == [(p.hp, tuple(p.hand)) for p in game.players]
+
+
+def test_replay():
+    """对局录像：编码后重放得到相同的对局，可以跳转到之前的回合；人类玩家的操作同样可以重放"""
+    from engine.game import Game
+    from engine.player import Player
+    from engine.cards.basic import Dodge
+    from engine.replay import Replay, ReplayRecorder, Replayer, record_game
+    
+    def state(game):
+        return [(p.hp, p.is_alive, tuple(p.hand), tuple(p.equip)) for p in game.players] + [
+            tuple(game.deck.cards), game.scheduler.turn_count, game.phase]
+    
+    # 全AI对局
+    replay, winner = record_game(5, seed=11)
+    replayer = Replayer(Replay.from_bytes(replay.to_bytes()), snapshot_every=5)
+    game = replayer.run()
+    assert (game.check_game_over() or "timeout") == winner
+    assert game.scheduler.turn_count == replay.turns
+    middle = state(Replayer(replay).seek(replay.turns // 2))
+    assert state(replayer.seek(replay.turns // 2)) == middle  # 从快照回退
+    
+    # 0号位为人类玩家，按界面的方式调用引擎
+    roles = ["lord", "loyalist", "rebel", "rebel"]
+    players = [Player(f"P{i}", 4, is_ai=i > 0, role=role) for i, role in enumerate(roles)]
+    recorder = ReplayRecorder()
+    game = Game(players, verbose=False, seed=3, recorder=recorder)
+    human = players[0]
+    
+    def respond(request, **kwargs):
+        if not request.target_player.is_ai:
+            dodge = request.target_player.hand.first(Dodge)
+            game.response_system.handle_response(
+                request.target_player.hand.index(dodge) if dodge is not None else None)
+    game.event_bus.on("response_request", respond)
+    game.event_bus.on("discard_phase", lambda player, count, **kwargs: game.discard_cards(list(range(count))))
+    
+    while game.phase != "game_over" and game.scheduler.turn_count < 40:
+        actions = game.legal_actions(human) if game.current_player is human else []
+        if actions:
+            card, targets = actions[0]
+            game.use_card(human.hand.index(card), targets)
+        else:
+            game.next_turn()
+    
+    replay = Replay.from_bytes(recorder.finish().to_bytes())
+    assert replay.seed == 3 and replay.rng_state is None  # 直接由种子创建的对局只保存种子
+    assert state(Replayer(replay).run()) == state(game)
+
+
+def _qt_app():
+    """界面测试用的 QApplication（无显示环境时用 offscreen 平台），未安装 PySide6 时返回None"""
+    import os
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PySide6.QtWidgets import QApplication
+    except ImportError:
+        print("未安装PySide6，跳过界面测试")
+        return None
+    return QApplication.instance() or QApplication([])
+
+
+def test_scene_diffing():
+    """牌桌增量刷新：面板和手牌图形项保留复用，每次刷新只修改有变化的项"""
+    if _qt_app() is None:
+        return
+    import random
+    from engine.game import Game
+    from engine.sim import create_ai_players
+    from ui.table.scene import GameView
+    
+    rng = random.Random(1)
+    players = create_ai_players(8, rng)
+    players[0].is_ai = False
+    game = Game(players, verbose=False, rng=rng)
+    view = GameView(game)
+    panels = list(view.player_panels)
+    
+    view.refresh()
+    assert view.changed_items == 0
+    
+    # 打出一张手牌：移除1张、其余左移，加上面板的手牌数
+    human = players[0]
+    kept = list(view.hand_cards[1:])
+    card = human.hand[0]
+    human.hand.remove(card)
+    game.deck.discard(card)
+    view.refresh()
+    assert view.changed_items <= len(human.hand) + 2
+    assert view.hand_cards == kept and [item.card for item in view.hand_cards] == list(human.hand)
+    
+    players[3].hp -= 1
+    view.refresh()
+    assert view.changed_items == 1 and view.player_panels == panels
+    
+    # 换一局游戏时重建
+    view.game = Game(create_ai_players(4, rng), verbose=False, rng=rng)
+    view.refresh()
+    assert len(view.player_panels) == 4 and not view.hand_cards
+
+
+def test_refresh_scheduler():
+    """界面刷新调度：多次标记合并为一帧内的一次刷新，对话框前可立即刷新"""
+    if _qt_app() is None:
+        return
+    import random
+    from PySide6.QtTest import QTest
+    from engine.game import Game
+    from engine.sim import create_ai_players
+    from ui.refresh import RefreshScheduler
+    from ui.app import MainWindow
+    
+    calls = []
+    scheduler = RefreshScheduler(interval=0)
+    scheduler.register("a", lambda: calls.append("a"))
+    scheduler.register("b", lambda: calls.append("b"))
+    for _ in range(5):
+        scheduler.mark("a")
+    scheduler.mark("b")
+    assert not calls and scheduler.pending == {"a", "b"}
+    QTest.qWait(20)
+    assert calls == ["a", "b"] and scheduler.flushes == 1 and scheduler.requests == 6
+    
+    scheduler.mark("b")
+    scheduler.flush()
+    scheduler.flush()
+    assert calls == ["a", "b", "b"] and scheduler.flushes == 2
+    try:
+        scheduler.mark("c")
+        assert False, "未注册的区域应报错"
+    except KeyError:
+        pass
+    
+    # 后台线程一口气下完整局AI对局，大量事件只在下一帧刷新一次
+    rng = random.Random(2)
+    players = create_ai_players(5, rng)
+    game = Game(players, verbose=False, rng=rng)
+    window = MainWindow(game, players[0].role, players[0].hero)
+    refresher = window.refresher
+    window.worker.thread.join(10)
+    assert game.phase == "game_over" and refresher.requests == 0
+    QTest.qWait(100)
+    assert refresher.requests > 4 and refresher.flushes == 1 and not refresher.pending
+    view = window.view
+    assert [panel.is_current for panel in view.player_panels] == [p is game.current_player for p in players]
+    window.close()
+    window.deleteLater()
+
+
+def test_card_face_cache():
+    """牌面缓存：相同的牌面只渲染一次，尺寸过多时丢弃最久未用的图集"""
+    if _qt_app() is None:
+        return
+    from PySide6.QtGui import QColor
+    from engine.cards.basic import Slash, Peach
+    from ui.table.faces import CardFaceCache
+    from ui.table import scene
+    
+    cache = CardFaceCache(max_sizes=2)
+    peach = Peach("♥", "3")
+    page, source = cache.face(peach, 80, 110)
+    assert cache.face(Peach("♥", "3"), 80, 110) == (page, source)
+    assert cache.renders == 1 and cache.hits == 1
+    # 同一张图集页面上的不同格子
+    other_page, other_source = cache.face(Slash("♠", "7"), 80, 110)
+    assert other_page is page and other_source != source and cache.renders == 2
+    
+    # 红色花色的牌面画出了红字
+    image = page.toImage()
+    rect = source.toRect()
+    assert any(QColor(image.pixel(x, y)).red() > 150
+               for x in range(rect.left(), rect.right(), 2) for y in range(rect.top(), rect.bottom(), 2))
+    
+    cache.face(peach, 65, 110)
+    cache.face(peach, 120, 160)
+    assert cache.sizes == ((65, 110), (120, 160)) and cache.evictions == 1
+    
+    # 手牌图形项从全局缓存中取牌面，没有子文字项
+    item = scene.CardItem(peach, 0, 0)
+    renders = scene.card_faces.renders
+    again = scene.CardItem(Peach("♥", "3"), 90, 0)
+    assert scene.card_faces.renders == renders and again._face == item._face
+    assert not item.childItems()
+    again.resize(65)
+    assert again._face != item._face
+
+
+def test_animation_timeline():
+    """动画时间线：按顺序播放，积压时跳过展示步骤，scale=0 时立即执行"""
+    if _qt_app() is None:
+        return
+    from PySide6.QtTest import QTest
+    from ui.timeline import AnimationTimeline
+    
+    played = []
+    idle = []
+    
+    # scale=0：不等待，加入即执行
+    timeline = AnimationTimeline(scale=0)
+    timeline.idle.connect(lambda: idle.append(True))
+    timeline.play(lambda: played.append(1), 1000)
+    timeline.play(lambda: played.append(2), 1000)
+    assert played == [1, 2] and not timeline.busy and len(idle) == 2
+    
+    # 动作中加入的步骤排在后面，不会重入
+    played.clear()
+    timeline.play(lambda: (played.append("a"), timeline.play(lambda: played.append("b"))))
+    assert played == ["a", "b"]
+    
+    # 积压超过 skip_after 时跳过展示步骤，不可跳过的步骤总会执行
+    played.clear()
+    timeline = AnimationTimeline(scale=1, skip_after=1)
+    timeline.play(lambda: played.append("A"), 10)
+    for name in "BCD":
+        timeline.play(lambda name=name: played.append(name), 10)
+    timeline.play(lambda: played.append("E"), skippable=False)
+    assert played == ["A"] and timeline.busy
+    QTest.qWait(100)
+    assert played == ["A", "D", "E"] and timeline.skipped == 2 and not timeline.busy
+    
+    # skip()：只执行队首展示步骤中的最后一个
+    played.clear()
+    timeline.play(lambda: played.append("F"), 1000)
+    timeline.play(lambda: played.append("G"), 1000)
+    timeline.play(lambda: played.append("H"), 1000)
+    timeline.play(lambda: played.append("I"), skippable=False)
+    timeline.skip()
+    assert played == ["F", "H"] and timeline.skipped == 3
+    timeline.clear()
+    assert not timeline.busy
+
+
+def test_game_worker():
+    """后台推进对局：事件和日志经消息队列到达，人类玩家的决定以请求的方式等待答复"""
+    import random
+    from engine.game import Game
+    from engine.sim import create_ai_players
+    from engine import worker as w
+    
+    rng = random.Random(4)
+    players = create_ai_players(4, rng)
+    human = players[0]
+    human.is_ai = False
+    game = Game(players, verbose=False, rng=rng)
+    worker = w.GameWorker(game, events=["card_used", "damage"]).start()
+    
+    seen = set()
+    events = set()
+    result = None
+    while result is None:
+        kind, *rest = worker.messages.get(timeout=10)
+        seen.add(kind)
+        if kind == w.EVENT:
+            events.add(rest[0])
+        elif kind == w.ERROR:
+            raise AssertionError(rest[0])
+        elif kind == w.FINISHED:
+            result = rest[0]
+        elif kind == w.REQUEST:
+            decision = rest[0]
+            # 等待答复期间工作线程已释放 lock，可以安全读取对局状态
+            assert worker.lock.acquire(blocking=False)
+            try:
+                assert decision.player is human
+                if decision.kind == w.PLAY:
+                    actions = game.legal_actions(human)
+                    answer = ("use", human.hand.index(actions[0][0]), actions[0][1]) if actions else ("end",)
+                elif decision.kind == w.DISCARD:
+                    answer = list(range(decision.payload["count"]))
+                else:
+                    assert decision.payload["request"].target_player is human
+                    answer = None
+            finally:
+                worker.lock.release()
+            decision.resolve(answer)
+    worker.thread.join(5)
+    assert not worker.thread.is_alive() and game.phase == "game_over"
+    assert result == game.check_game_over()
+    assert {w.LOG, w.REQUEST, w.EVENT} <= seen and events <= {"card_used", "damage"}
+    
+    # 停止：正在等待的决定按放弃处理，线程退出
+    players = create_ai_players(4, rng)
+    players[0].is_ai = False
+    game = Game(players, verbose=False, rng=rng)
+    worker = w.GameWorker(game).start()
+    while worker.messages.get(timeout=10)[0] != w.REQUEST:
+        pass
+    worker.stop(timeout=5)
+    assert not worker.thread.is_alive()
+
+
 if __name__ == "__main__":
     test_game()
+    test_headless_simulation()
+    test_turn_scheduler()
+    test_parallel_tournament_deterministic()
+    test_seeded_games_reproducible()
+    test_structured_log()
+    test_distance_index()
+    test_equip_slots()
+    test_card_registry()
+    test_deck_templates()
+    test_hand_indexes()
+    test_event_bus()
+    test_skill_index()
+    test_legal_actions()
+    test_snapshot_restore()
+    test_mcts_ai()
+    test_threat_model()
+    test_batch_kernel()
+    test_benchmarks()
+    test_phase_profiler()
+    test_replay()
+    test_scene_diffing()
+    test_refresh_scheduler()
+    test_card_face_cache()
+    test_animation_timeline()
+    test_game_worker()
@@ -2,18 +2,46 @@ from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QHBoxLayout, 
     QVBoxLayout, QPushButton, QTextEdit, QLabel
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QTextCursor
 from ui.table.scene import GameView
+from ui.refresh import RefreshScheduler, FRAME_MS
+from ui.timeline import AnimationTimeline
 from ui.dialogs import HeroSelectDialog, RoleSelectDialog, DiscardDialog, PlayerCountDialog, HeroInfoDialog
 from ui.response_dialog import ResponseDialog
 from engine.game import Game, setup_demo_game, get_role_config
 from engine.player import Player
 from engine.hero import get_random_heroes
+from engine import worker
+from engine.worker import GameWorker
+
+
+# 刷新区域：牌桌面板、底部手牌、牌桌左上角提示、右侧游戏信息
+TABLE, HAND, STATUS, INFO = "table", "hand", "status", "info"
+
+# 引擎事件 -> 需要刷新的区域（出牌、换回合等会改变全部区域的操作刷新全部）
+EVENT_REGIONS = {
+    "card_used": (TABLE, HAND, STATUS, INFO),
+    "card_effect_done": (TABLE, HAND, STATUS, INFO),
+    "damage": (TABLE,),
+    "peach_used": (TABLE,),
+    "response_used": (TABLE, HAND, STATUS, INFO),
+    "prepare_phase": (TABLE, STATUS, INFO),
+    "judge_phase": (STATUS, INFO),
+    "draw_phase": (TABLE, HAND, STATUS, INFO),
+    "play_phase": (STATUS, INFO),
+}
+
+# 需要后台线程转发给界面的引擎事件
+UI_EVENTS = tuple(EVENT_REGIONS) + ("dodge_used",)
+
+# 动画时长（毫秒，乘以 MainWindow 的 animation_scale）
+CARD_SHOW_MS = 1000  # 桌面中央显示一张牌
+AI_TURN_PAUSE_MS = 800  # AI回合之间的停顿
 
 
 class MainWindow(QMainWindow):
-    def __init__(self, game: Game, selected_role: str, player_hero):
+    def __init__(self, game: Game, selected_role: str, player_hero, animation_scale=1.0):
         super().__init__()
         self.setWindowTitle("三国杀 - 单机版")
         self.resize(1200, 800)
@@ -179,100 +207,118 @@ class MainWindow(QMainWindow):
         self.btn_restart.clicked.connect(self.on_restart)
         self.btn_hero_info.clicked.connect(self.show_hero_info)
         
-        # 初始化显示
-        self.update_info()
+        # 界面刷新：事件只标记脏区域，每帧最多刷新一次
+        self.refresher = RefreshScheduler(self)
+        self.refresher.register(TABLE, self.view.refresh_table)
+        self.refresher.register(HAND, self.view.refresh_hand)
+        self.refresher.register(STATUS, self.view.refresh_status)
+        self.refresher.register(INFO, self.update_info)
+        
+        # 动画按事件顺序播放，播放完后清除中央的牌（animation_scale=0 时不播放动画）
+        self.timeline = AnimationTimeline(self, scale=animation_scale)
+        self.timeline.idle.connect(self.view.clear_center_card)
         
-        # 设置游戏日志回调
-        self.game.set_log_callback(self.log)
+        # 引擎在后台线程运行，界面每帧取一次它发来的消息
+        self.worker = None
+        self._play_request = None  # 等待玩家出牌的请求（不是玩家的出牌阶段时为None）
+        self._drain_timer = QTimer(self)
+        self._drain_timer.timeout.connect(self._drain)
+        self._drain_timer.start(FRAME_MS)
         
-        # 监听出牌事件，在中间显示
-        self.game.event_bus.on("card_used", self.on_card_used_event)
-        # 监听效果完成事件，刷新界面
-        self.game.event_bus.on("card_effect_done", self.on_card_effect_done)
-        # 监听出闪事件
-        self.game.event_bus.on("dodge_used", self.on_dodge_used_event)
-        # 监听响应请求（如被杀需要出闪）
-        self.game.event_bus.on("response_request", self.on_response_request)
+        # 初始化显示
+        self.update_info()
         
         self.log("游戏开始！")
         self.log(f"你的身份：{self._get_role_name(selected_role)}")
         self.log(f"你的武将：{player_hero.name}")
         self.log(f"当前玩家：{self.game.current_player.name}")
         
-        # 如果第一个玩家是AI，自动切换到玩家回合
-        if self.game.current_player.is_ai:
-            from PySide6.QtCore import QTimer
-            QTimer.singleShot(500, self.auto_play_ai_turns)
+        self._start_worker()
 
-    def on_card_used_event(self, source, card, target, **kwargs):
-        """处理出牌事件，在中间显示"""
-        # 先刷新界面，再显示动画
-        self.view.refresh()
-        self.update_info()
-        # 使用QTimer延迟显示，确保界面已经刷新
-        from PySide6.QtCore import QTimer
-        QTimer.singleShot(100, lambda: self.view.show_card_in_center(card, source, target))
+    def _start_worker(self):
+        """在后台线程中推进当前游戏（开局和重新开始时调用）"""
+        self.worker = GameWorker(self.game, UI_EVENTS).start()
+        # 引擎运行时不读取对局状态，等它暂停后再刷新
+        self.refresher.guard = self.worker.lock
+    
+    def _drain(self):
+        """处理后台线程发来的消息"""
+        for kind, *args in self.worker.drain():
+            if kind == worker.EVENT:
+                self._on_engine_event(*args)
+            elif kind == worker.LOG:
+                self.log(args[0])
+            elif kind == worker.REQUEST:
+                # 排在已有的出牌动画之后再让玩家决定
+                decision = args[0]
+                self.timeline.play(lambda decision=decision: self._present(decision), skippable=False)
+            elif kind == worker.FINISHED:
+                self.refresher.mark()
+            elif kind == worker.ERROR:
+                self.log(f"游戏出错：\n{args[0]}")
+    
+    def _on_engine_event(self, event_name, kwargs):
+        regions = EVENT_REGIONS.get(event_name)
+        if regions:
+            # 状态变化的事件只标记需要刷新的区域
+            self.refresher.mark(*regions)
+        if event_name == "card_used":
+            self.on_card_used_event(**kwargs)
+        elif event_name == "dodge_used":
+            self.on_dodge_used_event(**kwargs)
+        elif event_name == "prepare_phase":
+            player = kwargs["player"]
+            self.log("=" * 30)
+            self.log(f"轮到 {player.name} 的回合")
+            if player.is_ai:
+                # 停顿一下让玩家看到AI操作
+                self.timeline.wait(AI_TURN_PAUSE_MS)
+    
+    def _present(self, decision):
+        """轮到玩家做决定：出牌阶段等待按钮操作，弃牌和响应弹出对话框"""
+        if decision.resolved:
+            return  # 已经换局
+        # 先把未刷新的区域和最新的一张牌画出来
+        self.timeline.skip()
+        self.refresher.flush()
+        if decision.kind == worker.PLAY:
+            self._play_request = decision
+        elif decision.kind == worker.DISCARD:
+            self.on_discard_phase(decision)
+        elif decision.kind == worker.RESPONSE:
+            self.on_response_request(decision)
     
-    def on_card_effect_done(self, source, card, target, **kwargs):
-        """卡牌效果执行完成，刷新UI显示最新状态"""
-        # 延迟刷新，让动画显示一段时间后再更新
-        from PySide6.QtCore import QTimer
-        QTimer.singleShot(2100, lambda: (
-            self.view.refresh(),
-            self.update_info()
-        ))
+    def on_card_used_event(self, source, card, target, **kwargs):
+        """处理出牌事件，排入动画时间线在中间显示（界面状态的刷新见 EVENT_REGIONS）"""
+        self.timeline.play(lambda: self.view.show_card_in_center(card, source, target), CARD_SHOW_MS)
     
     def on_dodge_used_event(self, source, card, against, **kwargs):
-        """处理出闪事件，显示闪的动画"""
-        # 在杀的动画之后稍微延迟显示闪
-        from PySide6.QtCore import QTimer
-        QTimer.singleShot(1000, lambda: self.view.show_card_in_center(card, source, None))
+        """处理出闪事件，在杀的动画之后显示闪"""
+        self.timeline.play(lambda: self.view.show_card_in_center(card, source, None), CARD_SHOW_MS)
     
-    def on_discard_phase(self, player, count, **kwargs):
-        """处理弃牌阶段"""
-        # 显示弃牌对话框
-        dialog = DiscardDialog(player, count, self)
+    def on_discard_phase(self, decision):
+        """处理弃牌阶段：弹出弃牌对话框，取消时引擎会再次请求"""
+        dialog = DiscardDialog(decision.player, decision.payload["count"], self)
         if dialog.exec():
-            selected_indices = dialog.get_selected_indices()
-            # 调用游戏引擎的弃牌方法
-            self.game.discard_cards(selected_indices)
-            
-            # 刷新界面
-            self.view.refresh()
-            self.update_info()
-            
-            # 检查游戏是否结束
-            if self.game.phase == "game_over":
-                return
-            
-            self.log(f"轮到 {self.game.current_player.name} 的回合")
-            
-            # 如果AI回合自动结束，继续切换直到玩家回合
-            self.auto_play_ai_turns()
+            # 交给后台线程弃牌并继续推进
+            decision.resolve(dialog.get_selected_indices())
+        else:
+            decision.resolve(None)
     
-    def on_response_request(self, request, **kwargs):
-        """响应请求事件：弹出响应对话框"""
-        # 仅在人类玩家需要响应时弹框
-        if request.target_player.is_ai:
-            return
-        dialog = ResponseDialog(request, self)
+    def on_response_request(self, decision):
+        """响应请求：弹出响应对话框（如被杀需要出闪）"""
+        dialog = ResponseDialog(decision.payload["request"], self)
         if dialog.exec():
             selected_index = dialog.get_selected_index()
         else:
             selected_index = None
-        # 将选择结果交给响应系统处理
-        self.game.response_system.handle_response(selected_index)
-        # 处理后刷新界面
-        self.view.refresh()
-        self.update_info()
+        # 将选择结果交给响应系统处理（在后台线程中结算）
+        decision.resolve(selected_index)
     
     def log(self, message):
-        """添加日志"""
+        """添加一行日志（游戏内日志由后台线程经消息队列发来）"""
         self.log_text.append(message)
-        # 自动滚动到底部
-        cursor = self.log_text.textCursor()
-        cursor.movePosition(QTextCursor.End)
-        self.log_text.setTextCursor(cursor)
+        self.log_text.moveCursor(QTextCursor.End)
 
     def update_info(self):
         """更新游戏信息"""
@@ -291,7 +337,8 @@ class MainWindow(QMainWindow):
             self.log("游戏已结束，请点击'重新开始'开启新局")
             return
         
-        if self.game.current_player.is_ai:
+        # 只有引擎在等待玩家出牌时才能操作（此时后台线程不会修改对局状态）
+        if self._play_request is None:
             self.log("现在是电脑回合，请等待...")
             return
         
@@ -304,74 +351,35 @@ class MainWindow(QMainWindow):
         if card_index >= len(self.game.current_player.hand):
             self.log("手牌索引无效，请重新选择")
             self.view.clear_selections()
-            self.view.refresh()
+            self.refresher.mark(HAND)
             return
         
-        target_indices = self.view.get_selected_target_indices()
+        # 只取第一个目标（卡牌效果只作用于第一个目标）
+        target_indices = self.view.get_selected_target_indices()[:1]
         card = self.game.current_player.hand[card_index]
         
-        success = self.game.use_card(card_index, target_indices)
-        
-        # 不在这里刷新，由事件回调处理
-        if success:
-            self.view.clear_selections()
-        else:
+        # 出牌前预先校验，避免使用失败（如目标超出攻击范围）
+        if not self.game.is_legal_action(card, target_indices):
             self.log(f"无法使用 {card.name}！")
+            return
+        
+        # 交给后台线程出牌，界面由事件刷新
+        request, self._play_request = self._play_request, None
+        request.resolve(("use", card_index, target_indices))
+        self.view.clear_selections()
 
     def on_end(self):
         if self.game.phase == "game_over":
             self.log("游戏已结束，请点击'重新开始'开启新局")
             return
         
-        if self.game.current_player.is_ai:
+        if self._play_request is None:
             self.log("现在是电脑回合，请等待...")
             return
         
         self.log(f"{self.game.current_player.name} 结束回合")
-        self.log("=" * 30)
-        self.game.next_turn()
-        
-        # 检查游戏是否结束
-        if self.game.phase == "game_over":
-            self.view.refresh()
-            self.update_info()
-            return
-        
-        self.log(f"轮到 {self.game.current_player.name} 的回合")
-        self.view.refresh()
-        self.update_info()
-        
-        # 如果AI回合自动结束，继续切换直到玩家回合
-        self.auto_play_ai_turns()
-    
-    def auto_play_ai_turns(self):
-        """自动执行AI回合，直到轮到玩家"""
-        import time
-        from PySide6.QtCore import QTimer
-        
-        if self.game.current_player.is_ai:
-            # 等待一下让玩家看到AI操作
-            QTimer.singleShot(800, self.continue_ai_turn)
-    
-    def continue_ai_turn(self):
-        """继续AI回合"""
-        if self.game.current_player.is_ai and self.game.phase != "game_over":
-            self.log(f"{self.game.current_player.name} (电脑)结束回合")
-            self.log("=" * 30)
-            self.game.next_turn()
-            
-            # 检查游戏是否结束
-            if self.game.phase == "game_over":
-                self.view.refresh()
-                self.update_info()
-                return
-            
-            self.log(f"轮到 {self.game.current_player.name} 的回合")
-            self.view.refresh()
-            self.update_info()
-            
-            # 递归检查是否还是AI
-            self.auto_play_ai_turns()
+        request, self._play_request = self._play_request, None
+        request.resolve(("end",))
     
     def on_restart(self):
         """重新开始游戏"""
@@ -420,19 +428,16 @@ class MainWindow(QMainWindow):
                 ai_hp += 1
             players.append(Player(ai_heroes[i].name, ai_hp, ai_heroes[i], is_ai=True, role=ai_roles[i]))
         
+        # 停止上一局的后台线程，丢弃它还没处理的消息
+        self.worker.stop()
+        self._play_request = None
+        self.refresher.cancel()
+        self.timeline.clear()
+        
         self.game = Game(players)
         self.view.game = self.game
         self.log_text.clear()
         
-        # 重新设置日志回调
-        self.game.set_log_callback(self.log)
-        self.game.event_bus.on("card_used", self.on_card_used_event)
-        self.game.event_bus.on("card_effect_done", self.on_card_effect_done)
-        self.game.event_bus.on("dodge_used", self.on_dodge_used_event)
-        self.game.event_bus.on("discard_phase", self.on_discard_phase)
-        # 监听响应请求（如被杀需要出闪）
-        self.game.event_bus.on("response_request", self.on_response_request)
-        
         self.log("游戏重新开始！")
         self.log(f"你的身份：{self._get_role_name(selected_role)}")
         self.log(f"你的武将：{player_hero.name}")
@@ -440,10 +445,7 @@ class MainWindow(QMainWindow):
         self.view.refresh()
         self.update_info()
         
-        # 如果第一个玩家是AI，自动切换到玩家回合
-        if self.game.current_player.is_ai:
-            from PySide6.QtCore import QTimer
-            QTimer.singleShot(500, self.auto_play_ai_turns)
+        self._start_worker()
     
     def _get_role_name(self, role):
         """获取身份中文名"""
@@ -468,13 +470,17 @@ class MainWindow(QMainWindow):
         else:
             super().keyPressEvent(event)
     
+    def closeEvent(self, event):
+        self.worker.stop()
+        super().closeEvent(event)
+    
     def show_hero_info(self):
         """显示武将信息对话框"""
         dialog = HeroInfoDialog(self)
         dialog.exec()
 
 
-def run_app():
+def run_app(animation_scale=1.0):
     app = QApplication([])
     
     # 1. 选择人数
@@ -523,6 +529,6 @@ def run_app():
         players.append(Player(ai_heroes[i].name, ai_hp, ai_heroes[i], is_ai=True, role=ai_roles[i]))
     
     game = Game(players)
-    window = MainWindow(game, selected_role, player_hero)
+    window = MainWindow(game, selected_role, player_hero, animation_scale)
     window.show()
     app.exec()
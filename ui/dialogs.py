@@ -4,6 +4,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt
 from engine.hero import STANDARD_HEROES
+from ui.table.faces import card_icon, ICON_SIZE
 
 
 class PlayerCountDialog(QDialog):
@@ -303,8 +304,9 @@ class DiscardDialog(QDialog):
             }
         """)
         
+        self.card_list.setIconSize(ICON_SIZE)
         for i, card in enumerate(player.hand):
-            item = QListWidgetItem(f"{card.suit}{card.rank} {card.name}")
+            item = QListWidgetItem(card_icon(card), f"{card.suit}{card.rank} {card.name}")
             item.setData(Qt.UserRole, i)  # 存储索引
             self.card_list.addItem(item)
         
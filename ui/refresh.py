@@ -0,0 +1,76 @@
+"""界面刷新调度 - 按区域标记脏状态，每帧最多刷新一次
+
+引擎事件只调用 mark() 标记需要刷新的区域，调度器在下一帧统一刷新所有脏区域，
+一次出牌触发的多个事件（出牌、伤害、效果完成……）只会产生一次重绘。
+弹出模态对话框前调用 flush() 立即刷新，保证对话框后面的牌桌是最新状态。
+引擎在其他线程运行时把它的锁设为 guard：刷新前先尝试取得锁，取不到（引擎
+正在修改对局）就推迟到下一帧。
+"""
+from PySide6.QtCore import QObject, QTimer
+
+
+# 一帧的时长（毫秒），约60帧/秒
+FRAME_MS = 16
+
+
+class RefreshScheduler(QObject):
+    """脏区域刷新调度器"""
+
+    def __init__(self, parent=None, interval=FRAME_MS):
+        super().__init__(parent)
+        self._handlers = {}  # 区域 -> 刷新函数，按注册顺序刷新
+        self._dirty = set()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self.flush)
+        self.guard = None  # 刷新期间持有的锁（见 engine.worker.GameWorker.lock）
+        self.requests = 0  # mark() 的调用次数
+        self.flushes = 0  # 实际刷新的次数
+
+    def register(self, region, handler):
+        """注册一个区域及其刷新函数 handler()"""
+        self._handlers[region] = handler
+
+    @property
+    def regions(self):
+        return tuple(self._handlers)
+
+    @property
+    def pending(self):
+        """尚未刷新的脏区域"""
+        return frozenset(self._dirty)
+
+    def mark(self, *regions):
+        """标记区域需要刷新（不指定时为全部区域），刷新合并到下一帧进行"""
+        for region in regions:
+            if region not in self._handlers:
+                raise KeyError(f"未注册的刷新区域：{region}")
+        self._dirty.update(regions or self._handlers)
+        self.requests += 1
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """立即刷新所有脏区域（弹出对话框前调用），没有脏区域时什么也不做"""
+        self._timer.stop()
+        if not self._dirty:
+            return
+        guard = self.guard
+        if guard is not None and not guard.acquire(blocking=False):
+            self._timer.start()  # 引擎正在运行，下一帧再试
+            return
+        try:
+            dirty, self._dirty = self._dirty, set()
+            self.flushes += 1
+            for region, handler in self._handlers.items():
+                if region in dirty:
+                    handler()
+        finally:
+            if guard is not None:
+                guard.release()
+
+    def cancel(self):
+        """丢弃尚未刷新的标记（换局时使用）"""
+        self._timer.stop()
+        self._dirty.clear()
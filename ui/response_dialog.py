@@ -1,5 +1,6 @@
 from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QListWidget, QListWidgetItem
 from PySide6.QtCore import Qt
+from ui.table.faces import card_icon, ICON_SIZE
 
 class ResponseDialog(QDialog):
     """响应选择对话框（例如：是否出闪）"""
@@ -19,7 +20,7 @@ class ResponseDialog(QDialog):
         
         # 检查是否装备八卦阵
         player = request.target_player
-        has_bagua = any(hasattr(eq, 'name') and eq.name == "八卦阵" for eq in player.equip)
+        has_bagua = player.equip.armor_effect == "八卦阵"
         
         if has_bagua and request.request_type == "dodge_slash":
             bagua_tip = QLabel("你装备了【八卦阵】，可以选择进行判定代替出闪")
@@ -33,20 +34,21 @@ class ResponseDialog(QDialog):
         # 列出可用的响应牌
         self.list = QListWidget()
         self.list.setSelectionMode(QListWidget.SingleSelection)
+        self.list.setIconSize(ICON_SIZE)
         
         # 填充手牌中符合条件的响应牌
         from engine.cards.basic import Dodge, Peach, Slash
         for i, card in enumerate(player.hand):
             if request.request_type == "dodge_slash" and isinstance(card, Dodge):
-                item = QListWidgetItem(f"{card.suit}{card.rank}  {card.name}")
+                item = QListWidgetItem(card_icon(card), f"{card.suit}{card.rank}  {card.name}")
                 item.setData(Qt.UserRole, i)
                 self.list.addItem(item)
             elif request.request_type == "peach_dying" and isinstance(card, Peach):
-                item = QListWidgetItem(f"{card.suit}{card.rank}  {card.name}")
+                item = QListWidgetItem(card_icon(card), f"{card.suit}{card.rank}  {card.name}")
                 item.setData(Qt.UserRole, i)
                 self.list.addItem(item)
             elif request.request_type == "slash_duel" and isinstance(card, Slash):
-                item = QListWidgetItem(f"{card.suit}{card.rank}  {card.name}")
+                item = QListWidgetItem(card_icon(card), f"{card.suit}{card.rank}  {card.name}")
                 item.setData(Qt.UserRole, i)
                 self.list.addItem(item)
         layout.addWidget(self.list)
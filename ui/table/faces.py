@@ -0,0 +1,143 @@
+from PySide6.QtWidgets import QApplication
+from PySide6.QtGui import (
+    QPixmap, QPainter, QFont, QColor, QPalette, QTextDocument,
+    QAbstractTextDocumentLayout, QIcon
+)
+from PySide6.QtCore import Qt, QRectF, QSize
+
+
+# 每张图集页的格子数（列 x 行），同一尺寸的牌面放不下时再加一页
+PAGE_COLUMNS = 8
+PAGE_ROWS = 4
+
+# 最多同时保留的尺寸数：手牌（普通/缩小）、中心大牌、对话框图标
+MAX_SIZES = 4
+
+# 对话框列表中牌面图标的尺寸
+ICON_SIZE = QSize(60, 80)
+
+RED_SUITS = ("♥", "♦")
+
+
+def face_text(card):
+    """牌面文字：花色、点数和牌名，装备牌加上能力说明"""
+    text = f"{card.suit}{card.rank}\n{card.name}"
+    if getattr(card, "description", ""):
+        text += f"\n{card.description}"
+    return text
+
+
+def render_face(painter, card, width, height):
+    """在 (0, 0, width, height) 中画牌面文字（底色和边框由 CardItem 自己画）"""
+    doc = QTextDocument()
+    if getattr(card, "description", ""):
+        # 装备牌有说明，字体更小
+        doc.setDefaultFont(QFont("Arial", 8))
+    else:
+        doc.setDefaultFont(QFont("Arial", 12, QFont.Bold))
+    doc.setPlainText(face_text(card))
+    doc.setTextWidth(width - 10)  # 留10px边距，自动换行
+
+    # 红色花色用红字
+    context = QAbstractTextDocumentLayout.PaintContext()
+    color = QColor(200, 0, 0) if card.suit in RED_SUITS else QColor(0, 0, 0)
+    context.palette.setColor(QPalette.Text, color)
+
+    # 左边距5px，垂直居中
+    painter.save()
+    painter.translate(5, (height - doc.size().height()) / 2)
+    doc.documentLayout().draw(painter, context)
+    painter.restore()
+
+
+class _Sheet:
+    """同一尺寸牌面的图集：若干张页面，每页按格子排列"""
+
+    def __init__(self, width, height, ratio):
+        self.width = width
+        self.height = height
+        self.ratio = ratio
+        self.pages = []
+        self.slots = {}  # 牌面键 -> (页面, 源矩形)
+
+    def add(self, key, card):
+        index = len(self.slots)
+        per_page = PAGE_COLUMNS * PAGE_ROWS
+        if index % per_page == 0:
+            page = QPixmap(round(self.width * PAGE_COLUMNS * self.ratio),
+                           round(self.height * PAGE_ROWS * self.ratio))
+            page.setDevicePixelRatio(self.ratio)
+            page.fill(Qt.transparent)
+            self.pages.append(page)
+        page = self.pages[-1]
+        column, row = index % per_page % PAGE_COLUMNS, index % per_page // PAGE_COLUMNS
+        x, y = column * self.width, row * self.height
+
+        painter = QPainter(page)
+        painter.setRenderHint(QPainter.TextAntialiasing, True)
+        painter.setClipRect(QRectF(x, y, self.width, self.height))
+        painter.translate(x, y)
+        render_face(painter, card, self.width, self.height)
+        painter.end()
+
+        # drawPixmap 的源矩形以设备像素为单位
+        source = QRectF(x * self.ratio, y * self.ratio, self.width * self.ratio, self.height * self.ratio)
+        slot = self.slots[key] = (page, source)
+        return slot
+
+
+class CardFaceCache:
+    """牌面缓存：每种 (牌类, 花色, 点数, 尺寸) 只渲染一次，之后从图集中直接贴图
+
+    按尺寸分成若干图集，超过 MAX_SIZES 种尺寸时丢弃最久未使用的尺寸的图集
+    （手牌超过10张时换成缩小尺寸，之后很可能还会换回来，所以保留几种）。
+    """
+
+    def __init__(self, max_sizes=MAX_SIZES):
+        self.max_sizes = max_sizes
+        self._sheets = {}  # (宽, 高) -> _Sheet，按最近使用排序
+        self.hits = 0
+        self.renders = 0
+        self.evictions = 0
+
+    def face(self, card, width, height):
+        """返回 (图集页面, 源矩形)，用 painter.drawPixmap(目标矩形, 页面, 源矩形) 绘制"""
+        size = (width, height)
+        sheet = self._sheets.pop(size, None)
+        if sheet is None:
+            if len(self._sheets) >= self.max_sizes:
+                del self._sheets[next(iter(self._sheets))]
+                self.evictions += 1
+            sheet = _Sheet(width, height, QApplication.instance().devicePixelRatio())
+        self._sheets[size] = sheet
+
+        key = (type(card), card.name, card.suit, card.rank)
+        slot = sheet.slots.get(key)
+        if slot is None:
+            self.renders += 1
+            return sheet.add(key, card)
+        self.hits += 1
+        return slot
+
+    def pixmap(self, card, width, height):
+        """单独的牌面图片（用于对话框列表的图标）"""
+        page, source = self.face(card, width, height)
+        pixmap = page.copy(source.toRect())
+        pixmap.setDevicePixelRatio(page.devicePixelRatio())
+        return pixmap
+
+    @property
+    def sizes(self):
+        return tuple(self._sheets)
+
+    def clear(self):
+        self._sheets.clear()
+
+
+# 全局共享的牌面缓存
+card_faces = CardFaceCache()
+
+
+def card_icon(card):
+    """对话框列表用的牌面图标（尺寸为 ICON_SIZE）"""
+    return QIcon(card_faces.pixmap(card, ICON_SIZE.width(), ICON_SIZE.height()))
@@ -3,11 +3,26 @@ from PySide6.QtWidgets import (
     QGraphicsRectItem, QGraphicsItem
 )
 from PySide6.QtGui import QPainter, QBrush, QColor, QPen, QFont
-from PySide6.QtCore import Qt, QRectF
+from PySide6.QtCore import Qt, QRectF, QPointF
+import math
+
+from ui.table.faces import card_faces
+
+
+# 卡牌、面板的底色
+CARD_COLOR = QColor(255, 250, 240)
+CARD_SELECTED_COLOR = QColor(255, 255, 150)
+PANEL_COLOR = QColor(230, 230, 250)
+PANEL_SELECTED_COLOR = QColor(255, 200, 200)
+PANEL_DEAD_COLOR = QColor(180, 180, 180)
+
+# 手牌区域
+HAND_Y = 550
+SCENE_WIDTH = 900
 
 
 class CardItem(QGraphicsRectItem):
-    """可交互的卡牌图形项"""
+    """可交互的卡牌图形项，牌面文字从 card_faces 图集中贴图"""
     def __init__(self, card, x, y, width=80, height=110):
         super().__init__(0, 0, width, height)
         self.card = card
@@ -17,59 +32,39 @@ class CardItem(QGraphicsRectItem):
         self.selected = False
         
         # 样式
-        self.setBrush(QBrush(QColor(255, 250, 240)))
+        self.setBrush(QBrush(CARD_COLOR))
         self.setPen(QPen(QColor(100, 100, 100), 2))
         self.setFlag(QGraphicsItem.ItemIsSelectable, True)
         
-        # 卡牌文本
-        self.text = QGraphicsTextItem(self)
-        self.update_text()
-        
-    def update_text(self):
-        # 显示花色、点数和牌名
-        text = f"{self.card.suit}{self.card.rank}\n{self.card.name}"
-        
-        # 如果是装备牌，显示能力说明
-        if hasattr(self.card, 'description') and self.card.description:
-            text += f"\n{self.card.description}"
-        
-        # 根据卡牌大小调整字体
-        if hasattr(self.card, 'description') and self.card.description:
-            # 装备牌有说明，字体更小，并设置自动换行
-            font = QFont("Arial", 8)
-        else:
-            font = QFont("Arial", 12, QFont.Bold)
-        
-        self.text.setFont(font)
-        self.text.setPlainText(text)
-        
-        # 设置文本宽度以自动换行
-        self.text.setTextWidth(self.width - 10)  # 留10px边距
-        
-        # 居中
-        bounds = self.text.boundingRect()
-        self.text.setPos(
-            5,  # 左边距5px
-            (self.height - bounds.height()) / 2
-        )
-        
-        # 颜色：红色花色用红字
-        if self.card.suit in ["♥", "♦"]:
-            self.text.setDefaultTextColor(QColor(200, 0, 0))
-        else:
-            self.text.setDefaultTextColor(QColor(0, 0, 0))
+        # 卡牌文字
+        self._face = card_faces.face(card, width, height)
+    
+    def resize(self, width):
+        """调整宽度（手牌数跨过缩小显示的阈值时）"""
+        self.width = width
+        self.setRect(0, 0, width, self.height)
+        self._face = card_faces.face(self.card, width, self.height)
+    
+    def set_selected(self, selected):
+        self.selected = selected
+        self.setBrush(QBrush(CARD_SELECTED_COLOR if selected else CARD_COLOR))
+    
+    def paint(self, painter, option, widget=None):
+        super().paint(painter, option, widget)  # 底色和边框
+        page, source = self._face
+        painter.drawPixmap(self.rect(), page, source)
     
     def mousePressEvent(self, event):
-        self.selected = not self.selected
-        if self.selected:
-            self.setBrush(QBrush(QColor(255, 255, 150)))
-        else:
-            self.setBrush(QBrush(QColor(255, 250, 240)))
+        self.set_selected(not self.selected)
         super().mousePressEvent(event)
 
 
 class PlayerPanel(QGraphicsRectItem):
-    """玩家信息面板"""
+    """玩家信息面板
+
+    面板在整局中一直保留，update_display() 只修改与上次显示不同的部分
+    （文字、底色、各个体力图标），返回被修改的图形项数量。
+    """
     def __init__(self, player, x, y, width=150, height=120):
         super().__init__(0, 0, width, height)
         self.player = player
@@ -77,20 +72,29 @@ class PlayerPanel(QGraphicsRectItem):
         self.width = width
         self.height = height
         self.selected = False
+        self.is_current = False
         
-        self.setBrush(QBrush(QColor(230, 230, 250)))
+        self.setBrush(QBrush(PANEL_COLOR))
         self.setPen(QPen(QColor(100, 100, 100), 2))
         self.setFlag(QGraphicsItem.ItemIsSelectable, True)
         
         self.text = QGraphicsTextItem(self)
         self.text.setPos(5, 5)
+        # 根据面板大小调整字体
+        if self.width <= 120:  # 6-8人局
+            self.text.setFont(QFont("Arial", 9))
+        else:  # 2-5人局
+            self.text.setFont(QFont("Arial", 10))
         
-        # 血量显示（红色爱心）
+        # 血量显示（红色爱心），每个图标记录当前显示的字符
         self.hp_items = []
+        self._hearts = []
+        self._info = None
+        self._alive = None
         
         self.update_display()
     
-    def update_display(self):
+    def _info_text(self):
         # 获取身份显示
         role_symbols = {
             "lord": "主",  # 主公
@@ -111,39 +115,20 @@ class PlayerPanel(QGraphicsRectItem):
         equip_text = ""
         if self.player.equip:
             equip_parts = []
-            weapon = None
-            armor = None
-            plus_horse = None
-            minus_horse = None
-            
-            for eq in self.player.equip:
-                if hasattr(eq, 'equip_type'):
+            for label, eq in (("武器", self.player.equip.weapon),
+                              ("防具", self.player.equip.armor),
+                              ("+1", self.player.equip.plus_horse),
+                              ("-1", self.player.equip.minus_horse)):
+                if eq is not None:
                     # 获取能力说明
-                    desc = eq.description if hasattr(eq, 'description') else ""
-                    if eq.equip_type == "weapon":
-                        weapon = f"{eq.name}({desc})" if desc else eq.name
-                    elif eq.equip_type == "armor":
-                        armor = f"{eq.name}({desc})" if desc else eq.name
-                    elif eq.equip_type == "plus_horse":
-                        plus_horse = f"{eq.name}({desc})" if desc else eq.name
-                    elif eq.equip_type == "minus_horse":
-                        minus_horse = f"{eq.name}({desc})" if desc else eq.name
-            
-            if weapon:
-                equip_parts.append(f"武器:{weapon}")
-            if armor:
-                equip_parts.append(f"防具:{armor}")
-            if plus_horse:
-                equip_parts.append(f"+1:{plus_horse}")
-            if minus_horse:
-                equip_parts.append(f"-1:{minus_horse}")
+                    desc = eq.description
+                    equip_parts.append(f"{label}:{eq.name}({desc})" if desc else f"{label}:{eq.name}")
             
             if equip_parts:
                 equip_text = "\n" + " ".join(equip_parts)
         
-        # 更新文本 - 优化显示，避免文字过长
+        # 优化显示，避免文字过长
         name_suffix = " (电脑)" if self.player.is_ai else " (你)"
-        hero_name = f" - {self.player.hero.name}" if self.player.hero else ""
         role_display = f" [{role_symbol}]" if role_symbol else ""
         
         # 缩短显示：只显示武将名或玩家名，不同时显示
@@ -153,123 +138,152 @@ class PlayerPanel(QGraphicsRectItem):
             display_name = f"{self.player.name}{role_display}{name_suffix}"
         
         info = f"{display_name}\n手牌: {len(self.player.hand)}{skill_text}{equip_text}"
-        self.text.setPlainText(info)
-        
-        # 根据面板大小调整字体
+        if not self.player.is_alive:
+            info += "\n☠ 已阵亡"
+        return info
+    
+    def _heart_layout(self):
+        """(爱心大小, 起始y)，根据面板大小调整"""
         if self.width <= 105:  # 8人局
-            font = QFont("Arial", 9)
+            return 14, self.height - 22
         elif self.width <= 110:  # 7人局
-            font = QFont("Arial", 9)
+            return 15, self.height - 23
         elif self.width <= 120:  # 6人局
-            font = QFont("Arial", 9)
+            return 15, self.height - 24
         elif self.width <= 130:  # 5人局
-            font = QFont("Arial", 10)
+            return 16, self.height - 26
         else:  # 2-4人局
-            font = QFont("Arial", 10)
-        self.text.setFont(font)
+            return 17, 70
+    
+    def update_display(self):
+        """按玩家当前状态更新显示，返回被修改的图形项数量"""
+        changed = 0
         
-        # 如果死亡，变灰
-        if not self.player.is_alive:
-            self.setBrush(QBrush(QColor(180, 180, 180)))
-            info += "\n☠ 已阵亡"
+        info = self._info_text()
+        if info != self._info:
+            self._info = info
             self.text.setPlainText(info)
-            self.text.setDefaultTextColor(QColor(100, 100, 100))
+            changed += 1
         
-        # 清除旧的血量显示
-        for item in self.hp_items:
+        # 如果死亡，变灰
+        alive = self.player.is_alive
+        if alive != self._alive:
+            self._alive = alive
+            self.text.setDefaultTextColor(QColor(0, 0, 0) if alive else QColor(100, 100, 100))
+            self._apply_brush()
+            changed += 1
+        
+        # 体力图标：数量随体力上限增减，只改变实心/空心发生变化的图标
+        heart_size, start_y = self._heart_layout()
+        while len(self.hp_items) > self.player.max_hp:
+            item = self.hp_items.pop()
+            self._hearts.pop()
             if item.scene():
                 item.scene().removeItem(item)
-        self.hp_items.clear()
-        
-        # 绘制血量（红色爱心）
-        # 根据面板大小调整爱心大小和位置
-        if self.width <= 105:  # 8人局
-            heart_size = 14
-            start_y = self.height - 22
-        elif self.width <= 110:  # 7人局
-            heart_size = 15
-            start_y = self.height - 23
-        elif self.width <= 120:  # 6人局
-            heart_size = 15
-            start_y = self.height - 24
-        elif self.width <= 130:  # 5人局
-            heart_size = 16
-            start_y = self.height - 26
-        else:  # 2-4人局
-            heart_size = 17
-            start_y = 70
-        
-        for i in range(self.player.max_hp):
+            changed += 1
+        while len(self.hp_items) < self.player.max_hp:
             heart = QGraphicsTextItem(self)
-            if i < self.player.hp:
+            heart.setFont(QFont("Arial", heart_size - 2, QFont.Bold))
+            heart.setPos(5 + len(self.hp_items) * heart_size, start_y)
+            self.hp_items.append(heart)
+            self._hearts.append(None)
+        for i, heart in enumerate(self.hp_items):
+            full = i < self.player.hp
+            if self._hearts[i] is full:
+                continue
+            self._hearts[i] = full
+            if full:
                 heart.setPlainText("♥")  # 实心
                 heart.setDefaultTextColor(QColor(220, 20, 60))
             else:
                 heart.setPlainText("♡")  # 空心
                 heart.setDefaultTextColor(QColor(150, 150, 150))
-            
-            font = QFont("Arial", heart_size - 2, QFont.Bold)
-            heart.setFont(font)
-            heart.setPos(5 + i * heart_size, start_y)
-            self.hp_items.append(heart)
+            changed += 1
+        return changed
     
     def update_text(self):
         self.update_display()
     
-    def mousePressEvent(self, event):
-        self.selected = not self.selected
+    def set_current(self, current):
+        """标记当前回合的玩家，状态改变时返回True"""
+        if current == self.is_current:
+            return False
+        self.is_current = current
+        if current:
+            self.setPen(QPen(QColor(255, 100, 100), 4))
+        else:
+            self.setPen(QPen(QColor(100, 100, 100), 2))
+        return True
+    
+    def set_selected(self, selected):
+        self.selected = selected
+        self._apply_brush()
+    
+    def _apply_brush(self):
         if self.selected:
-            self.setBrush(QBrush(QColor(255, 200, 200)))
+            self.setBrush(QBrush(PANEL_SELECTED_COLOR))
+        elif not self.player.is_alive:
+            self.setBrush(QBrush(PANEL_DEAD_COLOR))
         else:
-            self.setBrush(QBrush(QColor(230, 230, 250)))
+            self.setBrush(QBrush(PANEL_COLOR))
+    
+    def mousePressEvent(self, event):
+        self.set_selected(not self.selected)
         super().mousePressEvent(event)
 
 
+def table_layout(n):
+    """按人数返回 (圆环半径, 面板宽, 面板高)"""
+    if n <= 3:
+        return 130, 150, 118
+    elif n <= 4:
+        return 165, 150, 118
+    elif n == 5:
+        return 185, 130, 105
+    elif n == 6:
+        return 200, 120, 98
+    elif n == 7:
+        return 210, 110, 90
+    else:  # 8人
+        return 220, 105, 85
+
+
 class GameView(QGraphicsView):
+    """牌桌视图（保留模式）
+
+    玩家面板、手牌和提示文字在整局中保留，refresh() 把游戏状态与当前显示
+    逐项比较，只增删、移动或修改有变化的图形项；换了一局游戏时才重建。
+    refresh_table()/refresh_hand()/refresh_status() 分别只刷新一个区域，
+    供 RefreshScheduler 按脏区域调用。
+    changed_items 为上一次刷新修改的图形项数量。
+    """
     def __init__(self, game):
         super().__init__()
         self.game = game
         self.scene = QGraphicsScene(self)
         self.setScene(self.scene)
         self.setRenderHint(QPainter.Antialiasing, True)
-        self.setSceneRect(0, 0, 900, 700)
+        self.setSceneRect(0, 0, SCENE_WIDTH, 700)
         
         self.player_panels = []
         self.hand_cards = []
         self.center_card_item = None  # 中间显示的牌
+        self._center_text_item = None
+        self._arrow_item = None
+        self._arrow_items = []
+        
+        self._players = None  # 当前显示的玩家列表（换局时重建）
+        self._hand_owner = None  # 底部显示手牌的玩家
+        self._info_item = None
+        self._info = None
+        self.changed_items = 0
         
         self.refresh()
     
     def show_card_in_center(self, card, source_player, target_player=None):
-        """在牌桌中间显示出牌动画"""
-        # 清除之前的牌和定时器
-        if hasattr(self, '_clear_timer') and self._clear_timer:
-            self._clear_timer.stop()
-            self._clear_timer = None
-        
-        if self.center_card_item:
-            try:
-                if self.center_card_item.scene():
-                    self.scene.removeItem(self.center_card_item)
-            except RuntimeError:
-                pass  # 对象已被删除
-            self.center_card_item = None
-        
-        if hasattr(self, '_center_text_item') and self._center_text_item:
-            try:
-                if self._center_text_item.scene():
-                    self.scene.removeItem(self._center_text_item)
-            except RuntimeError:
-                pass
-            self._center_text_item = None
-        
-        if hasattr(self, '_arrow_item') and self._arrow_item:
-            try:
-                if self._arrow_item.scene():
-                    self.scene.removeItem(self._arrow_item)
-            except RuntimeError:
-                pass
-            self._arrow_item = None
+        """在牌桌中间显示出牌动画（显示多久由 AnimationTimeline 决定，之后调用 clear_center_card）"""
+        # 清除之前的牌
+        self.clear_center_card()
         
         # 创建中心区域的大牌
         center_x, center_y = 380, 280
@@ -291,13 +305,6 @@ class GameView(QGraphicsView):
         # 如果有目标，绘制箭头
         if target_player:
             self._draw_arrow(source_player, target_player)
-        
-        # 定时清除（2秒后）
-        from PySide6.QtCore import QTimer
-        self._clear_timer = QTimer()
-        self._clear_timer.setSingleShot(True)
-        self._clear_timer.timeout.connect(self._clear_center_card)
-        self._clear_timer.start(2000)
     
     def _draw_arrow(self, source_player, target_player):
         """绘制从源玩家到目标玩家的箭头"""
@@ -351,93 +358,82 @@ class GameView(QGraphicsView):
         arrow_head_item = self.scene.addPolygon(arrow_head, pen, QBrush(QColor(255, 0, 0)))
         
         # 保存箭头以便清除
-        if not hasattr(self, '_arrow_items'):
-            self._arrow_items = []
         self._arrow_items.append(arrow_head_item)
     
-    def _clear_center_card(self):
+    def clear_center_card(self):
         """清除中心区域的牌"""
-        if self.center_card_item:
+        for item in (self.center_card_item, self._center_text_item, self._arrow_item, *self._arrow_items):
+            if item is None:
+                continue
             try:
-                if self.center_card_item.scene():
-                    self.scene.removeItem(self.center_card_item)
+                if item.scene():
+                    self.scene.removeItem(item)
             except RuntimeError:
                 pass  # 对象已被删除
-            self.center_card_item = None
-        
-        if hasattr(self, '_center_text_item') and self._center_text_item:
-            try:
-                if self._center_text_item.scene():
-                    self.scene.removeItem(self._center_text_item)
-            except RuntimeError:
-                pass
-            self._center_text_item = None
-        
-        if hasattr(self, '_arrow_item') and self._arrow_item:
-            try:
-                if self._arrow_item.scene():
-                    self.scene.removeItem(self._arrow_item)
-            except RuntimeError:
-                pass
-            self._arrow_item = None
-        
-        if hasattr(self, '_arrow_items') and self._arrow_items:
-            for item in self._arrow_items:
-                try:
-                    if item.scene():
-                        self.scene.removeItem(item)
-                except RuntimeError:
-                    pass
-            self._arrow_items = []
+        self.center_card_item = None
+        self._center_text_item = None
+        self._arrow_item = None
+        self._arrow_items = []
 
     def refresh(self):
-        # 停止并清理中心牌的定时器
-        if hasattr(self, '_clear_timer') and self._clear_timer:
-            self._clear_timer.stop()
-            self._clear_timer = None
-        
-        self.center_card_item = None
-        if hasattr(self, '_center_text_item'):
-            self._center_text_item = None
-        if hasattr(self, '_arrow_item'):
-            self._arrow_item = None
-        if hasattr(self, '_arrow_items'):
-            self._arrow_items = []
-        
-        self.scene.clear()
-        self.player_panels.clear()
-        self.hand_cards.clear()
+        """按游戏状态更新整个牌桌，只修改有变化的图形项（不影响中间正在显示的牌）"""
+        self.changed_items = self.refresh_table() + self.refresh_hand() + self.refresh_status()
+    
+    def refresh_table(self):
+        """刷新玩家面板和当前玩家标记，返回被修改的图形项数量"""
+        changed = self._sync_players()
+        current = self.game.current_player
+        for panel in self.player_panels:
+            changed += panel.update_display()
+            # 标记当前玩家
+            changed += panel.set_current(panel.player is current)
+            # 刷新后不保留之前选择的目标
+            if panel.selected:
+                panel.set_selected(False)
+        self.changed_items = changed
+        return changed
+    
+    def refresh_hand(self):
+        """刷新底部手牌，返回被修改的图形项数量"""
+        changed = self._sync_players() + self._sync_hand()
+        # 刷新后不保留之前选择的手牌
+        for card_item in self.hand_cards:
+            if card_item.selected:
+                card_item.set_selected(False)
+        self.changed_items = changed
+        return changed
+    
+    def refresh_status(self):
+        """刷新左上角的提示信息，返回被修改的图形项数量"""
+        changed = self._sync_players()
+        info = (f"当前阶段: {self.game.phase}  |牌堆剩余: {len(self.game.deck.cards)}"
+                f"  |玩家数: {len(self.game.players)}人")
+        if info != self._info:
+            self._info = info
+            self._info_item.setPlainText(info)
+            changed += 1
+        self.changed_items = changed
+        return changed
+    
+    def _sync_players(self):
+        """换了一局游戏时重建，返回新建和移除的图形项数量"""
+        if self._players is self.game.players:
+            return 0
+        return self._rebuild()
+    
+    def _rebuild(self):
+        """换了一局游戏：重建玩家面板，清空手牌和中心牌，返回新建和移除的图形项数量"""
+        self.clear_center_card()
+        changed = len(self.player_panels) + len(self.hand_cards)
+        for item in self.player_panels + self.hand_cards:
+            self.scene.removeItem(item)
+        self.player_panels = []
+        self.hand_cards = []
+        self._players = self.game.players
         
         # 圆环布局展示所有玩家（根据人数自动调整半径和面板大小）
         n = len(self.game.players)
-        import math
-        
-        # 根据人数调整圆环大小和面板大小（更紧凑，字体更大）
-        if n <= 3:
-            radius = 130
-            panel_width = 150
-            panel_height = 118
-        elif n <= 4:
-            radius = 165
-            panel_width = 150
-            panel_height = 118
-        elif n == 5:
-            radius = 185
-            panel_width = 130
-            panel_height = 105
-        elif n == 6:
-            radius = 200
-            panel_width = 120
-            panel_height = 98
-        elif n == 7:
-            radius = 210
-            panel_width = 110
-            panel_height = 90
-        else:  # 8人
-            radius = 220
-            panel_width = 105
-            panel_height = 85
-        
+        radius, panel_width, panel_height = table_layout(n)
         cx, cy = 450, 280  # 圆心位置
         
         for i, p in enumerate(self.game.players):
@@ -448,44 +444,60 @@ class GameView(QGraphicsView):
             panel = PlayerPanel(p, x, y, width=panel_width, height=panel_height)
             self.scene.addItem(panel)
             self.player_panels.append(panel)
-            
-            # 标记当前玩家
-            if p is self.game.current_player:
-                panel.setPen(QPen(QColor(255, 100, 100), 4))
+            changed += 1
         
         # 底部只显示玩家自己的手牌（不是AI的那个）
-        player = None
-        for p in self.game.players:
-            if not p.is_ai:
-                player = p
-                break
-        
-        if player:
-            # 根据手牌数量调整显示
-            card_count = len(player.hand)
-            card_width = 80
-            card_spacing = 90
-            
-            # 如果手牌超过10张，缩小间距
-            if card_count > 10:
-                card_spacing = 70
-                card_width = 65
-            
-            total_width = card_count * card_spacing
-            start_x = (900 - total_width) / 2  # 居中显示
-            y = 550
-            
-            for i, card in enumerate(player.hand):
-                card_item = CardItem(card, start_x + i * card_spacing, y, width=card_width)
-                self.scene.addItem(card_item)
-                self.hand_cards.append(card_item)
-        
-        # 显示提示信息
-        info_text = QGraphicsTextItem(f"当前阶段: {self.game.phase}  |牌堆剩余: {len(self.game.deck.cards)}  |玩家数: {n}人")
-        info_text.setPos(50, 20)
-        font = QFont("Arial", 12)
-        info_text.setFont(font)
-        self.scene.addItem(info_text)
+        self._hand_owner = next((p for p in self.game.players if not p.is_ai), None)
+        
+        if self._info_item is None:
+            self._info_item = QGraphicsTextItem()
+            self._info_item.setPos(50, 20)
+            self._info_item.setFont(QFont("Arial", 12))
+            self.scene.addItem(self._info_item)
+            changed += 1
+        return changed
+    
+    def _sync_hand(self):
+        """按手牌顺序复用、新建或移除卡牌图形项，返回被修改的图形项数量"""
+        cards = list(self._hand_owner.hand) if self._hand_owner else []
+        
+        # 根据手牌数量调整显示，超过10张时缩小间距
+        if len(cards) > 10:
+            card_width, card_spacing = 65, 70
+        else:
+            card_width, card_spacing = 80, 90
+        start_x = (SCENE_WIDTH - len(cards) * card_spacing) / 2  # 居中显示
+        
+        # 已显示的牌按id分组，同一张牌可以原样复用
+        shown = {}
+        for item in self.hand_cards:
+            shown.setdefault(item.card.id, []).append(item)
+        
+        changed = 0
+        items = []
+        for i, card in enumerate(cards):
+            pos = QPointF(start_x + i * card_spacing, HAND_Y)
+            reusable = shown.get(card.id)
+            if reusable:
+                item = reusable.pop(0)
+                if item.width != card_width:
+                    item.resize(card_width)
+                    changed += 1
+                if item.pos() != pos:
+                    item.setPos(pos)
+                    changed += 1
+            else:
+                item = CardItem(card, pos.x(), pos.y(), width=card_width)
+                self.scene.addItem(item)
+                changed += 1
+            items.append(item)
+        
+        for leftover in shown.values():
+            for item in leftover:
+                self.scene.removeItem(item)
+                changed += 1
+        self.hand_cards = items
+        return changed
     
     def get_selected_card_index(self):
         """获取选中的手牌索引"""
@@ -506,9 +518,7 @@ class GameView(QGraphicsView):
         """清除所有选中状态"""
         for card_item in self.hand_cards:
             if card_item.selected:
-                card_item.selected = False
-                card_item.setBrush(QBrush(QColor(255, 250, 240)))
+                card_item.set_selected(False)
         for panel in self.player_panels:
             if panel.selected:
-                panel.selected = False
-                panel.setBrush(QBrush(QColor(230, 230, 250)))
+                panel.set_selected(False)
@@ -0,0 +1,106 @@
+"""动画时间线 - 按顺序播放引擎事件对应的动画，代替分散的 QTimer.singleShot 延时
+
+每个步骤是 (动作, 时长)：轮到该步骤时执行动作，等待时长（毫秒，乘以 scale）后再进行
+下一步。scale=0 时不等待，所有步骤立即依次执行。
+    - 积压超过 compress_after 个步骤时按积压程度缩短等待时间
+    - skippable=True 的步骤只是展示（如出牌动画），积压超过 skip_after 个步骤时直接丢弃，
+      快速的AI回合不会被动画拖慢；skippable=False 的步骤（如推进AI回合）总会按顺序执行
+队列播放完毕时发出 idle 信号（用于清除桌面中央的牌）。
+"""
+from collections import deque
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+
+# 积压超过这么多步骤时开始缩短等待时间
+COMPRESS_AFTER = 2
+# 积压超过这么多步骤时跳过展示步骤
+SKIP_AFTER = 6
+
+
+class Step:
+    __slots__ = ("action", "duration", "skippable")
+
+    def __init__(self, action, duration, skippable):
+        self.action = action
+        self.duration = duration
+        self.skippable = skippable
+
+
+class AnimationTimeline(QObject):
+    """顺序播放的动画队列"""
+
+    idle = Signal()
+
+    def __init__(self, parent=None, scale=1.0, compress_after=COMPRESS_AFTER, skip_after=SKIP_AFTER):
+        super().__init__(parent)
+        self.scale = scale  # 时长倍率，0 表示不播放动画
+        self.compress_after = compress_after
+        self.skip_after = skip_after
+        self._steps = deque()
+        self._running = False  # 正在执行某个步骤的动作（动作中加入的步骤只排队）
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._run)
+        self.played = 0
+        self.skipped = 0
+
+    @property
+    def busy(self):
+        """还有步骤未播放完"""
+        return bool(self._steps) or self._running or self._timer.isActive()
+
+    def play(self, action, duration=0, skippable=True):
+        """加入一个步骤：执行 action()，之后等待 duration 毫秒"""
+        self._steps.append(Step(action, duration, skippable))
+        self._kick()
+
+    def wait(self, duration):
+        """加入一段停顿（积压时可跳过）"""
+        self.play(None, duration)
+
+    def skip(self):
+        """立即结束队首连续的展示步骤：中间的直接丢弃，只执行最后一个
+
+        弹出对话框前调用，让桌面先显示出最新的一张牌。
+        """
+        last = None
+        while self._steps and self._steps[0].skippable:
+            if last is not None:
+                self.skipped += 1
+            last = self._steps.popleft()
+        if last is not None and last.action is not None:
+            last.action()
+            self.played += 1
+
+    def clear(self):
+        """丢弃所有尚未播放的步骤（换局时使用）"""
+        self._timer.stop()
+        self._steps.clear()
+
+    def _kick(self):
+        if not self._running and not self._timer.isActive():
+            self._run()
+
+    def _run(self):
+        """依次执行步骤，直到需要等待或队列为空"""
+        self._running = True
+        try:
+            while self._steps:
+                step = self._steps.popleft()
+                if step.skippable and len(self._steps) > self.skip_after:
+                    self.skipped += 1
+                    continue
+                if step.action is not None:
+                    step.action()
+                    self.played += 1
+                delay = step.duration * self.scale
+                pending = len(self._steps)
+                if pending > self.compress_after:
+                    delay *= self.compress_after / pending  # 积压时加快
+                if delay > 0:
+                    self._timer.start(round(delay))
+                    return
+        finally:
+            self._running = False
+        self.idle.emit()